@@ -1,38 +1,89 @@
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from functools import lru_cache
 from typing import List
+from pydantic import BaseModel
+import asyncio
+from contextlib import aclosing
 from app.services.agent_service import AgentService
+from app.services.broadcast_hub import Subscription, broadcast_hub
 
 router = APIRouter()
 
+class WorkflowRequest(BaseModel):
+    sectors: List[str]
+
+@lru_cache(maxsize=1)
+def get_agent_service() -> AgentService:
+    """AgentService shared by every WebSocket connection"""
+    return AgentService()
+
+async def _forward(websocket: WebSocket, subscription: Subscription):
+    """Send the connection's hub messages, already JSON-encoded, as they arrive"""
+    while True:
+        await websocket.send_text(await subscription.get())
+
 @router.websocket("/ws")
 async def agent_websocket(websocket: WebSocket):
-    """WebSocket for real-time agent communication"""
+    """WebSocket for real-time agent communication
+
+    Commands sent with "stream": true are answered incrementally, one frame
+    per generated chunk, so operators see output from the first token.
+    {"subscribe": [topics]} and {"unsubscribe": [topics]} follow sector
+    ('sector:<id>') and agent ('agent:<name>') topics on the broadcast hub.
+    """
     await websocket.accept()
-    agent_service = AgentService()
-    
+    agent_service = get_agent_service()
+    subscription = broadcast_hub.subscribe()
+    forwarder = asyncio.create_task(_forward(websocket, subscription))
+
     try:
         while True:
             data = await websocket.receive_json()
-            response = await agent_service.process_command(data)
-            await websocket.send_json(response)
+            if "subscribe" in data or "unsubscribe" in data:
+                broadcast_hub.add_topics(subscription, data.get("subscribe", []))
+                broadcast_hub.remove_topics(subscription, data.get("unsubscribe", []))
+                await websocket.send_json({"type": "subscribed", "topics": sorted(subscription.topics)})
+            elif data.get("stream"):
+                # Closed straight away on disconnect, which cancels the generation
+                async with aclosing(agent_service.stream_command(data)) as frames:
+                    async for frame in frames:
+                        await websocket.send_json(frame)
+            else:
+                response = await agent_service.process_command(data)
+                await websocket.send_json(response)
     except WebSocketDisconnect:
         pass
+    finally:
+        broadcast_hub.unsubscribe(subscription)
+        forwarder.cancel()
 
 @router.get("/status")
 async def get_agent_status():
     """Get status of all agents"""
-return {
-"agents": [
-{"name": "Infrastructure Scout", "status": "active"},
-{"name": "Network Analyst", "status": "active"},
-{"name": "Compliance Auditor", "status": "active"},
-{"name": "Web Orchestrator", "status": "active"}
-]
-}
+    return {
+        "agents": [
+            {"name": "Infrastructure Scout", "status": "active"},
+            {"name": "Network Analyst", "status": "active"},
+            {"name": "Compliance Auditor", "status": "active"},
+            {"name": "Web Orchestrator", "status": "active"}
+        ]
+    }
+
 @router.post("/execute")
 async def execute_workflow(sector: str):
-"""Execute complete multi-agent workflow"""
-agent_service = AgentService()
-result = await agent_service.execute_workflow(sector)
-return result
+    """Execute complete multi-agent workflow"""
+    agent_service = AgentService()
+    result = await agent_service.execute_workflow(sector)
+    return result
+
+@router.post("/execute/sectors")
+async def execute_workflows(request: WorkflowRequest):
+    """Execute the multi-agent workflow for several sectors in parallel"""
+    agent_service = AgentService()
+    return {"workflows": await agent_service.execute_workflows(request.sectors)}
+
+@router.get("/hub/metrics")
+async def get_hub_metrics():
+    """Subscribers per topic and fan-out counters of the broadcast hub"""
+    return broadcast_hub.metrics()
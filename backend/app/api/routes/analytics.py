@@ -1,24 +1,27 @@
-
 from fastapi import APIRouter
 from app.services.bigquery_service import BigQueryService
+
 router = APIRouter()
+
 @router.get("/performance")
 async def get_performance_metrics():
-"""Get system performance metrics"""
-return {
-"ocr_accuracy": 0.95,
-"sync_latency_ms": 85,
-"failure_prediction_accuracy": 0.94
-}
+    """Get system performance metrics"""
+    return {
+        "ocr_accuracy": 0.95,
+        "sync_latency_ms": 85,
+        "failure_prediction_accuracy": 0.94
+    }
+
 @router.get("/failures")
 async def get_failure_predictions():
-"""Get failure predictions"""
-return {"predictions": []}
+    """Get failure predictions"""
+    return {"predictions": []}
+
 @router.get("/roi")
 async def get_roi_analysis():
-"""Get ROI analysis"""
-return {
-"annual_savings": 150000,
-"roi_percentage": 450,
-"payback_period_years": 1.2
-}
+    """Get ROI analysis"""
+    return {
+        "annual_savings": 150000,
+        "roi_percentage": 450,
+        "payback_period_years": 1.2
+    }
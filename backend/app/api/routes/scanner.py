@@ -1,37 +1,86 @@
 
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Request
+from functools import lru_cache
+import asyncio
+from typing import List, Literal, Optional
 from pydantic import BaseModel
+from app.config import settings
 from app.services.ocr_service import OCRService
-from app.services.agent_service import AgentService
+from app.services.scan_jobs import ScanJobQueue
+from app.utils.uploads import spool_body
 
 router = APIRouter()
 
 class ScanRequest(BaseModel):
     sector: str
-    priority: str = "medium"
+    priority: Literal["high", "medium", "low"] = "medium"
 
 class ScanResponse(BaseModel):
     scan_id: str
     sector: str
-    components_found: int
+    priority: str
     status: str
 
-@router.post("/scan", response_model=ScanResponse)
-async def initiate_scan(request: ScanRequest):
-    """Initiate RDK X5 scan of specified sector"""
-    ocr_service = OCRService()
-    agent_service = AgentService()
-    
-    scan_result = await ocr_service.scan_sector(request.sector)
-    agent_result = await agent_service.process_scan(scan_result)
-    
-    return ScanResponse(
-        scan_id=scan_result['scan_id'],
-        sector=request.sector,
-        components_found=len(scan_result['components']),
-        status="completed"
-    )
+@lru_cache(maxsize=1)
+def get_scan_jobs() -> ScanJobQueue:
+    """Background scan jobs, shared by all requests so one scan pipeline bounds the work of all of them"""
+    return ScanJobQueue()
+
+@router.post("/scan", response_model=ScanResponse, status_code=202)
+async def initiate_scan(request: ScanRequest, jobs: ScanJobQueue = Depends(get_scan_jobs)):
+    """Initiate RDK X5 scan of specified sector
+
+    The scan runs as a background job; poll /scans/{scan_id} for its
+    progress and results.
+    """
+    try:
+        job = await jobs.submit(request.sector, request.priority)
+    except asyncio.QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return ScanResponse(scan_id=job['scan_id'], sector=job['sector'], priority=job['priority'],
+                        status=job['status'])
+
+@router.get("/pipeline/metrics")
+async def get_pipeline_metrics(jobs: ScanJobQueue = Depends(get_scan_jobs)):
+    """Per-stage throughput and queue depth of the scan pipeline, and scheduler wait times by priority"""
+    return {
+        "running": jobs.pipeline.running,
+        "jobs_pending": jobs.pending,
+        "scheduler": jobs.scheduler.metrics() if jobs.scheduler is not None else None,
+        "stages": jobs.pipeline.metrics()
+    }
+
+@lru_cache(maxsize=1)
+def get_ocr_service() -> OCRService:
+    """OCRService over one PaddleOCRModel, loaded on first use"""
+    from app.ml.paddle_ocr_model import PaddleOCRModel
+
+    model = PaddleOCRModel()
+    model.load_model()
+    return OCRService(model=model)
+
+@router.post("/upload")
+async def upload_image(request: Request, component_id: Optional[str] = None,
+                       ocr_service: OCRService = Depends(get_ocr_service)):
+    """OCR one camera frame sent as the raw request body (e.g. Content-Type: image/jpeg)
+
+    The body is spooled into a single preallocated buffer as it arrives
+    and decoded from it in place.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length is not None:
+        if not content_length.strip().isdigit():
+            raise HTTPException(status_code=400, detail="Invalid Content-Length header")
+        content_length = int(content_length)
+    image_data = await spool_body(request.stream(), content_length, settings.UPLOAD_MAX_BYTES)
+    if not image_data:
+        raise HTTPException(status_code=400, detail="Empty upload")
+
+    try:
+        return await ocr_service.process_image(image_data, component_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/scans")
 async def get_all_scans():
@@ -39,6 +88,9 @@ async def get_all_scans():
     return {"scans": []}
 
 @router.get("/scans/{scan_id}")
-async def get_scan(scan_id: str):
-    """Retrieve specific scan result"""
-    return {"scan_id": scan_id, "data": {}}
+async def get_scan(scan_id: str, jobs: ScanJobQueue = Depends(get_scan_jobs)):
+    """Status of a scan job, with the components finished so far"""
+    job = await jobs.get(scan_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Scan {scan_id} not found")
+    return job
@@ -1,16 +1,19 @@
-
 from fastapi import APIRouter
 from typing import Dict
+
 router = APIRouter()
+
 @router.get("/components")
 async def get_all_components():
-"""Get all components in digital twin"""
-return {"components": []}
+    """Get all components in digital twin"""
+    return {"components": []}
+
 @router.get("/components/{component_id}")
 async def get_component(component_id: str):
-"""Get specific component details"""
-return {"component_id": component_id, "status": "normal"}
+    """Get specific component details"""
+    return {"component_id": component_id, "status": "normal"}
+
 @router.post("/sync")
 async def sync_digital_twin():
-"""Trigger digital twin synchronization"""
-return {"status": "synced", "latency_ms": 85}
+    """Trigger digital twin synchronization"""
+    return {"status": "synced", "latency_ms": 85}
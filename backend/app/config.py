@@ -1,6 +1,6 @@
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 class Settings(BaseSettings):
     APP_NAME: str = "Astra-Grid"
@@ -25,9 +25,54 @@ class Settings(BaseSettings):
     NOVITA_API_KEY: str = ""
 
     MODEL_PATH: str = "./models/weights"
+    ERNIE_BASE_MODEL: str = "ERNIE-4.5-21B"
     UNSLOTH_MODEL: str = "astra-grid-ernie-4.5-lora"
     LLAMAFACTORY_MODEL: str = "astra-grid-ernie-sft"
     PADDLEOCR_MODEL: str = "paddleocr-vl-fine-tuned"
+    FAILURE_PREDICTOR_MODEL: str = "failure-predictor"
+
+    LLM_MAX_BATCH_SIZE: int = 8
+    LLM_MAX_BATCH_WAIT_MS: float = 5.0
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_TTL_SECONDS: float = 3600.0
+    LLM_CACHE_PATH: str = ""
+    LLM_CACHE_MAX_DISK_ENTRIES: int = 65536
+    LLM_CACHE_SAMPLED: bool = False
+    LLM_PREFIX_CACHE: bool = True
+    INFERENCE_BACKEND: str = "auto"
+    CPU_NUM_THREADS: int = 0
+
+    OCR_BATCH_SIZE: int = 16
+    OCR_PREPROCESS_WORKERS: int = 4
+    OCR_MAX_IMAGE_SIDE: int = 1600
+    OCR_TILE_PROPOSAL_SIDE: int = 1024
+    OCR_TILE_MIN_CONTRAST: int = 40
+    OCR_CACHE_MAX_ENTRIES: int = 4096
+    OCR_CACHE_MAX_DISTANCE: int = 4
+    OCR_CACHE_PATH: str = ""
+    SCHEMATIC_WORKERS: int = 0
+    UPLOAD_MAX_BYTES: int = 64 * 1024 * 1024
+    SCHEMATIC_RASTER_DPI: int = 200
+    GAUGE_DETECT_MAX_SIDE: int = 640
+    GAUGE_TRACK_CHANGE_THRESHOLD: float = 6.0
+    GAUGE_TRACK_MIN_CONFIDENCE: float = 0.5
+    GAUGE_TRACK_MAX_AGE: int = 300
+
+    SCAN_PIPELINE_QUEUE_SIZE: int = 32
+    SCAN_PIPELINE_WORKERS: Dict[str, int] = {
+        "scan": 2, "ocr": 2, "prediction": 4, "compliance": 4, "persistence": 2
+    }
+    SCAN_JOB_WORKERS: int = 4
+    SCAN_JOB_MAX_PENDING: int = 256
+    SCAN_SECTOR_CONCURRENCY: int = 1
+    SCAN_SECTOR_WEIGHTS: Dict[str, float] = {}
+    SCAN_PRIORITY_WEIGHTS: Dict[str, float] = {"high": 1.0, "medium": 2.0, "low": 1.0}
+
+    AGENT_CONCURRENCY: Dict[str, int] = {"scout": 4, "analyst": 8, "auditor": 8, "orchestrator": 4}
+    AGENT_NODE_TIMEOUTS: Dict[str, float] = {"scout": 60.0, "analyst": 15.0, "auditor": 15.0, "orchestrator": 15.0}
+    BROADCAST_BUFFER_SIZE: int = 256
+    REFERENCE_STORE_PATH: str = ""
+    REFERENCE_BLOOM_ERROR_RATE: float = 0.001
 
     JWT_SECRET: str = "your-secret-key-change-this"
     JWT_ALGORITHM: str = "HS256"
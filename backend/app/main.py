@@ -15,6 +15,9 @@ from app.utils.logger import logger
 async def lifespan(app: FastAPI):
     logger.info("Starting Astra-Grid Production Server")
     yield
+    await scanner.get_scan_jobs().stop()
+    if scanner.get_ocr_service.cache_info().currsize:
+        scanner.get_ocr_service().model.close()
     logger.info("Shutting down Astra-Grid Production Server")
 
 app = FastAPI(
@@ -1,8 +1,21 @@
 
-from .unsloth_model import UnslothModel
-from .llamafactory_model import LLaMAFactoryModel
-from .paddle_ocr_model import PaddleOCRModel
-from .failure_predictor import FailurePredictor
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .unsloth_model import UnslothModel
+    from .llamafactory_model import LLaMAFactoryModel
+    from .paddle_ocr_model import PaddleOCRModel
+    from .failure_predictor import FailurePredictor
+
+# Submodules pull in torch, transformers, peft, cv2 and sklearn, so they are
+# imported on first attribute access rather than when app.ml is imported
+_LAZY_IMPORTS = {
+    'UnslothModel': '.unsloth_model',
+    'LLaMAFactoryModel': '.llamafactory_model',
+    'PaddleOCRModel': '.paddle_ocr_model',
+    'FailurePredictor': '.failure_predictor'
+}
 
 __all__ = [
     'UnslothModel',
@@ -10,3 +23,14 @@ __all__ = [
     'PaddleOCRModel',
     'FailurePredictor'
 ]
+
+def __getattr__(name: str):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
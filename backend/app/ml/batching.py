@@ -0,0 +1,120 @@
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, Dict, Generic, List, Tuple, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collects concurrent requests for a few milliseconds and runs them as one batch
+
+    Callers submit() single items and receive a Future. A background thread
+    takes the first queued item, keeps collecting until max_batch_size items
+    are waiting or max_wait_ms has passed, then hands the whole batch to
+    process_batch and scatters its results back to the callers' futures.
+    """
+
+    def __init__(self, process_batch: Callable[[List[T]], List[R]], max_batch_size: int = 8,
+                 max_wait_ms: float = 5.0, name: str = "batcher"):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+
+        self._queue: "queue.Queue[Tuple[T, Future]]" = queue.Queue()
+        self._batch_sizes: Counter = Counter()
+        self._requests = 0
+        self._stopped = threading.Event()
+        # Held while enqueueing and while closing, so nothing is queued after the worker may exit
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name=f"{name}-worker", daemon=True)
+        self._worker.start()
+
+        logger.info(f"MicroBatcher '{name}' started (max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms})")
+
+    def submit(self, item: T) -> Future:
+        """Queue one item; the returned Future resolves to its result"""
+        future: Future = Future()
+        with self._lock:
+            if self._stopped.is_set():
+                raise RuntimeError(f"MicroBatcher '{self.name}' is closed")
+            self._queue.put((item, future))
+        return future
+
+    def __call__(self, item: T) -> R:
+        """Submit one item and block until its batch has run"""
+        return self.submit(item).result()
+
+    def close(self):
+        """Stop the worker after the batches already queued have run"""
+        with self._lock:
+            self._stopped.set()
+        self._worker.join()
+
+    def _collect(self) -> List[Tuple[T, Future]]:
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while not (self._stopped.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+            self._batch_sizes[len(batch)] += 1
+            self._requests += len(batch)
+
+            try:
+                results = self.process_batch(items)
+            except Exception as e:
+                logger.error(f"MicroBatcher '{self.name}' batch of {len(batch)} failed: {e}")
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            results = list(results)
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+            # Callers past the end of a short result list would otherwise wait forever
+            if len(results) < len(futures):
+                message = f"MicroBatcher '{self.name}' batch returned {len(results)} results for {len(batch)} items"
+                logger.error(message)
+                for future in futures[len(results):]:
+                    future.set_exception(RuntimeError(message))
+
+    def metrics(self) -> Dict:
+        """Queue depth and batch-size distribution"""
+        batches = sum(self._batch_sizes.values())
+        return {
+            'queue_depth': self._queue.qsize(),
+            'requests': self._requests,
+            'batches': batches,
+            'avg_batch_size': self._requests / batches if batches else 0.0,
+            'batch_size_histogram': dict(sorted(self._batch_sizes.items())),
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms
+        }
@@ -0,0 +1,113 @@
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+SAFETY_STANDARDS = {
+    'OSHA 1910.269': 'Electric Power Generation, Transmission, and Distribution',
+    'IEEE C2-2023': 'National Electrical Safety Code',
+    'NFPA 70E': 'Electrical Safety in the Workplace',
+    'IEC 61850': 'Communication Networks and Systems for Power Utility Automation',
+    'IEEE 802.3': 'Ethernet Standards for Data Centers'
+}
+
+# Risk bands follow FailurePredictor: Critical > 0.7, Warning > 0.4, else Stable
+RISK_BANDS = (('Critical', 0.7), ('Warning', 0.4), ('Stable', float('-inf')))
+
+ANY = '*'
+
+# (component_type, status, risk_band) -> violations; None marks a combination
+# the rules cannot settle, which is sent to the LLM. The violations of every
+# matching key add up, so specific keys only list what the wildcards do not.
+COMPLIANCE_RULES: Dict[Tuple[str, str, str], Optional[List[Dict]]] = {
+    (ANY, ANY, 'Critical'): [{
+        'violation_type': 'High-risk component operating beyond safe parameters',
+        'regulation': 'OSHA 1910.269',
+        'required_action': 'Immediate shutdown and replacement',
+        'severity': 'Critical'
+    }],
+    (ANY, 'Overheat', 'Critical'): [{
+        'violation_type': 'Arc-flash hazard from thermal overload',
+        'regulation': 'NFPA 70E',
+        'required_action': 'De-energize and establish an electrically safe work condition',
+        'severity': 'Critical'
+    }],
+    ('transformer', ANY, 'Critical'): [{
+        'violation_type': 'High-risk component operating beyond safe parameters',
+        'regulation': 'IEEE C2-2023',
+        'required_action': 'Immediate shutdown and replacement',
+        'severity': 'Critical'
+    }],
+    ('network_switch', ANY, 'Critical'): [{
+        'violation_type': 'Substation communication link at risk of failure',
+        'regulation': 'IEC 61850',
+        'required_action': 'Fail over to redundant link and replace',
+        'severity': 'Critical'
+    }],
+    (ANY, 'Normal', 'Stable'): [],
+    (ANY, 'Warning', 'Stable'): [],
+    # Stable score with an alarming status contradicts itself
+    (ANY, 'Overheat', 'Stable'): None,
+    (ANY, 'Offline', 'Stable'): None,
+    (ANY, ANY, 'Warning'): None
+}
+
+
+class ComplianceRuleEngine:
+    """Indexed lookup of compliance outcomes for clear-cut components
+
+    Rules are keyed by (component type, status, risk band) with '*'
+    wildcards, so a lookup is a handful of dict probes. The violations of
+    all matching keys are merged, generic citations first. Components
+    with no matching rule, any matching rule of None, or a risk score
+    within `margin` of a band boundary are ambiguous and left to the LLM.
+    """
+
+    def __init__(self, rules: Optional[Dict] = None, margin: float = 0.05):
+        self.rules = COMPLIANCE_RULES if rules is None else rules
+        self.margin = margin
+
+    @staticmethod
+    def risk_band(analyst_report: Dict) -> str:
+        """Band from the analyst's category, or from the score if absent"""
+        category = analyst_report.get('risk_category')
+        if category:
+            return category
+
+        score = analyst_report.get('risk_score') or 0.0
+        return next(band for band, threshold in RISK_BANDS if score > threshold)
+
+    def is_borderline(self, analyst_report: Dict) -> bool:
+        """Whether the risk score sits too close to a band boundary to trust the band"""
+        score = analyst_report.get('risk_score')
+        if score is None:
+            return False
+        return any(abs(score - threshold) < self.margin for _, threshold in RISK_BANDS[:-1])
+
+    def resolve(self, component_data: Dict, analyst_report: Dict) -> Optional[List[Dict]]:
+        """Violations for a clear case, or None if the component needs the LLM"""
+        if self.is_borderline(analyst_report):
+            return None
+
+        # Types are keyed lower case and statuses capitalized, whatever the source emits
+        component_type = str(component_data.get('component_type', ANY)).lower()
+        status = str(component_data.get('status', ANY)).capitalize()
+        band = self.risk_band(analyst_report)
+
+        keys = [key for key in ((ANY, ANY, band), (ANY, status, band), (component_type, ANY, band),
+                                (component_type, status, band)) if key in self.rules]
+        if not keys or any(self.rules[key] is None for key in keys):
+            return None
+
+        violations, seen = [], set()
+        for key in keys:
+            for violation in self.rules[key]:
+                if (violation['regulation'], violation['violation_type']) in seen:
+                    continue
+                seen.add((violation['regulation'], violation['violation_type']))
+                violations.append({
+                    'component': component_data.get('component_id'),
+                    **violation,
+                    'description': SAFETY_STANDARDS[violation['regulation']]
+                })
+        return violations
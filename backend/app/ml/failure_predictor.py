@@ -1,34 +1,134 @@
 
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from typing import Dict, List
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import logging
 
+from app.config import settings
+from .flat_forest import FlatForest
+from .streaming_features import StreamingFeatureState
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestClassifier
+
 logger = logging.getLogger(__name__)
 
+# (feature, threshold, weight, risk factor) - shared by the per-component and batch paths
+RISK_RULES = [
+    ('temp_trend', 0.5, 0.25, 'Rising temperature trend'),
+    ('temp_std', 5.0, 0.20, 'High temperature variability'),
+    ('voltage_stability', 5.0, 0.30, 'Voltage instability'),
+    ('current_spikes', 10, 0.25, 'Frequent current spikes'),
+]
+
+TELEMETRY_COLUMNS = ['component_id', 'timestamp', 'temperature_c', 'voltage_v', 'current_a']
+
+# Column order of the feature matrix the forest is trained and scored on
+FEATURE_NAMES = ['temp_mean', 'temp_std', 'temp_trend', 'voltage_stability', 'current_spikes']
+
 class FailurePredictor:
     """Temporal failure prediction with time-series analysis"""
     
-    def __init__(self):
+    def __init__(self, model_path: Optional[str] = None):
+        # Under the configured model directory unless given
+        self.model_path = model_path or str(Path(settings.MODEL_PATH) / settings.FAILURE_PREDICTOR_MODEL)
         self.model = None
+        self.forest: Optional[FlatForest] = None
         self.scaler = None
+        self.stream_states: Dict[str, StreamingFeatureState] = {}
         logger.info("Initializing FailurePredictor")
         
     def load_model(self):
-        """Load pre-trained failure prediction model"""
+        """Load the trained forest artifact, memory-mapped read-only
+        
+        Every worker maps the same files, so the forest occupies one
+        page-cache copy no matter how many processes serve it.
+        """
         try:
+            self.forest = FlatForest.load(self.model_path, mmap=True)
+            logger.info(f"FailurePredictor forest loaded from {self.model_path}: {self.forest.metadata()}")
+        except FileNotFoundError:
+            from sklearn.ensemble import RandomForestClassifier
+            
+            logger.warning(f"No FailurePredictor artifact at {self.model_path}, using rule-based scoring")
             self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-            logger.info("FailurePredictor model initialized")
         except Exception as e:
             logger.error(f"Error loading FailurePredictor: {e}")
     
+    def train(self, telemetry: pd.DataFrame, labels: Optional[pd.Series] = None,
+              **forest_params) -> 'RandomForestClassifier':
+        """Fit the failure forest on long-format telemetry
+        
+        labels maps component_id to a failure flag. Without labels the
+        'failed' column of the telemetry is used, and failing that the
+        rule-based Warning/Critical categories.
+        """
+        from sklearn.ensemble import RandomForestClassifier
+        
+        component_ids, features = self._extract_batch_features(telemetry)
+        X = self._feature_matrix(features)
+        
+        if labels is None and 'failed' in telemetry.columns:
+            labels = telemetry.groupby('component_id', sort=False)['failed'].max()
+        
+        if labels is not None:
+            y = labels.reindex(component_ids).fillna(0).astype(int).to_numpy()
+        else:
+            logger.warning("No failure labels provided, training on rule-based risk categories")
+            y = (self._rule_scores(features) > 0.4).astype(int)
+        
+        params = {'n_estimators': 100, 'random_state': 42}
+        params.update(forest_params)
+        
+        self.model = RandomForestClassifier(**params)
+        self.model.fit(X, y)
+        self.forest = FlatForest.from_estimator(self.model, FEATURE_NAMES)
+        
+        logger.info(f"FailurePredictor trained on {len(component_ids)} components")
+        return self.model
+    
+    def save_model(self, path: Optional[str] = None):
+        """Persist the trained forest as a memory-mappable artifact"""
+        if self.forest is None:
+            raise ValueError("FailurePredictor has no trained forest to save")
+        
+        self.forest.save(path or self.model_path)
+    
     def predict(self, component_data: Dict, historical_data: pd.DataFrame) -> Dict:
         """Predict failure based on temporal patterns"""
         
         features = self._extract_temporal_features(historical_data)
         
-        risk_score = self._calculate_risk_score(features)
+        return self._build_prediction(component_data, features)
+    
+    def predict_stream(self, component_data: Dict, reading: Dict) -> Dict:
+        """Fold one new telemetry reading into the component's state and score it
+        
+        O(1) per reading: features come from the component's
+        StreamingFeatureState instead of re-reading its history.
+        """
+        
+        component_id = component_data.get('component_id')
+        state = self.stream_states.get(component_id)
+        if state is None:
+            state = self.stream_states[component_id] = StreamingFeatureState()
+        
+        state.update(reading)
+        
+        return self._build_prediction(component_data, state.features())
+    
+    def reset_stream(self, component_id: str):
+        """Drop the streaming state for a component (e.g. after replacement)"""
+        self.stream_states.pop(component_id, None)
+    
+    def _build_prediction(self, component_data: Dict, features: Dict) -> Dict:
+        """Score extracted features into a prediction result"""
+        
+        if self.forest is not None and features:
+            risk_score = float(self._forest_scores(self._feature_matrix(features))[0])
+        else:
+            risk_score = self._calculate_risk_score(features)
         
         time_to_failure = None
         if risk_score > 0.7:
@@ -64,35 +164,153 @@ class FailurePredictor:
         
         risk = 0.0
         
-        if features.get('temp_trend', 0) > 0.5:
-            risk += 0.25
-        
-        if features.get('temp_std', 0) > 5.0:
-            risk += 0.20
-        
-        if features.get('voltage_stability', 0) > 5.0:
-            risk += 0.30
-        
-        if features.get('current_spikes', 0) > 10:
-            risk += 0.25
+        for feature, threshold, weight, _ in RISK_RULES:
+            if features.get(feature, 0) > threshold:
+                risk += weight
         
         return min(risk, 1.0)
     
     def _identify_risk_factors(self, features: Dict) -> List[str]:
         """Identify specific risk factors"""
         
-        factors = []
+        return [
+            factor for feature, threshold, _, factor in RISK_RULES
+            if features.get(feature, 0) > threshold
+        ]
+    
+    def predict_batch(self, telemetry: pd.DataFrame) -> pd.DataFrame:
+        """Predict failure for every component in a long-format telemetry frame
+        
+        Expects one row per reading with the columns in TELEMETRY_COLUMNS and
+        returns one row per component, in order of first appearance. Scores
+        match calling predict() on each component's history individually.
+        """
+        
+        component_ids, features = self._extract_batch_features(telemetry)
+        n_components = len(component_ids)
+        
+        fired = np.column_stack([
+            features[feature] > threshold for feature, threshold, _, _ in RISK_RULES
+        ])
+        
+        risk_score = self._rule_scores(features)
+        if self.forest is not None:
+            # Components without temperature have no features and, as in predict(), keep the rule score
+            scored = ~np.isnan(features['temp_mean'])
+            risk_score[scored] = self._forest_scores(self._feature_matrix(features)[scored])
+        
+        time_to_failure = np.full(n_components, np.nan)
+        critical = risk_score > 0.7
+        warning = (risk_score > 0.4) & ~critical
+        time_to_failure[critical] = np.random.uniform(12, 72, critical.sum())
+        time_to_failure[warning] = np.random.uniform(72, 240, warning.sum())
+        
+        factor_names = [factor for _, _, _, factor in RISK_RULES]
         
-        if features.get('temp_trend', 0) > 0.5:
-            factors.append('Rising temperature trend')
+        return pd.DataFrame({
+            'component_id': component_ids,
+            'risk_score': risk_score,
+            'risk_category': np.where(critical, 'Critical', np.where(warning, 'Warning', 'Stable')),
+            'time_to_failure_hours': time_to_failure,
+            'prediction_confidence': np.full(n_components, 0.94),
+            'risk_factors': [
+                [name for name, hit in zip(factor_names, row) if hit] for row in fired.tolist()
+            ]
+        })
+    
+    def _rule_scores(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        """Vectorized _calculate_risk_score over per-component feature arrays"""
         
-        if features.get('temp_std', 0) > 5.0:
-            factors.append('High temperature variability')
+        risk_score = np.zeros(len(features[FEATURE_NAMES[0]]))
+        for feature, threshold, weight, _ in RISK_RULES:
+            risk_score += np.where(features[feature] > threshold, weight, 0.0)
+        return np.minimum(risk_score, 1.0)
+    
+    def _feature_matrix(self, features: Dict) -> np.ndarray:
+        """Stack features in FEATURE_NAMES order; missing or NaN features become 0"""
         
-        if features.get('voltage_stability', 0) > 5.0:
-            factors.append('Voltage instability')
+        columns = [np.atleast_1d(np.asarray(features.get(name, 0), dtype=float)) for name in FEATURE_NAMES]
+        return np.nan_to_num(np.column_stack(columns), nan=0.0)
+    
+    def _forest_scores(self, X: np.ndarray) -> np.ndarray:
+        """Failure-class probability from the trained forest"""
+        
+        proba = self.forest.predict_proba(X)
+        if 1 not in self.forest.classes:
+            return np.zeros(len(X))
+        return proba[:, self.forest.classes.index(1)]
+    
+    def _extract_batch_features(self, df: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Extract temporal features for all components with grouped NumPy reductions"""
         
-        if features.get('current_spikes', 0) > 10:
-            factors.append('Frequent current spikes')
+        codes, component_ids = pd.factorize(df['component_id'], sort=False)
+        n_components = len(component_ids)
         
-        return factors
+        nan = np.full(n_components, np.nan)
+        if n_components == 0 or 'temperature_c' not in df.columns:
+            # No temperature means no features, as in _extract_temporal_features
+            return np.asarray(component_ids), {feature: nan for feature in FEATURE_NAMES}
+        
+        if 'timestamp' in df.columns:
+            order = np.lexsort((df['timestamp'].to_numpy(), codes))
+        else:
+            order = np.argsort(codes, kind='stable')
+        codes = codes[order]
+        
+        counts = np.bincount(codes, minlength=n_components)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        ends = starts + counts - 1
+        
+        temperature = df['temperature_c'].to_numpy(dtype=float)[order]
+        temp_mean, temp_std = _grouped_mean_std(temperature, codes, counts)
+        
+        if 'voltage_v' in df.columns:
+            _, voltage_std = _grouped_mean_std(df['voltage_v'].to_numpy(dtype=float)[order], codes, counts)
+        else:
+            voltage_std = nan
+        
+        if 'current_a' in df.columns:
+            current = df['current_a'].to_numpy(dtype=float)[order]
+            threshold = _grouped_quantile(current, codes, starts, counts, 0.95)
+            current_spikes = np.bincount(codes, weights=current > threshold[codes], minlength=n_components)
+        else:
+            current_spikes = np.zeros(n_components)
+        
+        features = {
+            'temp_mean': temp_mean,
+            'temp_std': temp_std,
+            'temp_trend': (temperature[ends] - temperature[starts]) / counts,
+            'voltage_stability': voltage_std,
+            'current_spikes': current_spikes
+        }
+        return np.asarray(component_ids), features
+
+
+def _grouped_mean_std(values: np.ndarray, codes: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-group mean and sample standard deviation (ddof=1, NaN for single readings)"""
+    mean = np.bincount(codes, weights=values, minlength=len(counts)) / counts
+    squared = np.bincount(codes, weights=(values - mean[codes]) ** 2, minlength=len(counts))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(squared / (counts - 1))
+    std[counts < 2] = np.nan
+    return mean, std
+
+
+def _grouped_quantile(values: np.ndarray, codes: np.ndarray, starts: np.ndarray,
+                      counts: np.ndarray, q: float) -> np.ndarray:
+    """Per-group linear-interpolated quantile, matching pandas/NumPy semantics
+    
+    Rows must already be contiguous by group; values are sorted within each
+    group and interpolated with NumPy's two-sided lerp so thresholds are
+    bit-identical to Series.quantile.
+    """
+    ranked = values[np.lexsort((values, codes))]
+    position = q * (counts - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, counts - 1)
+    fraction = position - lower
+    
+    a = ranked[starts + lower]
+    b = ranked[starts + upper]
+    diff = b - a
+    return np.where(fraction >= 0.5, b - diff * (1 - fraction), a + diff * fraction)
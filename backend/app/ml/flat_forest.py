@@ -0,0 +1,247 @@
+import json
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# One .npy file per node array so each can be memory-mapped independently
+NODE_ARRAYS = ['feature', 'threshold', 'left', 'right', 'value', 'roots']
+
+# Optional pickled sklearn estimator, used only for large batches
+ESTIMATOR_FILE = "estimator.joblib"
+
+# Above these batch sizes sklearn's per-tree Cython traversal beats the
+# flat-array paths (see scripts/benchmark_forest_inference.py)
+COMPILED_MAX_ROWS = 2048
+NUMPY_MAX_ROWS = 256
+
+# Rows per parallel work unit in the compiled kernel
+ROW_BLOCK = 256
+
+_compiled_traverse = None
+
+
+def _load_compiled_traverse() -> Optional[Callable]:
+    """JIT-compile the traversal kernel with numba if it is installed"""
+    global _compiled_traverse
+
+    if _compiled_traverse is None:
+        try:
+            import numba
+        except ImportError:
+            logger.info("numba not installed, FlatForest uses the vectorized NumPy traversal")
+            _compiled_traverse = False
+            return None
+
+        # Row blocks are spread over cores; within a block each tree is walked
+        # for every row and its leaf distribution added in estimator order
+        @numba.njit(cache=True, nogil=True, parallel=True)
+        def traverse(X, feature, threshold, left, right, value, roots):
+            n_rows = X.shape[0]
+            totals = np.zeros((n_rows, value.shape[1]))
+            for block in numba.prange((n_rows + ROW_BLOCK - 1) // ROW_BLOCK):
+                start = block * ROW_BLOCK
+                stop = min(start + ROW_BLOCK, n_rows)
+                for t in range(len(roots)):
+                    for i in range(start, stop):
+                        node = roots[t]
+                        while left[node] != -1:
+                            if X[i, feature[node]] <= threshold[node]:
+                                node = left[node]
+                            else:
+                                node = right[node]
+                        for c in range(value.shape[1]):
+                            totals[i, c] += value[node, c]
+            return totals
+
+        _compiled_traverse = traverse
+
+    return _compiled_traverse or None
+
+
+class FlatForest:
+    """Random forest flattened into contiguous node arrays
+
+    All trees share one set of arrays; child indices are global and each
+    tree starts at roots[i]. Leaves have left == right == -1 and value holds
+    the normalised class distribution of every node. The arrays can be
+    saved as plain .npy files and memory-mapped read-only, so every worker
+    process serves from the same page-cache copy. The source estimator is
+    kept alongside for large batches, where sklearn is faster; a loaded
+    forest only unpickles it the first time such a batch arrives.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, value: np.ndarray, roots: np.ndarray,
+                 feature_names: List[str], classes: List, estimator=None,
+                 estimator_path: Optional[Path] = None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.feature_names = feature_names
+        self.classes = classes
+        self._estimator = estimator
+        self._estimator_path = estimator_path
+
+    @classmethod
+    def from_estimator(cls, model, feature_names: List[str]) -> 'FlatForest':
+        """Flatten a fitted sklearn RandomForestClassifier"""
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, -1, tree.children_left + offset))
+            rights.append(np.where(is_leaf, -1, tree.children_right + offset))
+
+            node_values = tree.value[:, 0, :]
+            values.append(node_values / node_values.sum(axis=1, keepdims=True))
+
+            offset += tree.node_count
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.int32),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.int32),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.int32),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            feature_names=list(feature_names),
+            classes=model.classes_.tolist(),
+            estimator=model
+        )
+
+    def save(self, path: str):
+        """Write the forest as one .npy file per node array plus metadata.json"""
+
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for name in NODE_ARRAYS:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+
+        if self.estimator is not None:
+            import joblib
+            joblib.dump(self.estimator, directory / ESTIMATOR_FILE)
+
+        metadata = {
+            'format_version': FORMAT_VERSION,
+            'feature_names': self.feature_names,
+            'classes': self.classes,
+            'n_estimators': len(self.roots),
+            'n_nodes': len(self.feature)
+        }
+        with open(directory / "metadata.json", 'w') as f:
+            json.dump(metadata, f, indent=2)
+
+        logger.info(f"Saved FlatForest ({metadata['n_estimators']} trees, {metadata['n_nodes']} nodes) to {directory}")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'FlatForest':
+        """Load a saved forest, memory-mapping the node arrays read-only by default"""
+
+        directory = Path(path)
+        with open(directory / "metadata.json", 'r') as f:
+            metadata = json.load(f)
+
+        if metadata.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported FlatForest format version: {metadata.get('format_version')}")
+
+        mmap_mode = 'r' if mmap else None
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in NODE_ARRAYS}
+
+        return cls(feature_names=metadata['feature_names'], classes=metadata['classes'],
+                   estimator_path=directory / ESTIMATOR_FILE, **arrays)
+
+    @property
+    def estimator(self):
+        """sklearn estimator for large batches, unpickled on first use if saved"""
+        if self._estimator is None and self._estimator_path is not None:
+            path, self._estimator_path = self._estimator_path, None
+            if path.exists():
+                import joblib
+                self._estimator = joblib.load(path)
+                logger.info(f"Loaded sklearn estimator for large FlatForest batches from {path}")
+        return self._estimator
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the node arrays"""
+        return sum(getattr(self, name).nbytes for name in NODE_ARRAYS)
+
+    def predict_proba(self, X: np.ndarray, compiled: Optional[bool] = None) -> np.ndarray:
+        """Class probabilities averaged over all trees
+
+        Uses the numba-compiled kernel when numba is installed (compiled=None)
+        and otherwise the vectorized NumPy traversal. With compiled=None,
+        batches larger than COMPILED_MAX_ROWS / NUMPY_MAX_ROWS go to the
+        sklearn estimator when one is available. Inputs are cast to float32
+        and tree outputs are summed in estimator order, as sklearn does, so
+        results are bit-identical to the original estimator.
+        """
+
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        traverse = _load_compiled_traverse() if compiled is not False else None
+        if compiled and traverse is None:
+            raise RuntimeError("Compiled FlatForest traversal requires numba")
+
+        if compiled is None:
+            max_rows = COMPILED_MAX_ROWS if traverse is not None else NUMPY_MAX_ROWS
+            if len(X) > max_rows and self.estimator is not None:
+                return self.estimator.predict_proba(X)
+
+        if traverse is not None:
+            totals = traverse(X, self.feature, self.threshold, self.left, self.right, self.value, self.roots)
+        else:
+            totals = self.value[self._traverse_vectorized(X)].sum(axis=0)
+
+        return totals / len(self.roots)
+
+    def _traverse_vectorized(self, X: np.ndarray) -> np.ndarray:
+        """Leaf index of every (tree, row) pair, shape (n_trees, n_rows)
+
+        All pairs are traversed at once: each step advances every pair that
+        has not reached a leaf by one level with gathers on the node arrays,
+        so the Python loop runs max-depth times rather than once per tree.
+        """
+
+        n_rows, n_trees = len(X), len(self.roots)
+
+        # Tree-major layout so the final reduction runs over the outer axis
+        node = np.repeat(self.roots.astype(np.intp), n_rows)
+        row = np.tile(np.arange(n_rows), n_trees)
+
+        active = np.flatnonzero(self.left[node] != -1)
+        while active.size:
+            current = node[active]
+            go_left = X[row[active], self.feature[current]] <= self.threshold[current]
+            node[active] = np.where(go_left, self.left[current], self.right[current])
+            active = active[self.left[node[active]] != -1]
+
+        return node.reshape(n_trees, n_rows)
+
+    def metadata(self) -> Dict:
+        """Summary of the loaded forest"""
+        return {
+            'n_estimators': len(self.roots),
+            'n_nodes': len(self.feature),
+            'nbytes': self.nbytes,
+            'memory_mapped': isinstance(self.feature, np.memmap)
+        }
@@ -1,94 +1,150 @@
 
-import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
-from peft import PeftModel
 import logging
-from typing import Dict, List
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from app.config import settings
+from .compliance_rules import SAFETY_STANDARDS, ComplianceRuleEngine
+from .model_registry import ModelRegistry, model_registry
+from .prefix_cache import PrefixCache
+from .response_cache import ResponseCache, response_cache
+from .streaming import stream_generate
 
 logger = logging.getLogger(__name__)
 
 class LLaMAFactoryModel:
     """LLaMA-Factory fine-tuned ERNIE 4.5 for technical veracity"""
     
-    def __init__(self, model_path: str = "./models/weights/astra-grid-llamafactory"):
+    PROMPT_PREFIX = """### Instruction: Review the Network Analyst's report against safety protocols and electrical standards. Identify regulatory violations or safety hazards.
+
+"""
+    
+    GENERATION_KWARGS = {
+        'max_new_tokens': 512,
+        'temperature': 0.3,
+        'top_p': 0.95
+    }
+    
+    def __init__(self, model_path: str = "./models/weights/astra-grid-llamafactory",
+                 registry: Optional[ModelRegistry] = None,
+                 cache: Optional[ResponseCache] = None,
+                 rule_engine: Optional[ComplianceRuleEngine] = None,
+                 use_prefix_cache: bool = settings.LLM_PREFIX_CACHE):
         self.model_path = model_path
+        self.adapter_name = Path(model_path).name
+        self.registry = registry or model_registry
+        self.cache = cache or response_cache
+        self.prefix_cache = PrefixCache(self.PROMPT_PREFIX) if use_prefix_cache else None
+        self.rule_engine = rule_engine or ComplianceRuleEngine()
+        self.path_counts = Counter({'rules': 0, 'llm': 0})
         self.model = None
         self.tokenizer = None
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        logger.info(f"Initializing LLaMAFactoryModel on {self.device}")
-        
-        self.safety_standards = {
-            'OSHA 1910.269': 'Electric Power Generation, Transmission, and Distribution',
-            'IEEE C2-2023': 'National Electrical Safety Code',
-            'NFPA 70E': 'Electrical Safety in the Workplace',
-            'IEC 61850': 'Communication Networks and Systems for Power Utility Automation',
-            'IEEE 802.3': 'Ethernet Standards for Data Centers'
-        }
+        logger.info("Initializing LLaMAFactoryModel")
+        
+        self.safety_standards = dict(SAFETY_STANDARDS)
         
+    @property
+    def device(self):
+        """Inference device of the shared registry's backend"""
+        return self.registry.device
+    
     def load_model(self):
-        """Load SFT model with prompt masking"""
+        """Attach the LoRA adapter to the shared base model"""
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                "ERNIE-4.5-21B",
-                trust_remote_code=True
-            )
-            
-            base_model = AutoModelForCausalLM.from_pretrained(
-                "ERNIE-4.5-21B",
-                load_in_4bit=True,
-                device_map="auto",
-                trust_remote_code=True,
-                use_flash_attention_2=True
-            )
-            
-            self.model = PeftModel.from_pretrained(
-                base_model,
-                self.model_path
-            )
+            self.tokenizer, self.model = self.registry.load_adapter(self.adapter_name, self.model_path)
             
-            self.model.eval()
-            logger.info("LLaMAFactoryModel loaded successfully")
+            logger.info(f"LLaMAFactoryModel loaded successfully on {self.device}")
             
         except Exception as e:
             logger.error(f"Error loading LLaMAFactoryModel: {e}")
             raise
     
     def validate_compliance(self, component_data: Dict, analyst_report: Dict) -> Dict:
-        """Validate against safety codes and regulations"""
+        """Validate against safety codes and regulations
         
-        prompt = f"""### Instruction: Review the Network Analyst's report against safety protocols and electrical standards. Identify regulatory violations or safety hazards.
-
-### Input: 
+        Clear-cut components are settled by the rule engine; only ambiguous
+        ones run a generation.
+        """
+        
+        violations = self.rule_engine.resolve(component_data, analyst_report)
+        if violations is not None:
+            self.path_counts['rules'] += 1
+            return self._build_result(component_data, violations, None, "ComplianceRuleEngine")
+        
+        self.path_counts['llm'] += 1
+        response = self._generate(self._build_prompt(component_data, analyst_report))
+        
+        violations = self._extract_violations(response, analyst_report)
+        
+        return self._build_result(component_data, violations, response, "LLaMAFactory-ERNIE-4.5")
+    
+    def stream_compliance(self, component_data: Dict, analyst_report: Dict) -> Iterator[str]:
+        """Yield the compliance review for a component as it is generated"""
+        return self.stream_generate(self._build_prompt(component_data, analyst_report))
+    
+    def stream_generate(self, prompt: str, cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        """Yield completion text chunks for one prompt as tokens are produced"""
+        return stream_generate(
+            self.registry, self.adapter_name, self.tokenizer, prompt, self.device,
+            self.GENERATION_KWARGS, prefix_cache=self.prefix_cache, cancel=cancel
+        )
+    
+    def _build_prompt(self, component_data: Dict, analyst_report: Dict) -> str:
+        """Build the compliance review prompt for a component"""
+        
+        return self.PROMPT_PREFIX + f"""### Input: 
 Component: {component_data.get('component_id')}
 Status: {component_data.get('status')}
 Risk Category: {analyst_report.get('risk_category')}
 Risk Score: {analyst_report.get('risk_score')}
 
 ### Response:"""
-
-        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.device)
-        
-        with torch.no_grad():
-            outputs = self.model.generate(
-                **inputs,
-                max_new_tokens=512,
-                temperature=0.3,
-                top_p=0.95
-            )
-        
-        response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        
-        violations = self._extract_violations(response, analyst_report)
-        
+    
+    def _build_result(self, component_data: Dict, violations: List[Dict],
+                      response: Optional[str], model_type: str) -> Dict:
+        """Compliance result in the shape returned by both validation paths"""
         return {
             "component_id": component_data.get('component_id'),
             "violations": violations,
             "compliant": len(violations) == 0,
             "regulatory_citations": [v['regulation'] for v in violations],
             "model_response": response,
-            "model_type": "LLaMAFactory-ERNIE-4.5"
+            "model_type": model_type,
+            "validation_path": "llm" if response is not None else "rules"
         }
     
+    def _generate(self, prompt: str) -> str:
+        """Generate a response, serving repeated prompts from the cache"""
+        
+        cacheable = self.cache.is_cacheable(self.GENERATION_KWARGS)
+        if cacheable:
+            key = self.cache.make_key(prompt, self.adapter_name, self.GENERATION_KWARGS)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        import torch
+        
+        with torch.inference_mode(), self.registry.adapter(self.adapter_name) as model:
+            if self.prefix_cache is not None and self.prefix_cache.matches([prompt]):
+                inputs = self.prefix_cache.prepare(model, self.tokenizer, [prompt], self.device)
+            else:
+                inputs = self.tokenizer(prompt, return_tensors="pt").to(self.device)
+            
+            outputs = model.generate(
+                **inputs,
+                **self.GENERATION_KWARGS
+            )
+        
+        response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        
+        if cacheable:
+            self.cache.put(key, response)
+        
+        return response
+    
     def _extract_violations(self, response: str, analyst_report: Dict) -> List[Dict]:
         """Extract violations from model response"""
         violations = []
@@ -111,4 +167,18 @@ Risk Score: {analyst_report.get('risk_score')}
         for comp, report in zip(components, analyst_reports):
             result = self.validate_compliance(comp, report)
             results.append(result)
+        
+        paths = Counter(result['validation_path'] for result in results)
+        logger.info(
+            f"Validated {len(results)} components: {paths['rules']} by rules, {paths['llm']} by LLM"
+        )
         return results
+    
+    def validation_metrics(self) -> Dict:
+        """How many components each validation path has handled"""
+        total = self.path_counts['rules'] + self.path_counts['llm']
+        return {
+            'rules': self.path_counts['rules'],
+            'llm': self.path_counts['llm'],
+            'rules_fraction': self.path_counts['rules'] / total if total else 0.0
+        }
@@ -0,0 +1,249 @@
+import ctypes
+import gc
+import os
+import threading
+import warnings
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Tuple
+import logging
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from peft import PeftModel
+
+logger = logging.getLogger(__name__)
+
+# "auto" picks cuda when a GPU is visible and cpu-int8 otherwise
+INFERENCE_BACKENDS = ("auto", "cuda", "cpu", "cpu-int8")
+
+
+class ModelRegistry:
+    """Loads the ERNIE base model once and serves every LoRA adapter from it
+
+    UnslothModel and LLaMAFactoryModel register their adapters by name; the
+    first registration loads the tokenizer and base weights, later ones only
+    attach an adapter to the same PeftModel. Adapter switching mutates the
+    shared model, so generation runs inside adapter(), which holds a lock
+    for the duration of the call.
+
+    The cuda backend loads 4-bit weights with flash attention. The CPU
+    backends load float32 weights and size torch's thread pools to the
+    cores this process may use; cpu-int8 additionally swaps every linear
+    layer outside the LoRA adapters for a dynamically quantized int8 one.
+    """
+
+    def __init__(self, base_model_name: str = settings.ERNIE_BASE_MODEL,
+                 backend: str = settings.INFERENCE_BACKEND,
+                 num_threads: int = settings.CPU_NUM_THREADS, **load_kwargs):
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}', expected one of {INFERENCE_BACKENDS}")
+
+        self.base_model_name = base_model_name
+        self.backend = backend
+        self.num_threads = num_threads
+        self.load_kwargs = load_kwargs
+        self._resolved_backend: Optional[str] = None
+        self.tokenizer = None
+        self.model: Optional['PeftModel'] = None
+        self.adapters: Dict[str, str] = {}
+
+        self._load_lock = threading.Lock()
+        self._generate_lock = threading.RLock()
+
+    @property
+    def resolved_backend(self) -> str:
+        """The concrete backend, with "auto" resolved on first use"""
+        if self._resolved_backend is None:
+            if self.backend == "auto":
+                import torch
+
+                self._resolved_backend = "cuda" if torch.cuda.is_available() else "cpu-int8"
+            else:
+                self._resolved_backend = self.backend
+        return self._resolved_backend
+
+    @property
+    def device(self):
+        """Device inputs must be moved to for the resolved backend"""
+        import torch
+
+        return torch.device("cuda" if self.resolved_backend == "cuda" else "cpu")
+
+    def _default_load_kwargs(self) -> Dict:
+        if self.resolved_backend == "cuda":
+            return {
+                'load_in_4bit': True,
+                'device_map': "auto",
+                'use_flash_attention_2': True
+            }
+
+        import torch
+
+        return {'torch_dtype': torch.float32, 'low_cpu_mem_usage': True}
+
+    def _configure_threads(self):
+        """Size torch's intra- and inter-op pools to the cores this process may run on"""
+        import torch
+
+        num_threads = self.num_threads or (
+            len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+        )
+        torch.set_num_threads(num_threads)
+        try:
+            torch.set_num_interop_threads(max(1, min(4, num_threads // 4)))
+        except RuntimeError:
+            # Only settable before the first parallel op; keep what is there
+            pass
+        logger.info(f"CPU inference using {torch.get_num_threads()} threads")
+
+    def _quantize_linear_layers(self):
+        """Swap linear layers outside the LoRA adapters for dynamic int8 ones
+
+        LoRA layers keep their float base weights so adapters still attach
+        and switch; additional adapters must target the same modules as
+        the first one.
+        """
+        import torch
+
+        # torch.ao.quantization warns that it is moving to torchao, which is not a dependency
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            from torch.ao.quantization import quantize_dynamic
+
+            lora_parents = {
+                name.rsplit('.', 1)[0] for name, _ in self.model.named_modules()
+                if name.endswith('.base_layer')
+            }
+            targets = {
+                name for name, module in self.model.named_modules()
+                if type(module) is torch.nn.Linear and name not in lora_parents
+                and '.base_layer' not in name and '.lora_' not in name
+            }
+            if targets:
+                quantize_dynamic(
+                    self.model, qconfig_spec=targets, dtype=torch.qint8,
+                    mapping={torch.nn.Linear: _adapter_safe_int8_linear()}, inplace=True
+                )
+
+                # Weights that stay float may be views of the memory-mapped
+                # checkpoint; copying them lets the mapping, and the float
+                # weights of the quantized layers read through it, be released
+                for param in self.model.parameters():
+                    param.data = param.data.clone()
+                _release_freed_memory()
+
+        logger.info(f"Quantized {len(targets)} linear layers to int8")
+
+    def load_adapter(self, adapter_name: str, adapter_path: str) -> Tuple[object, 'PeftModel']:
+        """Attach an adapter (loading the base model on first use) and return (tokenizer, model)"""
+
+        with self._load_lock:
+            if adapter_name in self.adapters:
+                return self.tokenizer, self.model
+
+            if self.model is None:
+                from transformers import AutoModelForCausalLM, AutoTokenizer
+                from peft import PeftModel
+
+                if self.resolved_backend != "cuda":
+                    self._configure_threads()
+
+                logger.info(f"Loading shared base model {self.base_model_name} ({self.resolved_backend})")
+                self.tokenizer = AutoTokenizer.from_pretrained(
+                    self.base_model_name,
+                    trust_remote_code=True
+                )
+                base_model = AutoModelForCausalLM.from_pretrained(
+                    self.base_model_name,
+                    trust_remote_code=True,
+                    **(self.load_kwargs or self._default_load_kwargs())
+                )
+                self.model = PeftModel.from_pretrained(base_model, adapter_path, adapter_name=adapter_name)
+                self.model.eval()
+            else:
+                self.model.load_adapter(adapter_path, adapter_name=adapter_name)
+
+            if self.resolved_backend == "cpu-int8":
+                self._quantize_linear_layers()
+
+            self.adapters[adapter_name] = adapter_path
+            logger.info(f"Adapter '{adapter_name}' attached from {adapter_path}")
+
+        return self.tokenizer, self.model
+
+    @contextmanager
+    def adapter(self, adapter_name: str) -> Iterator['PeftModel']:
+        """Activate an adapter for the duration of a generate call"""
+
+        if adapter_name not in self.adapters:
+            raise KeyError(f"Adapter '{adapter_name}' is not loaded")
+
+        with self._generate_lock:
+            if self.model.active_adapter != adapter_name:
+                self.model.set_adapter(adapter_name)
+            yield self.model
+
+    def memory_footprint(self) -> Dict:
+        """Parameter memory of the shared model, split into base and adapters"""
+
+        if self.model is None:
+            return {'base_bytes': 0, 'adapter_bytes': 0, 'adapters': []}
+
+        adapter_bytes = sum(
+            p.numel() * p.element_size() for n, p in self.model.named_parameters() if 'lora_' in n
+        )
+        total_bytes = sum(p.numel() * p.element_size() for p in self.model.parameters())
+        # Dynamically quantized layers keep packed weights outside parameters()
+        for module in self.model.modules():
+            if hasattr(module, '_packed_params') and callable(getattr(module, 'weight', None)):
+                weight, bias = module.weight(), module.bias()
+                total_bytes += weight.numel() * weight.element_size()
+                total_bytes += bias.numel() * bias.element_size() if bias is not None else 0
+        return {
+            'base_bytes': total_bytes - adapter_bytes,
+            'adapter_bytes': adapter_bytes,
+            'adapters': list(self.adapters)
+        }
+
+
+def _release_freed_memory():
+    """Return memory freed by quantization to the OS where glibc allows it"""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def _adapter_safe_int8_linear():
+    """Dynamically quantized linear layer that survives adapter loads
+
+    PEFT attaches adapters with load_state_dict(strict=False), which visits
+    every module; stock quantized layers then fail on the scale and
+    weights that an adapter checkpoint does not carry. This subclass feeds
+    its own weights back when its keys are absent, so the packed-params
+    child repacks what it already holds. Built on first use so importing
+    the registry does not import torch.
+    """
+    global _Int8Linear
+    if _Int8Linear is None:
+        from torch.ao.nn.quantized.dynamic import Linear
+
+        class AdapterSafeInt8Linear(Linear):
+            def _load_from_state_dict(self, state_dict, prefix, *args):
+                if prefix + 'scale' in state_dict:
+                    super()._load_from_state_dict(state_dict, prefix, *args)
+                    return
+
+                weight, bias = self._weight_bias()
+                state_dict[prefix + '_packed_params.weight'] = weight
+                state_dict[prefix + '_packed_params.bias'] = bias
+
+        _Int8Linear = AdapterSafeInt8Linear
+    return _Int8Linear
+
+
+_Int8Linear = None
+
+model_registry = ModelRegistry()
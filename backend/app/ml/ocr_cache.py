@@ -0,0 +1,156 @@
+import copy
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def dhash(image: np.ndarray, hash_size: int = 16, min_step: int = 2) -> int:
+    """Difference hash: which neighbouring cells of a (hash_size+1) x hash_size thumbnail get brighter
+
+    A bit is only set when the step exceeds min_step gray levels, so flat
+    label background hashes to zeros instead of to sensor noise. Robust to
+    rescaling, recompression, noise and small exposure changes; edits
+    smaller than a cell (a single changed digit) are not seen.
+    """
+    import cv2
+
+    # Point-sample down to ~16 pixels per cell first; area-averaging a full
+    # frame straight to a few cells is several times slower
+    height, width = image.shape[:2]
+    step = max(1, min(height, width) // (hash_size * 16))
+    if step > 1:
+        image = cv2.resize(image, (width // step, height // step), interpolation=cv2.INTER_NEAREST)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGRA2GRAY if small.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+    small = small.astype(np.int16)
+    bits = (small[:, 1:] - small[:, :-1] > min_step).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return (a ^ b).bit_count()
+
+
+class OCRResultCache:
+    """Perceptual-hash cache of OCR results, one entry per component
+
+    Each component keeps the dHash of its last scanned image and the OCR
+    result for it. A new image whose hash is within max_distance bits is
+    treated as the same label and served the stored result. Entries live
+    in an in-memory LRU bounded by max_entries; when disk_path is set they
+    are also written to a SQLite file so they survive restarts, and memory
+    misses fall through to it and promote what they find. Components whose
+    label is known to have changed should be invalidated, since a small
+    edit to the text can stay within max_distance.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_distance: int = 4, disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+
+        self._entries: "OrderedDict[str, Tuple[int, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._disk: Optional[sqlite3.Connection] = None
+        if disk_path:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_results "
+                "(component_id TEXT PRIMARY KEY, image_hash TEXT, result TEXT, updated_at REAL)"
+            )
+            self._disk.commit()
+
+    def get(self, component_id: str, image_hash: int) -> Optional[Dict]:
+        """Stored result for the component if its image is within max_distance bits, else None"""
+        with self._lock:
+            entry = self._entries.get(component_id)
+            if entry is None and self._disk is not None:
+                row = self._disk.execute(
+                    "SELECT image_hash, result FROM ocr_results WHERE component_id = ?", (component_id,)
+                ).fetchone()
+                if row is not None:
+                    entry = (int(row[0], 16), json.loads(row[1]))
+                    self._store(component_id, *entry)
+                    if hamming(entry[0], image_hash) <= self.max_distance:
+                        self.disk_hits += 1
+
+            if entry is not None and hamming(entry[0], image_hash) <= self.max_distance:
+                self._entries.move_to_end(component_id)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+
+            self.misses += 1
+            return None
+
+    def put(self, component_id: str, image_hash: int, result: Dict):
+        """Store the result for the component's latest image in memory and, if enabled, on disk"""
+        with self._lock:
+            self._store(component_id, image_hash, copy.deepcopy(result))
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO ocr_results (component_id, image_hash, result, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (component_id, f"{image_hash:x}", json.dumps(result), time.time())
+                )
+                self._disk.commit()
+
+    def _store(self, component_id: str, image_hash: int, result: Dict):
+        self._entries[component_id] = (image_hash, result)
+        self._entries.move_to_end(component_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, component_id: str):
+        """Forget a component's stored result in both tiers"""
+        with self._lock:
+            self._entries.pop(component_id, None)
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM ocr_results WHERE component_id = ?", (component_id,))
+                self._disk.commit()
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM ocr_results")
+                self._disk.commit()
+
+    def metrics(self) -> Dict:
+        """Hit/miss counters and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+ocr_cache = OCRResultCache(
+    max_entries=settings.OCR_CACHE_MAX_ENTRIES,
+    max_distance=settings.OCR_CACHE_MAX_DISTANCE,
+    disk_path=settings.OCR_CACHE_PATH or None
+)
@@ -0,0 +1,96 @@
+import copy
+from typing import TYPE_CHECKING, Dict, List, Optional
+import logging
+
+if TYPE_CHECKING:
+    import torch
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixCache:
+    """Precomputed key/value cache for a fixed prompt prefix
+
+    Every prompt of a wrapper starts with the same instruction block, so its
+    keys and values are computed once (with the wrapper's adapter active)
+    and each request only prefills its own suffix. Batched suffixes are
+    left-padded after the prefix; the attention mask hides the padding and
+    position ids follow the mask, so outputs match full-prompt generation.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.prefix_ids: Optional['torch.Tensor'] = None
+        self.past_key_values = None
+
+    def matches(self, prompts: List[str]) -> bool:
+        """Whether every prompt can reuse the cached prefix"""
+        return all(prompt.startswith(self.prefix) for prompt in prompts)
+
+    def build(self, model, tokenizer, device: 'torch.device'):
+        """Run the prefix through the model once and keep its key/value cache"""
+        import torch
+
+        inputs = tokenizer(self.prefix, return_tensors="pt").to(device)
+
+        with torch.inference_mode():
+            outputs = model(**inputs, use_cache=True)
+
+        self.prefix_ids = inputs['input_ids'][0]
+        self.past_key_values = outputs.past_key_values
+        logger.info(f"Prefix cache built for {len(self.prefix_ids)} prompt tokens")
+
+    def prepare(self, model, tokenizer, prompts: List[str], device: 'torch.device') -> Dict:
+        """generate() inputs for prompts that reuse the cached prefix
+
+        The prefix cache is built on first use; callers must hold the
+        adapter the cache belongs to active while calling this.
+        """
+        import torch
+
+        if self.past_key_values is None:
+            self.build(model, tokenizer, device)
+
+        suffixes = [
+            tokenizer(prompt[len(self.prefix):], add_special_tokens=False)['input_ids']
+            for prompt in prompts
+        ]
+        longest = max(len(suffix) for suffix in suffixes)
+        prefix = self.prefix_ids.tolist()
+
+        input_ids, attention_mask = [], []
+        for suffix in suffixes:
+            padding = longest - len(suffix)
+            input_ids.append(prefix + [tokenizer.pad_token_id] * padding + suffix)
+            attention_mask.append([1] * len(prefix) + [0] * padding + [1] * len(suffix))
+
+        return {
+            'input_ids': torch.tensor(input_ids, device=device),
+            'attention_mask': torch.tensor(attention_mask, device=device),
+            'past_key_values': self._expand(len(prompts))
+        }
+
+    def _expand(self, batch_size: int):
+        """A copy of the prefix cache with each sequence repeated batch_size times
+
+        transformers before 4.36 (the pinned 4.35) returns the cache as
+        per-layer (key, value) tuples; later versions return a Cache
+        object, which generate() extends in place, so it is deep-copied.
+        Cache.batch_repeat_interleave only exists from 4.42 on; in between
+        the repeat goes through the legacy tuple format.
+        """
+        past_key_values = self.past_key_values
+        if isinstance(past_key_values, tuple):
+            return tuple(tuple(tensor.repeat_interleave(batch_size, dim=0) for tensor in layer)
+                         for layer in past_key_values)
+
+        if hasattr(past_key_values, 'batch_repeat_interleave'):
+            past_key_values = copy.deepcopy(past_key_values)
+            if batch_size > 1:
+                past_key_values.batch_repeat_interleave(batch_size)
+            return past_key_values
+
+        legacy = past_key_values.to_legacy_cache()
+        return type(past_key_values).from_legacy_cache(
+            tuple(tuple(tensor.repeat_interleave(batch_size, dim=0) for tensor in layer) for layer in legacy)
+        )
@@ -0,0 +1,165 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+
+from app.config import settings
+from app.utils.helpers import calculate_hash
+
+logger = logging.getLogger(__name__)
+
+# Puts between sweeps of the disk tier
+PRUNE_EVERY = 256
+
+
+class ResponseCache:
+    """Content-addressed cache for LLM generations
+
+    Entries are keyed by the SHA-256 of the prompt, adapter and generation
+    parameters, kept in an in-memory LRU bounded by max_entries, and expire
+    ttl_seconds after they were written. When disk_path is set, entries are
+    also written to a SQLite file so they survive restarts; memory misses
+    fall through to it and promote what they find. Expired rows are deleted
+    when read and swept every PRUNE_EVERY puts, which also trims the file to
+    the max_disk_entries rows that expire last.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0,
+                 disk_path: Optional[str] = None, cache_sampled: bool = False,
+                 max_disk_entries: int = 65536):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_sampled = cache_sampled
+
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self._puts_since_prune = 0
+
+        self._disk: Optional[sqlite3.Connection] = None
+        if disk_path:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT, expires_at REAL)"
+            )
+            self._disk.execute("CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)")
+            with self._lock:
+                self._prune_disk(time.time())
+
+    def make_key(self, prompt: str, adapter: str, generation_kwargs: Dict) -> str:
+        """Hash of everything that determines the generated text"""
+        params = json.dumps(generation_kwargs, sort_keys=True)
+        return calculate_hash(f"{adapter}\x00{params}\x00{prompt}")
+
+    def is_cacheable(self, generation_kwargs: Dict) -> bool:
+        """Sampled generations are only cached when explicitly opted in"""
+        return self.cache_sampled or not generation_kwargs.get('do_sample', False)
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for key, or None if absent or expired"""
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                response, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._entries[key]
+
+            if self._disk is not None:
+                row = self._disk.execute(
+                    "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._store(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+                if row is not None:
+                    self._disk.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._disk.commit()
+                    self.disk_evictions += 1
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: str):
+        """Store a response in memory and, if enabled, on disk"""
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+
+        with self._lock:
+            self._store(key, response, expires_at)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, expires_at) VALUES (?, ?, ?)",
+                    (key, response, expires_at)
+                )
+                self._puts_since_prune += 1
+                if self._puts_since_prune >= PRUNE_EVERY:
+                    self._prune_disk(now)
+                else:
+                    self._disk.commit()
+
+    def _prune_disk(self, now: float):
+        """Delete expired rows, then the soonest-expiring rows beyond max_disk_entries"""
+        expired = self._disk.execute("DELETE FROM responses WHERE expires_at <= ?", (now,)).rowcount
+        overflow = self._disk.execute(
+            "DELETE FROM responses WHERE key IN "
+            "(SELECT key FROM responses ORDER BY expires_at LIMIT max((SELECT COUNT(*) FROM responses) - ?, 0))",
+            (self.max_disk_entries,)
+        ).rowcount
+        self._disk.commit()
+        self._puts_since_prune = 0
+        self.disk_evictions += expired + overflow
+
+    def _store(self, key: str, response: str, expires_at: float):
+        self._entries[key] = (response, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM responses")
+                self._disk.commit()
+
+    def metrics(self) -> Dict:
+        """Hit/miss counters and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'disk_evictions': self.disk_evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+response_cache = ResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    disk_path=settings.LLM_CACHE_PATH or None,
+    max_disk_entries=settings.LLM_CACHE_MAX_DISK_ENTRIES,
+    cache_sampled=settings.LLM_CACHE_SAMPLED
+)
@@ -0,0 +1,151 @@
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Block font size relative to the page's body text, largest first
+LAYOUT_SIZE_RATIOS = (('title', 2.5), ('heading', 1.8), ('subtitle', 1.3))
+# Body size assumed when a page has too little running text to tell (e.g. a lone heading)
+BODY_FONT_SIZE = 12.0
+LIST_MARKERS = ("•", "·", "▪", "◦", "–", "-", "*")
+
+# Per-process state of schematic page workers, set up by init_page_worker
+_worker: Dict = {}
+
+
+def _pymupdf():
+    """PyMuPDF (shipped with PaddleOCR), lazily imported under either name"""
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+    return pymupdf
+
+
+def open_pdf(pdf_path: Optional[str]):
+    """Open a PDF, or create an empty one when pdf_path is None"""
+    pymupdf = _pymupdf()
+    if hasattr(pymupdf, "no_recommend_layout"):
+        pymupdf.no_recommend_layout()
+    return pymupdf.open(pdf_path)
+
+
+def init_page_worker(pdf_path: str, dpi: int, model_path: str, load_ocr: bool):
+    """Open the document and an OCR model once per worker process"""
+    from app.ml.paddle_ocr_model import PaddleOCRModel
+
+    model = PaddleOCRModel(model_path=model_path)
+    if load_ocr:
+        model.load_model()
+    _worker.update(document=open_pdf(pdf_path), dpi=dpi, model=model)
+
+
+def process_page(page_index: int) -> Dict:
+    """Layout of one page of the worker's document"""
+    return extract_page_layout(_worker['document'][page_index], _worker['model'], _worker['dpi'])
+
+
+def extract_page_layout(page, model, dpi: int) -> Dict:
+    """Layout elements, images and tables of one page, in PDF points
+
+    Pages with a text layer are laid out from it directly; pages without
+    one (scans) are rasterized at dpi and run through OCR. Either way the
+    page is only rasterized if it is actually needed.
+    """
+    pymupdf = _pymupdf()
+    # Image blocks would carry each embedded image's decoded bytes
+    blocks = page.get_text("dict", flags=pymupdf.TEXTFLAGS_DICT & ~pymupdf.TEXT_PRESERVE_IMAGES)["blocks"]
+    text_blocks = [block for block in blocks if block.get("type") == 0 and _block_text(block)]
+
+    if text_blocks:
+        elements = _classify_text_blocks(text_blocks)
+    else:
+        elements = _ocr_page(page, model, dpi)
+
+    layout = {
+        'page_number': page.number + 1,
+        'layout_elements': elements,
+        'text_blocks': [],
+        'images': [
+            {'bbox': _round_bbox(info['bbox']), 'width': info['width'], 'height': info['height']}
+            for info in page.get_image_info()
+        ],
+        'tables': _find_tables(page)
+    }
+    # MuPDF's resource store otherwise keeps the decoded fonts and images of every page seen
+    pymupdf.TOOLS.store_shrink(100)
+    return layout
+
+
+def _block_text(block: Dict) -> str:
+    return " ".join(
+        "".join(span["text"] for span in line["spans"]).strip() for line in block["lines"]
+    ).strip()
+
+
+def _block_font_size(block: Dict) -> float:
+    return max(span["size"] for line in block["lines"] for span in line["spans"])
+
+
+def _classify_text_blocks(blocks: List[Dict]) -> List[Dict]:
+    """Type each text block by its font size relative to the page's body text"""
+    sizes = [_block_font_size(block) for block in blocks]
+    body = min(float(np.median(sizes)), BODY_FONT_SIZE)
+
+    elements = []
+    for block, size in zip(blocks, sizes):
+        text = _block_text(block)
+        if text.startswith(LIST_MARKERS):
+            kind = 'list_item'
+        else:
+            kind = next((name for name, ratio in LAYOUT_SIZE_RATIOS if size >= ratio * body), 'paragraph')
+        elements.append({
+            'type': kind,
+            'text': text,
+            'confidence': 1.0,
+            'bbox': _round_bbox(block["bbox"]),
+            'font_size': round(size, 1)
+        })
+    return elements
+
+
+def _ocr_page(page, model, dpi: int) -> List[Dict]:
+    """Rasterize a page and OCR it into 'text' elements"""
+    import cv2
+
+    pixmap = page.get_pixmap(dpi=dpi)
+    image = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.width, pixmap.n)
+    image = cv2.cvtColor(image, cv2.COLOR_RGBA2BGR if pixmap.n == 4 else cv2.COLOR_RGB2BGR)
+    result = model._recognize_batch([model._preprocess(image)])[0][0]
+
+    points = 72.0 / dpi
+    elements = []
+    for detail in result['details']:
+        box = np.asarray(detail['bbox'], dtype=np.float64) * points
+        x0, y0 = box.min(axis=0)
+        x1, y1 = box.max(axis=0)
+        elements.append({
+            'type': 'text',
+            'text': detail['text'],
+            'confidence': detail['confidence'],
+            'bbox': _round_bbox((x0, y0, x1, y1)),
+            'font_size': round(float(y1 - y0), 1)
+        })
+    return elements
+
+
+def _find_tables(page) -> List[Dict]:
+    """Ruled tables on the page, where this PyMuPDF version can find them"""
+    if not hasattr(page, "find_tables"):
+        return []
+    try:
+        return [{'bbox': _round_bbox(table.bbox), 'rows': table.extract()} for table in page.find_tables().tables]
+    except Exception as e:
+        logger.warning(f"Table detection failed on page {page.number + 1}: {e}")
+        return []
+
+
+def _round_bbox(bbox) -> List[float]:
+    return [round(float(v), 1) for v in bbox]
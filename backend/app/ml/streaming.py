@@ -0,0 +1,127 @@
+import queue
+import threading
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
+import logging
+
+if TYPE_CHECKING:
+    from .model_registry import ModelRegistry
+    from .prefix_cache import PrefixCache
+
+logger = logging.getLogger(__name__)
+
+
+class TokenStreamer:
+    """generate() streamer that hands out decoded text one token at a time
+
+    transformers' TextIteratorStreamer holds text back until a word
+    boundary, which delays the first frame by a whole word. Here every
+    put() releases the newly decoded text, holding back only a trailing
+    incomplete UTF-8 sequence. The first put() (the prompt) is skipped.
+    """
+
+    _END = object()
+
+    def __init__(self, tokenizer, timeout: Optional[float] = None):
+        self.tokenizer = tokenizer
+        self.timeout = timeout
+        self.queue: queue.Queue = queue.Queue()
+        self.token_ids = []
+        self.emitted = 0
+        self.prompt_seen = False
+
+    def put(self, value):
+        if not self.prompt_seen:
+            self.prompt_seen = True
+            return
+
+        self.token_ids.extend(value.reshape(-1).tolist())
+        self._release(final=False)
+
+    def end(self):
+        self._release(final=True)
+        self.queue.put(self._END)
+
+    def _release(self, final: bool):
+        text = self.tokenizer.decode(self.token_ids, skip_special_tokens=True)
+        if not final and text.endswith("\ufffd"):
+            return
+        if len(text) > self.emitted:
+            self.queue.put(text[self.emitted:])
+            self.emitted = len(text)
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            chunk = self.queue.get(timeout=self.timeout)
+            if chunk is self._END:
+                return
+            yield chunk
+
+
+def _cancel_criteria(cancel: threading.Event):
+    """StoppingCriteria that ends generate() at the next token once cancel is set"""
+    import torch
+    from transformers import StoppingCriteria
+
+    class Cancelled(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return torch.full((input_ids.shape[0],), cancel.is_set(), dtype=torch.bool, device=input_ids.device)
+
+    return Cancelled()
+
+
+def stream_generate(registry: 'ModelRegistry', adapter_name: str, tokenizer, prompt: str, device,
+                    generation_kwargs: Dict, prefix_cache: Optional['PrefixCache'] = None,
+                    timeout: Optional[float] = None, cancel: Optional[threading.Event] = None) -> Iterator[str]:
+    """Yield decoded text chunks of one generation as the tokens are produced
+
+    generate() runs on a background thread that holds the adapter for the
+    whole call and feeds a TokenStreamer; the caller consumes the
+    streamer, so the first chunk arrives after the prefill and one decode
+    step instead of after the full generation. Only the completion is
+    yielded, not the prompt. Errors raised by generate() are re-raised
+    here once the stream ends.
+
+    Setting cancel, or closing this iterator early, stops generate() at
+    the next token and frees the adapter for other requests.
+    """
+    streamer = TokenStreamer(tokenizer, timeout=timeout)
+    cancel = cancel or threading.Event()
+    errors = []
+
+    def run():
+        import torch
+        from transformers import StoppingCriteriaList
+
+        stopping_criteria = StoppingCriteriaList(generation_kwargs.get('stopping_criteria') or [])
+        stopping_criteria.append(_cancel_criteria(cancel))
+
+        try:
+            with torch.inference_mode(), registry.adapter(adapter_name) as model:
+                if prefix_cache is not None and prefix_cache.matches([prompt]):
+                    inputs = prefix_cache.prepare(model, tokenizer, [prompt], device)
+                else:
+                    inputs = tokenizer(prompt, return_tensors="pt").to(device)
+
+                model.generate(
+                    **inputs,
+                    **{**generation_kwargs, 'stopping_criteria': stopping_criteria},
+                    pad_token_id=tokenizer.pad_token_id,
+                    streamer=streamer
+                )
+        except Exception as e:
+            logger.error(f"Streaming generation failed for adapter '{adapter_name}': {e}")
+            errors.append(e)
+            streamer.end()
+
+    thread = threading.Thread(target=run, name=f"stream-{adapter_name}", daemon=True)
+    thread.start()
+
+    try:
+        yield from streamer
+    finally:
+        # Stops generate() if the consumer went away before the end
+        cancel.set()
+
+    thread.join()
+    if errors:
+        raise errors[0]
@@ -0,0 +1,157 @@
+import math
+from typing import Dict, List, Optional
+
+
+class P2Quantile:
+    """Bounded-memory streaming quantile estimate (P-square algorithm)
+
+    Keeps five markers regardless of how many observations are added, so
+    updates and lookups are O(1). Exact for the first five observations.
+    """
+
+    def __init__(self, q: float):
+        self.q = q
+        self.count = 0
+        self._heights: List[float] = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5]
+        self._increments = [0, q / 2, q, (1 + q) / 2, 1]
+
+    def add(self, x: float):
+        """Add an observation"""
+        self.count += 1
+
+        if self.count <= 5:
+            self._heights.append(x)
+            self._heights.sort()
+            return
+
+        h = self._heights
+        n = self._positions
+
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= h[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in range(1, 4):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = self._parabolic(i, d)
+                if h[i - 1] < candidate < h[i + 1]:
+                    h[i] = candidate
+                else:
+                    h[i] = h[i] + d * (h[i + d] - h[i]) / (n[i + d] - n[i])
+                n[i] += d
+
+    def _parabolic(self, i: int, d: int) -> float:
+        h = self._heights
+        n = self._positions
+        return h[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> float:
+        """Current quantile estimate (NaN before any observation)"""
+        if self.count == 0:
+            return math.nan
+
+        if self.count <= 5:
+            position = self.q * (self.count - 1)
+            lower = int(math.floor(position))
+            upper = min(lower + 1, self.count - 1)
+            fraction = position - lower
+            return self._heights[lower] + (self._heights[upper] - self._heights[lower]) * fraction
+
+        return self._heights[2]
+
+
+class RunningMoments:
+    """Welford running mean and sample variance"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x: float):
+        """Add an observation"""
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1), NaN until two observations"""
+        if self.count < 2:
+            return math.nan
+        return math.sqrt(self._m2 / (self.count - 1))
+
+
+class StreamingFeatureState:
+    """Per-component O(1) accumulator for FailurePredictor temporal features
+
+    Mirrors FailurePredictor._extract_temporal_features without keeping the
+    history. Mean, std and trend are exact; current spikes are counted as
+    readings above the running 95th-percentile estimate at the time they
+    arrive, so the count approximates the full-history recount. Spikes are
+    not counted until enough readings exist for the quantile to mean
+    anything (1 / (1 - q), i.e. 20 for the 95th percentile).
+    """
+
+    def __init__(self, spike_quantile: float = 0.95):
+        self.temperature = RunningMoments()
+        self.voltage = RunningMoments()
+        self.current_quantile = P2Quantile(spike_quantile)
+        self.first_temperature: Optional[float] = None
+        self.last_temperature: Optional[float] = None
+        self.current_spikes = 0
+        self._spike_warmup = math.ceil(1 / (1 - spike_quantile))
+
+    def update(self, reading: Dict):
+        """Fold a single telemetry reading into the state"""
+        temperature = reading.get('temperature_c')
+        if temperature is not None:
+            if self.first_temperature is None:
+                self.first_temperature = temperature
+            self.last_temperature = temperature
+            self.temperature.add(temperature)
+
+        voltage = reading.get('voltage_v')
+        if voltage is not None:
+            self.voltage.add(voltage)
+
+        current = reading.get('current_a')
+        if current is not None:
+            self.current_quantile.add(current)
+            threshold = self.current_quantile.value()
+            if (self.current_quantile.count >= self._spike_warmup
+                    and current > threshold and not math.isclose(current, threshold)):
+                self.current_spikes += 1
+
+    def features(self) -> Dict:
+        """Feature dict in the shape produced by _extract_temporal_features"""
+        if self.temperature.count == 0:
+            return {}
+
+        return {
+            'temp_mean': self.temperature.mean,
+            'temp_std': self.temperature.std,
+            'temp_trend': (self.last_temperature - self.first_temperature) / self.temperature.count,
+            'voltage_stability': self.voltage.std,
+            'current_spikes': self.current_spikes
+        }
@@ -1,74 +1,182 @@
 
-import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
-from peft import PeftModel
 import logging
-from typing import Dict, List
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from app.config import settings
+from .batching import MicroBatcher
+from .model_registry import ModelRegistry, model_registry
+from .prefix_cache import PrefixCache
+from .response_cache import ResponseCache, response_cache
+from .streaming import stream_generate
 
 logger = logging.getLogger(__name__)
 
 class UnslothModel:
     """Unsloth fine-tuned ERNIE 4.5 for structural reasoning"""
     
-    def __init__(self, model_path: str = "./models/weights/astra-grid-unsloth"):
+    PROMPT_PREFIX = """### Instruction: Analyze the following electrical schematic. Identify all circuit breakers and their current status based on the OCR markers. Generate a Markdown table for the Astra-Grid dashboard.
+
+"""
+    
+    GENERATION_KWARGS = {
+        'max_new_tokens': 512,
+        'temperature': 0.7,
+        'top_p': 0.9,
+        'do_sample': True
+    }
+    
+    def __init__(self, model_path: str = "./models/weights/astra-grid-unsloth",
+                 max_batch_size: int = settings.LLM_MAX_BATCH_SIZE,
+                 max_batch_wait_ms: float = settings.LLM_MAX_BATCH_WAIT_MS,
+                 registry: Optional[ModelRegistry] = None,
+                 cache: Optional[ResponseCache] = None,
+                 use_prefix_cache: bool = settings.LLM_PREFIX_CACHE):
         self.model_path = model_path
+        self.adapter_name = Path(model_path).name
+        self.registry = registry or model_registry
+        self.cache = cache or response_cache
+        self.prefix_cache = PrefixCache(self.PROMPT_PREFIX) if use_prefix_cache else None
         self.model = None
         self.tokenizer = None
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        logger.info(f"Initializing UnslothModel on {self.device}")
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait_ms = max_batch_wait_ms
+        self.batcher: Optional[MicroBatcher] = None
+        logger.info("Initializing UnslothModel")
         
+    @property
+    def device(self):
+        """Inference device of the shared registry's backend"""
+        return self.registry.device
+    
     def load_model(self):
-        """Load 4-bit quantized model with LoRA"""
+        """Attach the LoRA adapter to the shared base model"""
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                "ERNIE-4.5-21B",
-                trust_remote_code=True
-            )
-            
-            base_model = AutoModelForCausalLM.from_pretrained(
-                "ERNIE-4.5-21B",
-                load_in_4bit=True,
-                device_map="auto",
-                trust_remote_code=True
-            )
-            
-            self.model = PeftModel.from_pretrained(
-                base_model,
-                self.model_path
-            )
+            self.tokenizer, self.model = self.registry.load_adapter(self.adapter_name, self.model_path)
             
-            self.model.eval()
-            logger.info("UnslothModel loaded successfully")
+            self._prepare_tokenizer()
+            logger.info(f"UnslothModel loaded successfully on {self.device}")
             
         except Exception as e:
             logger.error(f"Error loading UnslothModel: {e}")
             raise
     
+    def _prepare_tokenizer(self):
+        """Left-pad so every prompt in a batch ends right where generation starts"""
+        self.tokenizer.padding_side = "left"
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+    
+    def start_batching(self):
+        """Route predict_failure through a micro-batching queue
+        
+        Concurrent callers (API workers, agent tasks) are grouped for up to
+        max_batch_wait_ms and served by one batched generate call.
+        """
+        if self.batcher is None:
+            self.batcher = MicroBatcher(
+                self._generate_batch,
+                max_batch_size=self.max_batch_size,
+                max_wait_ms=self.max_batch_wait_ms,
+                name="unsloth"
+            )
+    
+    def stop_batching(self):
+        """Drain the queue and fall back to direct generation"""
+        if self.batcher is not None:
+            self.batcher.close()
+            self.batcher = None
+    
+    def batching_metrics(self) -> Dict:
+        """Queue depth and batch-size metrics of the micro-batching queue"""
+        return self.batcher.metrics() if self.batcher is not None else {}
+    
     def predict_failure(self, component_data: Dict) -> Dict:
         """Predict component failure using structural reasoning"""
         
-        prompt = f"""### Instruction: Analyze the following electrical schematic. Identify all circuit breakers and their current status based on the OCR markers. Generate a Markdown table for the Astra-Grid dashboard.
-
-### Input: Component ID: {component_data.get('component_id')}
+        prompt = self._build_prompt(component_data)
+        
+        if self.batcher is not None:
+            response = self.batcher(prompt)
+        else:
+            response = self._generate_batch([prompt])[0]
+        
+        return self._build_result(component_data, response)
+    
+    def stream_failure(self, component_data: Dict) -> Iterator[str]:
+        """Yield the structural analysis for a component as it is generated"""
+        return self.stream_generate(self._build_prompt(component_data))
+    
+    def stream_generate(self, prompt: str, cancel: Optional[threading.Event] = None) -> Iterator[str]:
+        """Yield completion text chunks for one prompt as tokens are produced
+        
+        Streams bypass the micro-batching queue and the response cache so
+        the first chunk is not held back by other requests.
+        """
+        return stream_generate(
+            self.registry, self.adapter_name, self.tokenizer, prompt, self.device,
+            self.GENERATION_KWARGS, prefix_cache=self.prefix_cache, cancel=cancel
+        )
+    
+    def _build_prompt(self, component_data: Dict) -> str:
+        """Build the structural reasoning prompt for a component"""
+        
+        return self.PROMPT_PREFIX + f"""### Input: Component ID: {component_data.get('component_id')}
 Status: {component_data.get('status')}
 Temperature: {component_data.get('temperature')}°C
 Voltage: {component_data.get('voltage')}V
 Last Maintenance: {component_data.get('last_maintenance')}
 
 ### Response:"""
-
-        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.device)
+    
+    def _generate_batch(self, prompts: List[str]) -> List[str]:
+        """Generate responses for several prompts, serving repeats from the cache
+        
+        Sampled generations are only cached when the cache opts in to them.
+        """
         
-        with torch.no_grad():
-            outputs = self.model.generate(
+        if not self.cache.is_cacheable(self.GENERATION_KWARGS):
+            return self._generate_uncached(prompts)
+        
+        keys = [self.cache.make_key(prompt, self.adapter_name, self.GENERATION_KWARGS) for prompt in prompts]
+        responses = [self.cache.get(key) for key in keys]
+        
+        pending = [i for i, response in enumerate(responses) if response is None]
+        if pending:
+            generated = self._generate_uncached([prompts[i] for i in pending])
+            for i, response in zip(pending, generated):
+                responses[i] = response
+                self.cache.put(keys[i], response)
+        
+        return responses
+    
+    def _generate_uncached(self, prompts: List[str]) -> List[str]:
+        """Run one padded, left-aligned generate call over several prompts
+        
+        With the prefix cache enabled only the per-component suffixes are
+        prefilled; the shared instruction block comes from the cached
+        keys and values.
+        """
+        
+        import torch
+        
+        with torch.inference_mode(), self.registry.adapter(self.adapter_name) as model:
+            if self.prefix_cache is not None and self.prefix_cache.matches(prompts):
+                inputs = self.prefix_cache.prepare(model, self.tokenizer, prompts, self.device)
+            else:
+                inputs = self.tokenizer(prompts, return_tensors="pt", padding=True).to(self.device)
+            
+            outputs = model.generate(
                 **inputs,
-                max_new_tokens=512,
-                temperature=0.7,
-                top_p=0.9,
-                do_sample=True
+                **self.GENERATION_KWARGS,
+                pad_token_id=self.tokenizer.pad_token_id
             )
         
-        response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+    
+    def _build_result(self, component_data: Dict, response: str) -> Dict:
+        """Turn a model response into a failure prediction"""
         
         risk_score = self._extract_risk_score(response)
         
@@ -91,7 +199,8 @@ Last Maintenance: {component_data.get('last_maintenance')}
     def batch_predict(self, components: List[Dict]) -> List[Dict]:
         """Batch prediction for multiple components"""
         results = []
-        for comp in components:
-            result = self.predict_failure(comp)
-            results.append(result)
+        for i in range(0, len(components), self.max_batch_size):
+            chunk = components[i:i + self.max_batch_size]
+            responses = self._generate_batch([self._build_prompt(comp) for comp in chunk])
+            results.extend(self._build_result(comp, response) for comp, response in zip(chunk, responses))
         return results
@@ -27,8 +27,10 @@ class ScanResult(Base):
     id = Column(Integer, primary_key=True, index=True)
     scan_id = Column(String, unique=True, index=True)
     sector = Column(String)
+    status = Column(String, index=True, default="completed")
     components_scanned = Column(Integer)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     scan_data = Column(JSON)
 
 class FailurePrediction(Base):
@@ -50,4 +52,5 @@ class AgentLog(Base):
     action = Column(String)
     log_level = Column(String)
     timestamp = Column(DateTime, default=datetime.utcnow)
-    metadata = Column(JSON)
+    # 'metadata' is reserved on declarative classes; the column keeps its name
+    log_metadata = Column("metadata", JSON)
@@ -1,28 +1,163 @@
-
-from typing import Dict
+from typing import AsyncIterator, Dict, List, Optional
 import asyncio
+from contextlib import aclosing
+import time
+
+from app.config import settings
+from app.ml.compliance_rules import ComplianceRuleEngine
+from app.services.agent_workflow import WorkflowDAG
+from app.services.broadcast_hub import BroadcastHub, agent_topic, broadcast_hub, sector_topic
+from app.services.ernie_service import ERNIEService
+from app.services.ocr_service import OCRService
+
 class AgentService:
-def init(self):
-self.agents = {
-"scout": None,
-"analyst": None,
-"auditor": None,
-"orchestrator": None
-}
-async def process_scan(self, scan_data: Dict) -> Dict:
-    """Process scan data through multi-agent system"""
-    await asyncio.sleep(0.1)
-    return {"status": "processed"}
-
-async def execute_workflow(self, sector: str) -> Dict:
-    """Execute complete agent workflow"""
-    return {
-        "sector": sector,
-        "workflow_status": "completed",
-        "violations": 0,
-        "components_analyzed": 18
-    }
-
-async def process_command(self, command: Dict) -> Dict:
-    """Process command from WebSocket"""
-    return {"status": "executed", "result": {}}
+    def __init__(self, ernie_service: Optional[ERNIEService] = None,
+                 rule_engine: Optional[ComplianceRuleEngine] = None, scout: Optional[OCRService] = None,
+                 hub: Optional[BroadcastHub] = None):
+        self.ernie_service = ernie_service or ERNIEService()
+        self.rule_engine = rule_engine or ComplianceRuleEngine()
+        # The Scout's eyes: the RDK X5 scanner behind OCRService
+        self.scout = scout or OCRService()
+        # Dashboards following an agent or sector receive each result as it is produced
+        self.hub = hub or broadcast_hub
+        self.agents = {
+            "scout": None,
+            "analyst": None,
+            "auditor": None,
+            "orchestrator": None
+        }
+
+    async def process_scan(self, scan_data: Dict) -> Dict:
+        """Process scan data through multi-agent system"""
+        await asyncio.sleep(0.1)
+        return {"status": "processed"}
+
+    async def predict_component(self, component: Dict) -> Dict:
+        """Analyst step for one component: its failure risk"""
+        analysis = await self.ernie_service.analyze_failure(component)
+        report = {"risk_score": analysis["risk_score"], "risk_category": analysis["category"].capitalize()}
+        self.hub.publish([agent_topic("analyst")], {"type": "analysis", "component_id": component.get("id"), **report},
+                         key=("analysis", component.get("id")))
+        return report
+
+    async def audit_component(self, component: Dict, analyst_report: Dict) -> Dict:
+        """Auditor step for one component
+
+        Clear-cut cases are settled by the rule engine; the rest are
+        flagged for review by the compliance LLM.
+        """
+        component_data = {**component, "component_id": component.get("id")}
+        violations = self.rule_engine.resolve(component_data, analyst_report)
+        audit = {"violations": violations or [], "requires_review": violations is None}
+        self.hub.publish([agent_topic("auditor")], {"type": "audit", "component_id": component.get("id"), **audit},
+                         key=("audit", component.get("id")))
+        return audit
+
+    async def execute_workflow(self, sector: str) -> Dict:
+        """Execute complete agent workflow"""
+        return (await self.execute_workflows([sector]))[0]
+
+    async def execute_workflows(self, sectors: List[str]) -> List[Dict]:
+        """Run the Scout -> Analyst -> Auditor -> Orchestrator workflow for independent sectors in parallel
+
+        Each sector's Scout pass lists its components, then every
+        component gets its own Analyst and Auditor node, so components are
+        predicted and audited concurrently; the Orchestrator assembles the
+        sector once its audits are in. Concurrency per agent
+        (AGENT_CONCURRENCY) is bounded across all sectors together, and
+        every node is limited to its agent's AGENT_NODE_TIMEOUTS.
+        """
+        semaphores = {agent: asyncio.Semaphore(settings.AGENT_CONCURRENCY.get(agent, 1)) for agent in self.agents}
+        return list(await asyncio.gather(*(self._sector_workflow(sector, semaphores) for sector in sectors)))
+
+    async def _sector_workflow(self, sector: str, semaphores: Dict[str, asyncio.Semaphore]) -> Dict:
+        start = time.perf_counter()
+        timeouts = settings.AGENT_NODE_TIMEOUTS
+
+        scouting = WorkflowDAG()
+        scouting.add("scout", "scout", lambda _: self._scout(sector))
+        scouted = await scouting.run(semaphores, timeouts)
+        if "scout" not in scouted['results']:
+            return {
+                "sector": sector,
+                "workflow_status": "failed",
+                "violations": 0,
+                "components_analyzed": 0,
+                "errors": scouted['errors'],
+                "stage_timings": scouted['timings'],
+                "elapsed_seconds": time.perf_counter() - start
+            }
+
+        components = scouted['results']["scout"]
+        dag = WorkflowDAG()
+        audits = []
+        for component in components:
+            component_id = component["id"]
+            dag.add(f"analyst:{component_id}", "analyst",
+                    lambda _, component=component: self.predict_component(component))
+            dag.add(f"auditor:{component_id}", "auditor",
+                    lambda inputs, component=component, component_id=component_id:
+                    self.audit_component(component, inputs[f"analyst:{component_id}"]),
+                    deps=[f"analyst:{component_id}"])
+            audits.append(f"auditor:{component_id}")
+        dag.add("orchestrator", "orchestrator", lambda inputs: self._orchestrate(sector, components, inputs),
+                deps=audits, require_all=False)
+        outcome = await dag.run(semaphores, timeouts)
+
+        twin = outcome['results'].get("orchestrator", {})
+        errors = {**scouted['errors'], **outcome['errors']}
+        return {
+            "sector": sector,
+            "workflow_status": "completed_with_errors" if errors else "completed",
+            "violations": sum(len(entry["violations"]) for entry in twin.get("components", {}).values()),
+            "components_analyzed": sum(1 for name in audits if name in outcome['results']),
+            "requires_review": sum(1 for entry in twin.get("components", {}).values() if entry["requires_review"]),
+            "digital_twin": twin,
+            "errors": errors,
+            "stage_timings": {**scouted['timings'], **outcome['timings']},
+            "elapsed_seconds": time.perf_counter() - start
+        }
+
+    async def _scout(self, sector: str) -> List[Dict]:
+        """Scout step: the components the scanner finds in the sector"""
+        return [component async for component in self.scout.scan_components(sector)]
+
+    async def _orchestrate(self, sector: str, components: List[Dict], audits: Dict[str, Dict]) -> Dict:
+        """Orchestrator step: the sector's digital-twin state from the audits that completed"""
+        twin = {}
+        for component in components:
+            audit = audits.get(f"auditor:{component['id']}")
+            if audit is not None:
+                twin[component["id"]] = {
+                    "status": component.get("status"),
+                    "violations": audit["violations"],
+                    "requires_review": audit["requires_review"]
+                }
+        state = {"sector": sector, "components": twin}
+        self.hub.publish([sector_topic(sector), agent_topic("orchestrator")], {"type": "twin", **state},
+                         key=("twin", sector))
+        return state
+
+    async def process_command(self, command: Dict) -> Dict:
+        """Process command from WebSocket"""
+        return {"status": "executed", "result": {}}
+
+    async def stream_command(self, command: Dict) -> AsyncIterator[Dict]:
+        """Process a WebSocket command, yielding frames as they are produced
+
+        Commands carrying a prompt are answered with one 'token' frame per
+        generated chunk followed by a 'complete' frame with the full text;
+        anything else yields its process_command result as a single frame.
+        """
+        prompt = command.get("prompt")
+        if prompt is None:
+            yield {"type": "result", **await self.process_command(command)}
+            return
+
+        chunks = []
+        async with aclosing(await self.ernie_service.generate_response(prompt, stream=True)) as stream:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield {"type": "token", "index": len(chunks) - 1, "token": chunk}
+
+        yield {"type": "complete", "status": "executed", "response": "".join(chunks), "chunks": len(chunks)}
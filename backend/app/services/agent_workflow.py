@@ -0,0 +1,96 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class NodeSkipped(Exception):
+    """A node did not run because a dependency it requires failed"""
+
+
+class WorkflowDAG:
+    """Async task graph: each node starts as soon as its dependencies finish
+
+    Nodes belong to an agent ('scout', 'analyst', ...). Each agent's nodes
+    run under that agent's semaphore and timeout, so e.g. the analysts of
+    every component proceed concurrently but never more than the bound
+    at once. A node whose required dependency failed is skipped; nodes
+    added with require_all=False run on whatever succeeded. Cancelling
+    run() cancels every node still pending.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict] = {}
+
+    def add(self, name: str, agent: str, fn: Callable[[Dict[str, Any]], Awaitable[Any]],
+            deps: Iterable[str] = (), require_all: bool = True):
+        """Add a node; fn receives {dependency name: result} for the dependencies that succeeded"""
+        deps = tuple(deps)
+        missing = [dep for dep in deps if dep not in self.nodes]
+        if missing:
+            raise ValueError(f"Node {name} depends on unknown nodes {missing}")
+        self.nodes[name] = {'agent': agent, 'fn': fn, 'deps': deps, 'require_all': require_all}
+
+    async def run(self, semaphores: Dict[str, asyncio.Semaphore],
+                  timeouts: Optional[Dict[str, float]] = None) -> Dict:
+        """Run every node; returns results, errors and per-agent timing"""
+        timeouts = timeouts or {}
+        tasks: Dict[str, asyncio.Task] = {}
+        timings: Dict[str, List] = {}
+
+        async def execute(name: str, node: Dict):
+            if node['deps']:
+                await asyncio.wait([tasks[dep] for dep in node['deps']])
+            inputs, failed = {}, []
+            for dep in node['deps']:
+                if tasks[dep].cancelled() or tasks[dep].exception() is not None:
+                    failed.append(dep)
+                else:
+                    inputs[dep] = tasks[dep].result()
+            if failed and node['require_all']:
+                raise NodeSkipped(f"dependencies failed: {', '.join(failed)}")
+
+            agent = node['agent']
+            async with semaphores[agent]:
+                start = time.perf_counter()
+                try:
+                    return await asyncio.wait_for(node['fn'](inputs), timeouts.get(agent))
+                finally:
+                    timings.setdefault(agent, []).append((start, time.perf_counter()))
+
+        # Insertion order is a topological order: add() only accepts known dependencies
+        for name, node in self.nodes.items():
+            tasks[name] = asyncio.create_task(execute(name, node), name=f"workflow-{name}")
+        try:
+            await asyncio.wait(tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        results, errors = {}, {}
+        for name, task in tasks.items():
+            error = task.exception() if not task.cancelled() else asyncio.CancelledError()
+            if error is None:
+                results[name] = task.result()
+            else:
+                kind = "timeout" if isinstance(error, asyncio.TimeoutError) else \
+                    "skipped" if isinstance(error, NodeSkipped) else "error"
+                errors[name] = {'agent': self.nodes[name]['agent'], 'kind': kind, 'error': str(error) or kind}
+                if kind != "skipped":
+                    logger.warning(f"Workflow node {name} failed ({kind}): {error}")
+
+        return {'results': results, 'errors': errors, 'timings': self._summarize(timings)}
+
+    @staticmethod
+    def _summarize(timings: Dict[str, List]) -> Dict[str, Dict]:
+        summary = {}
+        for agent, spans in timings.items():
+            summary[agent] = {
+                'nodes': len(spans),
+                # From the first node starting to the last finishing, and the sum of node run times
+                'wall_seconds': max(end for _, end in spans) - min(start for start, _ in spans),
+                'busy_seconds': sum(end - start for start, end in spans)
+            }
+        return summary
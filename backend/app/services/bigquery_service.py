@@ -1,16 +1,115 @@
+from typing import Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.services.reference_store import ReferenceStore, SQLiteReferenceStore, normalize_serial
+from app.utils.bloom import BloomFilter
+
+# Reading fields compared against the reference record when both have them
+VALIDATED_FIELDS = ("component_id", "status", "component_type")
+# The Bloom filter is sized for this many times the serials it starts with, leaving room for later upserts
+BLOOM_HEADROOM = 2
 
-from typing import Dict, List
 class BigQueryService:
-def init(self):
-self.client = None
-async def validate_data(self, component_id: str, ocr_data: Dict) -> Dict:
-    """Validate OCR data against BigQuery"""
-    return {
-        "valid": True,
-        "confidence": 1.0,
-        "hallucination_detected": False
-    }
-
-async def query_components(self, filters: Dict) -> List[Dict]:
-    """Query components from BigQuery"""
-    return []
+    def __init__(self, store: Optional[ReferenceStore] = None):
+        self.client = None
+        # Reference records to validate against; without one validation is a pass-through
+        if store is None and settings.REFERENCE_STORE_PATH:
+            store = SQLiteReferenceStore(settings.REFERENCE_STORE_PATH)
+        self.store = store
+        self.known_serials: Optional[BloomFilter] = None
+        if store is not None:
+            store.add_listener(self._add_known_serials)
+
+    async def validate_data(self, component_id: str, ocr_data: Dict) -> Dict:
+        """Validate OCR data against BigQuery"""
+        if self.store is None:
+            return {
+                "valid": True,
+                "confidence": 1.0,
+                "hallucination_detected": False
+            }
+        return (await self.validate_many([{**ocr_data, "component_id": component_id}]))["results"][0]
+
+    async def validate_many(self, readings: List[Dict]) -> Dict:
+        """Validate a whole scan's OCR readings (serial, status, ...) against the reference records
+
+        Serials missing from the in-memory Bloom filter of known serials
+        are flagged as hallucinated without touching the store; the rest
+        are looked up in one query and each reading's fields are compared
+        with its record. Results are in the order of the readings.
+        """
+        if self.store is None:
+            results = [{"component_id": reading.get("component_id"), "serial": reading.get("serial"),
+                        "valid": True, "confidence": 1.0, "hallucination_detected": False, "mismatches": []}
+                       for reading in readings]
+            return {"results": results, "valid": len(results), "invalid": 0, "hallucinations": 0}
+
+        if self.known_serials is None:
+            await run_in_threadpool(self.load_known_serials)
+
+        serials = sorted({self._normalize(reading["serial"]) for reading in readings if reading.get("serial")})
+        lookups = [serial for serial, known in zip(serials, self.known_serials.contains_many(serials)) if known]
+        references = await run_in_threadpool(self.store.fetch, lookups) if lookups else {}
+
+        results = [self._check(reading, references) for reading in readings]
+        hallucinations = sum(result["hallucination_detected"] for result in results)
+        valid = sum(result["valid"] for result in results)
+        return {"results": results, "valid": valid, "invalid": len(results) - valid, "hallucinations": hallucinations}
+
+    def load_known_serials(self):
+        """(Re)build the Bloom filter of known serials from the store"""
+        known = BloomFilter(max(BLOOM_HEADROOM * self.store.count(), 1024), settings.REFERENCE_BLOOM_ERROR_RATE)
+        known.update(self._normalize(serial) for serial in self.store.serials())
+        self.known_serials = known
+
+    def _add_known_serials(self, serials: List[str]):
+        """Store listener: serials written after the filter was built join it"""
+        known = self.known_serials
+        if known is None:
+            # Built from the store on first validation, new serials included
+            return
+        if len(known) + len(serials) > known.capacity:
+            # Past its capacity the false-positive rate climbs; resize from the store instead
+            self.load_known_serials()
+        else:
+            known.update(self._normalize(serial) for serial in serials)
+
+    @staticmethod
+    def _normalize(value) -> str:
+        return normalize_serial(value)
+
+    def _check(self, reading: Dict, references: Dict[str, Dict]) -> Dict:
+        serial = reading.get("serial")
+        result = {"component_id": reading.get("component_id"), "serial": serial,
+                  "valid": False, "confidence": 0.0, "hallucination_detected": False, "mismatches": []}
+        if not serial:
+            result["mismatches"].append({"field": "serial", "ocr": None, "reference": None})
+            return result
+
+        reference = references.get(self._normalize(serial))
+        if reference is None:
+            # Not a serial this estate has: the OCR model made it up (or misread it beyond recognition)
+            result["hallucination_detected"] = True
+            return result
+
+        compared = 1
+        for field in VALIDATED_FIELDS:
+            if reading.get(field) is None or reference.get(field) is None:
+                continue
+            compared += 1
+            if self._normalize(reading[field]) != self._normalize(reference[field]):
+                result["mismatches"].append({"field": field, "ocr": reading[field], "reference": reference[field]})
+
+        result["valid"] = not result["mismatches"]
+        result["confidence"] = (compared - len(result["mismatches"])) / compared
+        return result
+
+    async def query_components(self, filters: Dict) -> List[Dict]:
+        """Query components from BigQuery"""
+        return []
+
+    async def store_scan_result(self, record: Dict) -> Dict:
+        """Persist one component's scan result to BigQuery"""
+        return {"stored": True, "component_id": record.get("id")}
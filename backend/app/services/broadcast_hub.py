@@ -0,0 +1,134 @@
+import asyncio
+import itertools
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def sector_topic(sector: str) -> str:
+    return f"sector:{sector}"
+
+
+def agent_topic(agent: str) -> str:
+    return f"agent:{agent}"
+
+
+class Subscription:
+    """One client's view of the hub: its topics and a bounded, coalescing outbox
+
+    Messages published with a key (e.g. a component id) replace any
+    undelivered message with the same key in place, so a client that
+    falls behind receives the latest state of each component once rather
+    than every intermediate update. When the outbox is full the oldest
+    message is dropped.
+    """
+
+    def __init__(self, topics: Iterable[str], buffer_size: int):
+        self.topics: Set[str] = set(topics)
+        self.buffer_size = buffer_size
+        self._outbox: "OrderedDict[Any, str]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._sequence = itertools.count()
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def offer(self, message: str, key: Optional[Any] = None):
+        """Queue an encoded message without blocking the publisher"""
+        if key is not None and key in self._outbox:
+            self._outbox[key] = message
+            self.coalesced += 1
+            return
+
+        if len(self._outbox) >= self.buffer_size:
+            self._outbox.popitem(last=False)
+            self.dropped += 1
+        self._outbox[key if key is not None else ("#", next(self._sequence))] = message
+        self._ready.set()
+
+    def pending(self) -> int:
+        return len(self._outbox)
+
+    async def get(self) -> str:
+        """Wait for and return the next encoded message"""
+        while not self._outbox:
+            self._ready.clear()
+            await self._ready.wait()
+        self.delivered += 1
+        return self._outbox.popitem(last=False)[1]
+
+
+class BroadcastHub:
+    """Topic pub/sub that fans each published event out to every subscriber
+
+    An event is JSON-encoded once, whatever the number of subscribers,
+    and handed to each subscription's outbox without awaiting anyone, so
+    a slow dashboard only ever delays itself. Topics are per sector
+    ('sector:<id>') and per agent ('agent:<name>'); a client subscribed to
+    several topics an event is published on receives it once. publish()
+    must be called from the event loop's thread.
+    """
+
+    def __init__(self, buffer_size: Optional[int] = None):
+        self.buffer_size = buffer_size or settings.BROADCAST_BUFFER_SIZE
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+
+    def subscribe(self, topics: Iterable[str] = ()) -> Subscription:
+        subscription = Subscription((), self.buffer_size)
+        self.add_topics(subscription, topics)
+        return subscription
+
+    def add_topics(self, subscription: Subscription, topics: Iterable[str]):
+        for topic in topics:
+            subscription.topics.add(topic)
+            self._topics.setdefault(topic, set()).add(subscription)
+
+    def remove_topics(self, subscription: Subscription, topics: Iterable[str]):
+        for topic in list(topics):
+            subscription.topics.discard(topic)
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[topic]
+
+    def unsubscribe(self, subscription: Subscription):
+        self.remove_topics(subscription, list(subscription.topics))
+
+    def publish(self, topics: Iterable[str], event: Dict, key: Optional[Any] = None) -> int:
+        """Send an event to the subscribers of any of the topics; returns how many it reached
+
+        Events with the same key coalesce in outboxes that have not caught
+        up yet, so key them by what they describe (e.g. the component id).
+        """
+        subscribers = set()
+        for topic in topics:
+            subscribers.update(self._topics.get(topic, ()))
+        if not subscribers:
+            return 0
+
+        message = json.dumps(event)
+        for subscription in subscribers:
+            subscription.offer(message, key)
+        self.published += 1
+        return len(subscribers)
+
+    def metrics(self) -> Dict:
+        subscriptions = set().union(*self._topics.values()) if self._topics else set()
+        return {
+            'published': self.published,
+            'topics': {topic: len(subscribers) for topic, subscribers in self._topics.items()},
+            'subscribers': len(subscriptions),
+            'pending': sum(subscription.pending() for subscription in subscriptions),
+            'coalesced': sum(subscription.coalesced for subscription in subscriptions),
+            'dropped': sum(subscription.dropped for subscription in subscriptions)
+        }
+
+
+broadcast_hub = BroadcastHub()
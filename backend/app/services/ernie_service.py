@@ -1,12 +1,38 @@
+import threading
+from typing import AsyncIterator, Dict, Optional, Union
+
+from fastapi.concurrency import iterate_in_threadpool
 
-from typing import Dict
 class ERNIEService:
-def init(self):
-self.model = None
-async def generate_response(self, prompt: str) -> str:
-    """Generate response using ERNIE model"""
-    return "Generated response"
-
-async def analyze_failure(self, data: Dict) -> Dict:
-    """Analyze failure patterns"""
-    return {"risk_score": 0.15, "category": "stable"}
+    def __init__(self, model: Optional[object] = None):
+        # Any loaded wrapper exposing stream_generate(prompt), e.g. UnslothModel
+        self.model = model
+
+    async def generate_response(self, prompt: str, stream: bool = False) -> Union[str, AsyncIterator[str]]:
+        """Generate response using ERNIE model
+
+        With stream=True an async iterator of text chunks is returned
+        instead, yielding each chunk as soon as the model produces it.
+        """
+        if stream:
+            return self.stream_response(prompt)
+        return "".join([chunk async for chunk in self.stream_response(prompt)])
+
+    async def stream_response(self, prompt: str) -> AsyncIterator[str]:
+        """Yield generated text chunks without blocking the event loop"""
+        if self.model is None:
+            yield "Generated response"
+            return
+
+        # The token iterator blocks between tokens, so it is advanced on the threadpool;
+        # if the consumer stops early (e.g. the WebSocket closed) generation is cancelled
+        cancel = threading.Event()
+        try:
+            async for chunk in iterate_in_threadpool(self.model.stream_generate(prompt, cancel=cancel)):
+                yield chunk
+        finally:
+            cancel.set()
+
+    async def analyze_failure(self, data: Dict) -> Dict:
+        """Analyze failure patterns"""
+        return {"risk_score": 0.15, "category": "stable"}
@@ -0,0 +1,136 @@
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Fields of a reference record, keyed by the component's serial number (stored upper-case)
+REFERENCE_FIELDS = ("serial", "component_id", "status", "component_type", "sector")
+
+
+def normalize_serial(serial) -> str:
+    """The form serials are stored and looked up in: stripped and upper-case"""
+    return str(serial).strip().upper()
+
+
+class ReferenceStore(ABC):
+    """Ground-truth component records that OCR readings are validated against
+
+    Implementations answer a whole batch of serials with one query. All
+    methods block; BigQueryService calls them on the threadpool. Stores
+    that can be written to call _notify with the serials they add, so
+    listeners such as the Bloom filter of known serials stay current.
+    """
+
+    def __init__(self):
+        self._listeners: List[Callable[[List[str]], None]] = []
+
+    def add_listener(self, listener: Callable[[List[str]], None]):
+        """Call listener with the serials of every later write"""
+        self._listeners.append(listener)
+
+    def _notify(self, serials: List[str]):
+        for listener in self._listeners:
+            listener(serials)
+
+    @abstractmethod
+    def fetch(self, serials: List[str]) -> Dict[str, Dict]:
+        """Reference records of the given serials that exist, keyed by serial"""
+
+    @abstractmethod
+    def serials(self) -> Iterator[str]:
+        """Every known serial, for the Bloom filter"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of reference records"""
+
+
+class SQLiteReferenceStore(ReferenceStore):
+    """Reference records in a local SQLite file, for offline use and tests"""
+
+    def __init__(self, path: str, table: str = "reference_components"):
+        super().__init__()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (serial TEXT PRIMARY KEY, component_id TEXT, status TEXT, "
+            "component_type TEXT, sector TEXT)"
+        )
+        self._db.commit()
+
+    def upsert(self, records: Iterable[Dict]):
+        """Insert or replace reference records"""
+        rows = [[record.get(field) for field in REFERENCE_FIELDS] for record in records]
+        for row in rows:
+            # Serials are matched upper-case, as BigQueryService normalizes what it looks up
+            row[0] = normalize_serial(row[0])
+        with self._lock:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(REFERENCE_FIELDS)}) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._db.commit()
+        self._notify([row[0] for row in rows])
+
+    def fetch(self, serials: List[str]) -> Dict[str, Dict]:
+        # One statement for any batch size: the serials travel as a single JSON array parameter
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(REFERENCE_FIELDS)} FROM {self.table} "
+                "WHERE serial IN (SELECT value FROM json_each(?))", (json.dumps(serials),)
+            ).fetchall()
+        return {row[0]: dict(zip(REFERENCE_FIELDS, row)) for row in rows}
+
+    def serials(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._db.execute(f"SELECT serial FROM {self.table}").fetchall()
+        return (row[0] for row in rows)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class BigQueryReferenceStore(ReferenceStore):
+    """Reference records in the BigQuery dataset"""
+
+    def __init__(self, table: str = "reference_components", client: Optional[object] = None):
+        super().__init__()
+        self.table = f"{settings.BIGQUERY_PROJECT}.{settings.BIGQUERY_DATASET}.{table}"
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google.cloud import bigquery
+
+            self._client = bigquery.Client(project=settings.BIGQUERY_PROJECT)
+        return self._client
+
+    def fetch(self, serials: List[str]) -> Dict[str, Dict]:
+        from google.cloud import bigquery
+
+        job = self.client.query(
+            # The table is written by other systems, so its serials are normalized here
+            f"SELECT {', '.join(REFERENCE_FIELDS)} FROM `{self.table}` WHERE UPPER(TRIM(serial)) IN UNNEST(@serials)",
+            job_config=bigquery.QueryJobConfig(
+                query_parameters=[bigquery.ArrayQueryParameter("serials", "STRING", serials)]
+            )
+        )
+        return {normalize_serial(row["serial"]): {field: row[field] for field in REFERENCE_FIELDS}
+                for row in job.result()}
+
+    def serials(self) -> Iterator[str]:
+        return (row["serial"] for row in self.client.query(f"SELECT serial FROM `{self.table}`").result())
+
+    def count(self) -> int:
+        return next(iter(self.client.query(f"SELECT COUNT(*) AS n FROM `{self.table}`").result()))["n"]
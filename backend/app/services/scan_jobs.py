@@ -0,0 +1,178 @@
+import asyncio
+import uuid
+from typing import Callable, Dict, List, Optional
+import logging
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models import ScanResult
+from app.services.scan_pipeline import ScanPipeline, ScanRun
+from app.services.scan_scheduler import ScanScheduler
+from app.utils.migrations import add_missing_columns
+
+logger = logging.getLogger(__name__)
+
+
+class ScanResultStore:
+    """Scan jobs' status and results, kept as ScanResult rows
+
+    Every method is a blocking database round trip; ScanJobQueue calls
+    them on the threadpool.
+    """
+
+    def __init__(self, session_factory: Optional[Callable] = None):
+        self._session_factory = session_factory
+
+    def _session(self):
+        if self._session_factory is None:
+            from app.utils.database import SessionLocal, engine
+
+            ScanResult.__table__.create(bind=engine, checkfirst=True)
+            # Tables from before scans were queued lack the status and updated_at columns
+            add_missing_columns(engine, ScanResult.__table__)
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def create(self, scan_id: str, sector: str, scan_data: Dict) -> Dict:
+        with self._session() as db:
+            row = ScanResult(scan_id=scan_id, sector=sector, status="queued", components_scanned=0,
+                             scan_data=scan_data)
+            db.add(row)
+            db.commit()
+            return self._to_dict(row)
+
+    def update(self, scan_id: str, status: str, components_scanned: Optional[int] = None,
+               scan_data: Optional[Dict] = None):
+        """Set a job's status, merging scan_data into what is stored"""
+        with self._session() as db:
+            row = db.query(ScanResult).filter_by(scan_id=scan_id).one()
+            row.status = status
+            if components_scanned is not None:
+                row.components_scanned = components_scanned
+            if scan_data:
+                # A new dict, so the JSON column registers the change
+                row.scan_data = {**(row.scan_data or {}), **scan_data}
+            db.commit()
+
+    def get(self, scan_id: str) -> Optional[Dict]:
+        with self._session() as db:
+            row = db.query(ScanResult).filter_by(scan_id=scan_id).one_or_none()
+            return self._to_dict(row) if row is not None else None
+
+    @staticmethod
+    def _to_dict(row: ScanResult) -> Dict:
+        return {
+            'scan_id': row.scan_id,
+            'sector': row.sector,
+            'status': row.status,
+            'components_scanned': row.components_scanned,
+            'submitted_at': row.timestamp.isoformat() if row.timestamp else None,
+            'updated_at': row.updated_at.isoformat() if row.updated_at else None,
+            **(row.scan_data or {})
+        }
+
+
+class ScanJobQueue:
+    """Scan requests as background jobs, polled through their ScanResult row
+
+    submit() records the job as 'queued' and returns at once; a fixed pool
+    of worker tasks takes jobs in ScanScheduler order (priority, fairness
+    between sectors, one scan per sector at a time) and runs each sector
+    through the scan pipeline, writing the components finished so far
+    back to the row as they arrive ('running'), then the final status.
+    Updates that pile up while a write is in flight are folded into the
+    next one.
+    """
+
+    def __init__(self, pipeline: Optional[ScanPipeline] = None, store: Optional[ScanResultStore] = None,
+                 workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.pipeline = pipeline or ScanPipeline()
+        self.store = store or ScanResultStore()
+        self.workers = workers or settings.SCAN_JOB_WORKERS
+        self.max_pending = max_pending or settings.SCAN_JOB_MAX_PENDING
+
+        self.scheduler: Optional[ScanScheduler] = None
+        # Slots claimed by submit() calls still writing their row, counted against max_pending
+        self._reserved = 0
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def pending(self) -> int:
+        return self.scheduler.pending if self.scheduler is not None else 0
+
+    async def start(self):
+        """Start the workers on the running event loop (rebuilt if the loop changed)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop = loop
+        self.scheduler = ScanScheduler(max_pending=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker(), name=f"scan-job-{index}") for index in range(self.workers)]
+        logger.info(f"ScanJobQueue started (workers={self.workers}, max_pending={self.max_pending})")
+
+    async def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.pipeline.stop()
+
+    async def submit(self, sector: str, priority: str = "medium") -> Dict:
+        """Record a scan job and queue it; raises asyncio.QueueFull past max_pending"""
+        await self.start()
+        # Check and claim a slot in one step, so concurrent submits cannot all pass the
+        # check and then find the scheduler full after their rows are written
+        if self.scheduler.pending + self._reserved >= self.max_pending:
+            raise asyncio.QueueFull(f"{self.max_pending} scan jobs already pending")
+        self._reserved += 1
+
+        scan_id = f"SCAN-{sector}-{uuid.uuid4().hex[:12]}"
+        try:
+            job = await run_in_threadpool(self.store.create, scan_id, sector,
+                                          {'priority': priority, 'components': [], 'errors': []})
+            try:
+                await self.scheduler.put(scan_id, sector, priority)
+            except Exception as e:
+                # Never leave a row that says queued for a job no worker will take
+                await run_in_threadpool(self.store.update, scan_id, "failed", scan_data={'error': str(e)})
+                raise
+        finally:
+            self._reserved -= 1
+        return job
+
+    async def get(self, scan_id: str) -> Optional[Dict]:
+        return await run_in_threadpool(self.store.get, scan_id)
+
+    async def _worker(self):
+        while True:
+            scan_id, sector = await self.scheduler.get()
+            try:
+                await self._run(scan_id, sector)
+            except Exception as e:
+                logger.error(f"Scan job {scan_id} failed: {e}")
+                try:
+                    await run_in_threadpool(self.store.update, scan_id, "failed", scan_data={'error': str(e)})
+                except Exception as store_error:
+                    logger.error(f"Could not record failure of scan job {scan_id}: {store_error}")
+            finally:
+                await self.scheduler.release(sector)
+
+    async def _run(self, scan_id: str, sector: str):
+        await run_in_threadpool(self.store.update, scan_id, "running")
+        run: ScanRun = await self.pipeline.submit(sector, scan_id)
+        while True:
+            await run.changed.wait()
+            run.changed.clear()
+            finished = run.done.is_set()
+            if finished:
+                status = "completed_with_errors" if run.errors or run.scan_error else "completed"
+            else:
+                status = "running"
+            # Copies: the pipeline keeps appending while the threadpool serializes
+            await run_in_threadpool(self.store.update, scan_id, status, run.scanned,
+                                    {'components': list(run.components), 'errors': list(run.errors),
+                                     'scan_error': run.scan_error})
+            if finished:
+                return
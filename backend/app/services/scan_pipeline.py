@@ -0,0 +1,256 @@
+import asyncio
+import itertools
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+import logging
+
+from app.config import settings
+from app.services.agent_service import AgentService
+from app.services.bigquery_service import BigQueryService
+from app.services.broadcast_hub import BroadcastHub, broadcast_hub, sector_topic
+from app.services.ocr_service import OCRService
+
+logger = logging.getLogger(__name__)
+
+# Component stages in flow order; 'scan' feeds them from sectors
+COMPONENT_STAGES = ("ocr", "prediction", "compliance", "persistence")
+STAGES = ("scan",) + COMPONENT_STAGES
+
+
+class StageMetrics:
+    """Counters of one pipeline stage"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.started_at = time.monotonic()
+
+    def record(self, seconds: float, failed: bool = False):
+        self.busy_seconds += seconds
+        if failed:
+            self.failed += 1
+        else:
+            self.processed += 1
+
+    def snapshot(self, queue: asyncio.Queue) -> Dict:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            'workers': self.workers,
+            'processed': self.processed,
+            'failed': self.failed,
+            'throughput_per_s': self.processed / elapsed,
+            'utilization': min(self.busy_seconds / (elapsed * self.workers), 1.0),
+            'queue_depth': queue.qsize(),
+            'queue_capacity': queue.maxsize
+        }
+
+
+class ScanRun:
+    """One sector scan in flight: the components it produced and how many have left the pipeline"""
+
+    def __init__(self, scan_id: str, sector: str):
+        self.scan_id = scan_id
+        self.sector = sector
+        self.scanned = 0
+        self.scan_finished = False
+        self.components: List[Dict] = []
+        # Components that failed a stage; a failure of the scan itself goes to scan_error
+        self.errors: List[Dict] = []
+        self.scan_error: Optional[str] = None
+        # Set on every component that leaves the pipeline, for callers following progress
+        self.changed = asyncio.Event()
+        self.done = asyncio.Event()
+
+    def finish_component(self, record: Dict, error: Optional[str] = None):
+        if error is None:
+            self.components.append(record)
+        else:
+            self.errors.append({'component_id': record.get('id'), 'error': error})
+        self._check_done()
+
+    def finish_scan(self, error: Optional[str] = None):
+        # Not one of the components, so it must not count towards those that left the pipeline
+        self.scan_error = error
+        self.scan_finished = True
+        self._check_done()
+
+    def _check_done(self):
+        self.changed.set()
+        if self.scan_finished and len(self.components) + len(self.errors) >= self.scanned:
+            self.done.set()
+
+    def result(self) -> Dict:
+        return {
+            'scan_id': self.scan_id,
+            'sector': self.sector,
+            'components_scanned': self.scanned,
+            'components': self.components,
+            'errors': self.errors,
+            'scan_error': self.scan_error
+        }
+
+
+class ScanPipeline:
+    """Staged asyncio pipeline that carries scanned components through OCR, prediction, compliance and persistence
+
+    Every stage has its own pool of worker tasks reading from a bounded
+    queue and writing to the next stage's. Components flow individually,
+    so a sector's first component can be persisted while the scanner is
+    still walking the rest; when a downstream stage falls behind its
+    queue fills and the put() upstream waits, which throttles everything
+    back to the scanner instead of buffering without bound. A component
+    that fails a stage is recorded on its scan and dropped.
+    """
+
+    def __init__(self, ocr_service: Optional[OCRService] = None, agent_service: Optional[AgentService] = None,
+                 bigquery_service: Optional[BigQueryService] = None, workers: Optional[Dict[str, int]] = None,
+                 queue_size: Optional[int] = None, hub: Optional[BroadcastHub] = None):
+        self.ocr_service = ocr_service or OCRService()
+        self.agent_service = agent_service or AgentService()
+        self.bigquery_service = bigquery_service or BigQueryService()
+        self.workers = {**settings.SCAN_PIPELINE_WORKERS, **(workers or {})}
+        self.queue_size = queue_size or settings.SCAN_PIPELINE_QUEUE_SIZE
+        self.hub = hub or broadcast_hub
+
+        self.handlers: Dict[str, Callable[[Dict], Awaitable[None]]] = {
+            'ocr': self._read,
+            'prediction': self._predict,
+            'compliance': self._audit,
+            'persistence': self._persist
+        }
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.stage_metrics: Dict[str, StageMetrics] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._scan_numbers = itertools.count(1)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Create the queues and worker tasks on the running event loop
+
+        Calling it again on the same loop is a no-op; on a different loop
+        (the previous one closed) the pipeline is rebuilt there.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._tasks = []
+        self._loop = loop
+
+        self.queues = {stage: asyncio.Queue(maxsize=self.queue_size) for stage in STAGES}
+        self.stage_metrics = {stage: StageMetrics(max(1, self.workers.get(stage, 1))) for stage in STAGES}
+        for stage in STAGES:
+            worker = self._scan_worker if stage == 'scan' else self._stage_worker
+            for index in range(self.stage_metrics[stage].workers):
+                self._tasks.append(asyncio.create_task(worker(stage), name=f"scan-pipeline-{stage}-{index}"))
+
+        logger.info(f"ScanPipeline started (workers={self.workers}, queue_size={self.queue_size})")
+
+    async def stop(self):
+        """Cancel the workers; work still queued is abandoned"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def submit(self, sector: str, scan_id: Optional[str] = None) -> ScanRun:
+        """Queue a sector for scanning, waiting while the scan queue is full"""
+        await self.start()
+        run = ScanRun(scan_id or f"SCAN-{sector}-{next(self._scan_numbers):03d}", sector)
+        await self.queues['scan'].put(run)
+        return run
+
+    async def run_sector(self, sector: str) -> Dict:
+        """Scan a sector and wait until each of its components has left the pipeline"""
+        run = await self.submit(sector)
+        await run.done.wait()
+        return run.result()
+
+    def metrics(self) -> Dict[str, Dict]:
+        """Per-stage throughput, utilization and queue depth"""
+        return {stage: self.stage_metrics[stage].snapshot(self.queues[stage]) for stage in self.stage_metrics}
+
+    async def _scan_worker(self, stage: str):
+        inbox, outbox, metrics = self.queues[stage], self.queues[COMPONENT_STAGES[0]], self.stage_metrics[stage]
+        while True:
+            run: ScanRun = await inbox.get()
+            start = time.perf_counter()
+            error = None
+            try:
+                async for component in self.ocr_service.scan_components(run.sector):
+                    run.scanned += 1
+                    # Blocks while OCR is backed up, pausing the scanner with it
+                    await outbox.put((run, {**component, 'scan_id': run.scan_id}))
+            except Exception as e:
+                logger.error(f"Scan of {run.sector} failed: {e}")
+                error = str(e)
+            finally:
+                metrics.record(time.perf_counter() - start, failed=error is not None)
+                run.finish_scan(error)
+                inbox.task_done()
+
+    async def _stage_worker(self, stage: str):
+        handler = self.handlers[stage]
+        inbox, metrics = self.queues[stage], self.stage_metrics[stage]
+        position = COMPONENT_STAGES.index(stage)
+        outbox = self.queues[COMPONENT_STAGES[position + 1]] if position + 1 < len(COMPONENT_STAGES) else None
+
+        while True:
+            run, record = await inbox.get()
+            start = time.perf_counter()
+            try:
+                await handler(record)
+            except Exception as e:
+                metrics.record(time.perf_counter() - start, failed=True)
+                logger.error(f"Stage {stage} failed for {record.get('id')}: {e}")
+                run.finish_component(record, f"{stage}: {e}")
+                inbox.task_done()
+                continue
+
+            metrics.record(time.perf_counter() - start)
+            try:
+                if outbox is None:
+                    self._announce(run, record)
+                    run.finish_component(record)
+                else:
+                    await outbox.put((run, record))
+            finally:
+                inbox.task_done()
+
+    def _announce(self, run: ScanRun, record: Dict):
+        """Tell the sector's dashboards a component has been fully processed
+
+        The record is already persisted, so a failed broadcast is logged
+        rather than allowed to stop the persistence worker.
+        """
+        try:
+            self.hub.publish([sector_topic(run.sector)], {
+                "type": "component",
+                "scan_id": run.scan_id,
+                "sector": run.sector,
+                "component_id": record.get("id"),
+                "status": record.get("status"),
+                "risk_category": record.get("analysis", {}).get("risk_category"),
+                "violations": len(record.get("compliance", {}).get("violations", [])),
+                "requires_review": record.get("compliance", {}).get("requires_review")
+            }, key=("component", record.get("id")))
+        except Exception as e:
+            logger.error(f"Broadcast of {record.get('id')} for scan {run.scan_id} failed: {e}")
+
+    async def _read(self, record: Dict):
+        record['ocr'] = await self.ocr_service.read_component(record)
+        record.pop('image', None)
+
+    async def _predict(self, record: Dict):
+        record['analysis'] = await self.agent_service.predict_component(record)
+
+    async def _audit(self, record: Dict):
+        record['compliance'] = await self.agent_service.audit_component(record, record['analysis'])
+
+    async def _persist(self, record: Dict):
+        await self.bigquery_service.store_scan_result(record)
@@ -0,0 +1,145 @@
+import asyncio
+import itertools
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = ("high", "medium", "low")
+# Waits kept per priority for the percentiles
+WAIT_SAMPLES = 1024
+
+
+class ScanScheduler:
+    """Picks the next queued scan: high priority first, then fair across sectors
+
+    'high' jobs take strict precedence over everything else. Within a
+    class, sectors share the workers by weighted fair queuing: each job
+    gets a finish tag of max(virtual time, its sector's last tag) + 1 /
+    weight, where the weight is the sector's (SCAN_SECTOR_WEIGHTS,
+    default 1) times the priority's (SCAN_PRIORITY_WEIGHTS). The smallest
+    tag runs next, so a sector with a hundred queued scans gets its turn
+    alongside, not ahead of, a sector with one. A sector already running
+    sector_concurrency scans is skipped until one of them is released,
+    so the same rack is never scanned twice at once.
+    """
+
+    def __init__(self, sector_concurrency: Optional[int] = None, sector_weights: Optional[Dict[str, float]] = None,
+                 priority_weights: Optional[Dict[str, float]] = None, max_pending: Optional[int] = None):
+        self.sector_concurrency = sector_concurrency or settings.SCAN_SECTOR_CONCURRENCY
+        self.sector_weights = settings.SCAN_SECTOR_WEIGHTS if sector_weights is None else sector_weights
+        self.priority_weights = settings.SCAN_PRIORITY_WEIGHTS if priority_weights is None else priority_weights
+        self.max_pending = max_pending or settings.SCAN_JOB_MAX_PENDING
+
+        # class (0 = high, 1 = the rest) -> sector -> FIFO of (finish tag, sequence, priority, enqueued, item)
+        self._queues: Tuple[Dict[str, Deque], Dict[str, Deque]] = (defaultdict(deque), defaultdict(deque))
+        self._virtual_time = [0.0, 0.0]
+        self._last_finish: Tuple[Dict[str, float], Dict[str, float]] = ({}, {})
+        self._running: Dict[str, int] = defaultdict(int)
+        self._sequence = itertools.count()
+        self._pending = 0
+        self._ready: Optional[asyncio.Condition] = None
+
+        self._waits = {priority: deque(maxlen=WAIT_SAMPLES) for priority in PRIORITIES}
+        self._dispatched = {priority: 0 for priority in PRIORITIES}
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _condition(self) -> asyncio.Condition:
+        # Created on first use so it belongs to the loop the workers run on
+        if self._ready is None:
+            self._ready = asyncio.Condition()
+        return self._ready
+
+    async def put(self, item: Any, sector: str, priority: str = "medium"):
+        """Queue an item; raises asyncio.QueueFull past max_pending"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {PRIORITIES}")
+        if self._pending >= self.max_pending:
+            raise asyncio.QueueFull(f"{self.max_pending} scan jobs already pending")
+
+        level = 0 if priority == "high" else 1
+        start = max(self._virtual_time[level], self._last_finish[level].get(sector, 0.0))
+        finish = start + 1.0 / self._weight(sector, priority)
+        self._last_finish[level][sector] = finish
+        self._queues[level][sector].append((finish, next(self._sequence), priority, time.monotonic(), item))
+        self._pending += 1
+
+        async with self._condition():
+            self._condition().notify()
+
+    async def get(self) -> Tuple[Any, str]:
+        """Wait for the next dispatchable item; returns (item, sector)
+
+        The caller must release(sector) once the item's scan is over.
+        """
+        async with self._condition():
+            while True:
+                selected = self._select()
+                if selected is not None:
+                    return selected
+                await self._condition().wait()
+
+    async def release(self, sector: str):
+        """Free the sector's slot taken by get()"""
+        self._running[sector] -= 1
+        if self._running[sector] <= 0:
+            del self._running[sector]
+        async with self._condition():
+            self._condition().notify_all()
+
+    def _select(self) -> Optional[Tuple[Any, str]]:
+        for level, queues in enumerate(self._queues):
+            candidates = [
+                (queue[0][0], queue[0][1], sector) for sector, queue in queues.items()
+                if queue and self._running.get(sector, 0) < self.sector_concurrency
+            ]
+            if not candidates:
+                continue
+
+            finish, _, sector = min(candidates)
+            _, _, priority, enqueued, item = queues[sector].popleft()
+            if not queues[sector]:
+                del queues[sector]
+            # Virtual time follows the start tag of what is dispatched
+            self._virtual_time[level] = max(self._virtual_time[level],
+                                            finish - 1.0 / self._weight(sector, priority))
+            self._running[sector] += 1
+            self._pending -= 1
+            self._waits[priority].append(time.monotonic() - enqueued)
+            self._dispatched[priority] += 1
+            return item, sector
+        return None
+
+    def _weight(self, sector: str, priority: str) -> float:
+        return self.sector_weights.get(sector, 1.0) * self.priority_weights.get(priority, 1.0)
+
+    def metrics(self) -> Dict:
+        """Pending jobs, sectors scanning, and queue wait time by priority"""
+        pending = {priority: 0 for priority in PRIORITIES}
+        for queues in self._queues:
+            for queue in queues.values():
+                for entry in queue:
+                    pending[entry[2]] += 1
+
+        wait_seconds = {}
+        for priority, waits in self._waits.items():
+            samples = sorted(waits) or [0.0]
+            wait_seconds[priority] = {
+                'dispatched': self._dispatched[priority],
+                'mean': sum(samples) / len(samples),
+                'p50': samples[len(samples) // 2],
+                'p95': samples[min(int(len(samples) * 0.95), len(samples) - 1)],
+                'max': samples[-1]
+            }
+        return {
+            'pending': pending,
+            'sectors_scanning': dict(self._running),
+            'wait_seconds': wait_seconds
+        }
@@ -0,0 +1,65 @@
+import hashlib
+import math
+from typing import Iterable, List
+
+import numpy as np
+
+
+class BloomFilter:
+    """Set membership with no false negatives and a bounded false-positive rate
+
+    Sized for `capacity` items at `error_rate`; positions come from double
+    hashing one 128-bit BLAKE2b digest per item. Batches are hashed once
+    per item and probed with numpy, which is what makes checking a whole
+    scan cheap.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, items: List[str]) -> np.ndarray:
+        """(len(items), num_hashes) bit positions"""
+        digests = np.frombuffer(
+            b"".join(hashlib.blake2b(item.encode(), digest_size=16).digest() for item in items), dtype="<u8"
+        ).reshape(-1, 2)
+        h1, h2 = digests[:, :1], digests[:, 1:] | np.uint64(1)
+        # uint64 arithmetic wraps, identically for add and lookup
+        return (h1 + np.arange(self.num_hashes, dtype=np.uint64) * h2) % np.uint64(self.num_bits)
+
+    def update(self, items: Iterable[str], batch_size: int = 65536):
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == batch_size:
+                self._add(batch)
+                batch = []
+        if batch:
+            self._add(batch)
+
+    def _add(self, items: List[str]):
+        positions = self._positions(items).ravel()
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3),
+                         np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+        self.count += len(items)
+
+    def add(self, item: str):
+        self._add([item])
+
+    def contains_many(self, items: List[str]) -> np.ndarray:
+        """Boolean membership of each item"""
+        if not items:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(items)
+        hits = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return hits.all(axis=1)
+
+    def __contains__(self, item: str) -> bool:
+        return bool(self.contains_many([item])[0])
+
+    def __len__(self) -> int:
+        return self.count
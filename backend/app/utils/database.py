@@ -30,7 +30,10 @@ def init_db():
     """Initialize database tables"""
     try:
         from app.models import Base
+        from app.utils.migrations import add_missing_columns
         Base.metadata.create_all(bind=engine)
+        for table in Base.metadata.sorted_tables:
+            add_missing_columns(engine, table)
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Database initialization error: {e}")
@@ -0,0 +1,28 @@
+from sqlalchemy import Table, inspect, text
+import logging
+
+logger = logging.getLogger(__name__)
+
+def add_missing_columns(bind, table: Table):
+    """Add the model columns an existing table lacks, with their indexes
+
+    create_all only creates missing tables, so columns added to a model
+    later never reach databases created before. Rows already there get
+    the column's scalar default, if it has one.
+    """
+    existing = {column['name'] for column in inspect(bind).get_columns(table.name)}
+    missing = [column for column in table.columns if column.name not in existing]
+    if not missing:
+        return
+
+    with bind.begin() as connection:
+        for column in missing:
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            if column.default is not None and column.default.is_scalar:
+                connection.execute(text(f"UPDATE {table.name} SET {column.name} = :value"),
+                                   {"value": column.default.arg})
+            logger.info(f"Added column {table.name}.{column.name}")
+        for index in table.indexes:
+            if any(column in missing for column in index.columns):
+                index.create(connection, checkfirst=True)
@@ -0,0 +1,32 @@
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+
+
+async def spool_body(chunks: AsyncIterator[bytes], content_length: Optional[int], max_bytes: int) -> memoryview:
+    """Collect a streamed request body into one buffer and return a view of it
+
+    With a Content-Length the buffer is allocated once and each chunk is
+    copied straight into its slot, so the body is never held twice; without
+    one the buffer grows in place. Raises 413 past max_bytes.
+    """
+    if content_length is not None and content_length > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+
+    buffer = bytearray(content_length or 0)
+    view = memoryview(buffer)
+    size = 0
+    async for chunk in chunks:
+        end = size + len(chunk)
+        if end > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+        if end <= len(buffer):
+            view[size:end] = chunk
+        else:
+            # Unknown or understated length: release the view so the buffer can grow
+            view.release()
+            buffer[size:] = chunk
+            view = memoryview(buffer)
+        size = end
+
+    return view[:size]
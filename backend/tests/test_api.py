@@ -15,13 +15,99 @@ def test_health_check():
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
 
-def test_scan_endpoint():
-    response = client.post(
-        "/api/v1/scanner/scan",
-        json={"sector": "B4-SECTOR-01", "priority": "high"}
-    )
-    assert response.status_code == 200
-    assert "scan_id" in response.json()
+def _scan_jobs(tmp_path, ocr_service=None):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.models import Base
+    from app.services.scan_jobs import ScanJobQueue, ScanResultStore
+    from app.services.scan_pipeline import ScanPipeline
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'scans.db'}")
+    Base.metadata.create_all(engine)
+    return ScanJobQueue(pipeline=ScanPipeline(ocr_service=ocr_service), store=ScanResultStore(sessionmaker(bind=engine)))
+
+def test_scan_endpoint(tmp_path):
+    import asyncio
+    import threading
+    import time
+    from app.api.routes import scanner
+    from app.services.ocr_service import OCRService
+
+    # The scan cannot finish until the test lets it
+    gate = threading.Event()
+
+    class GatedScanner(OCRService):
+        async def scan_components(self, sector):
+            while not gate.is_set():
+                await asyncio.sleep(0.01)
+            async for component in super().scan_components(sector):
+                yield component
+
+    jobs = _scan_jobs(tmp_path, GatedScanner())
+    app.dependency_overrides[scanner.get_scan_jobs] = lambda: jobs
+    try:
+        with TestClient(app) as live:
+            response = live.post("/api/v1/scanner/scan", json={"sector": "B4-SECTOR-01", "priority": "high"})
+            assert response.status_code == 202
+            job = response.json()
+            assert job["status"] == "queued" and job["priority"] == "high"
+            # Accepted while the scan has yet to run
+            assert live.get(f"/api/v1/scanner/scans/{job['scan_id']}").json()["status"] in ("queued", "running")
+
+            gate.set()
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline:
+                scan = live.get(f"/api/v1/scanner/scans/{job['scan_id']}").json()
+                if scan["status"] == "completed":
+                    break
+                time.sleep(0.02)
+            assert scan["status"] == "completed"
+            assert scan["components_scanned"] == len(scan["components"]) == 1
+            assert scan["components"][0]["compliance"]["requires_review"] is False
+            assert live.get("/api/v1/scanner/scans/SCAN-UNKNOWN").status_code == 404
+
+            stages = live.get("/api/v1/scanner/pipeline/metrics").json()["stages"]
+            assert list(stages) == ["scan", "ocr", "prediction", "compliance", "persistence"]
+            assert stages["persistence"]["processed"] == 1
+            assert stages["ocr"]["queue_capacity"] > 0
+    finally:
+        app.dependency_overrides.clear()
+
+def test_upload_image_decodes_raw_body(monkeypatch):
+    import cv2
+    import numpy as np
+    from app.api.routes import scanner
+    from app.config import settings
+    from app.services.ocr_service import OCRService
+
+    class Model:
+        def extract_text(self, image, component_id=None):
+            return {"shape": list(image.shape), "component_id": component_id,
+                    "details": [{"text": "CB-12", "bbox": [[10, 20], [30, 20], [30, 40], [10, 40]]}]}
+
+    app.dependency_overrides[scanner.get_ocr_service] = lambda: OCRService(model=Model())
+    try:
+        frame = np.full((1800, 3400, 3), 200, dtype=np.uint8)
+        jpeg = cv2.imencode(".jpg", frame)[1].tobytes()
+        response = client.post("/api/v1/scanner/upload?component_id=B4-COMP-001", content=jpeg,
+                               headers={"Content-Type": "image/jpeg"})
+        assert response.status_code == 200
+        # Decoded at half scale, since OCR works at OCR_MAX_IMAGE_SIDE anyway; boxes map back
+        assert response.json()["shape"] == [900, 1700, 3]
+        assert response.json()["component_id"] == "B4-COMP-001"
+        assert response.json()["details"][0]["bbox"][2] == [60, 80]
+
+        png = cv2.imencode(".png", frame[:100, :200])[1].tobytes()
+        assert client.post("/api/v1/scanner/upload", content=iter([png[:50], png[50:]])).json()["shape"] == [100, 200, 3]
+        assert client.post("/api/v1/scanner/upload", content=b"not an image").status_code == 400
+        for length in ("abc", "-1"):
+            response = client.post("/api/v1/scanner/upload", content=png, headers={"Content-Length": length})
+            assert response.status_code == 400
+
+        monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 1024)
+        assert client.post("/api/v1/scanner/upload", content=jpeg).status_code == 413
+    finally:
+        app.dependency_overrides.clear()
 
 def test_get_scans():
     response = client.get("/api/v1/scanner/scans")
@@ -34,6 +120,30 @@ def test_agent_status():
     assert "agents" in response.json()
     assert len(response.json()["agents"]) == 4
 
+def test_agent_websocket_streams_frames():
+    with client.websocket_connect("/api/v1/agents/ws") as websocket:
+        websocket.send_json({"prompt": "Summarize B4-SECTOR-01", "stream": True})
+        frames = [websocket.receive_json()]
+        while frames[-1]["type"] != "complete":
+            frames.append(websocket.receive_json())
+        assert frames[0]["type"] == "token"
+        assert frames[-1]["response"] == "".join(f["token"] for f in frames[:-1])
+
+        websocket.send_json({"command": "status"})
+        assert websocket.receive_json()["status"] == "executed"
+
+def test_agent_websocket_receives_sector_broadcasts():
+    with TestClient(app) as live:
+        with live.websocket_connect("/api/v1/agents/ws") as websocket:
+            websocket.send_json({"subscribe": ["sector:B4-SECTOR-07"]})
+            assert websocket.receive_json() == {"type": "subscribed", "topics": ["sector:B4-SECTOR-07"]}
+
+            assert live.post("/api/v1/agents/execute?sector=B4-SECTOR-07").status_code == 200
+            event = websocket.receive_json()
+            assert event["type"] == "twin" and event["sector"] == "B4-SECTOR-07"
+            assert list(event["components"]) == ["B4-SECTOR-07-COMP-001"]
+            assert live.get("/api/v1/agents/hub/metrics").json()["topics"] == {"sector:B4-SECTOR-07": 1}
+
 def test_analytics_performance():
     response = client.get("/api/v1/analytics/performance")
     assert response.status_code == 200
@@ -53,3 +163,11 @@ def test_twin_sync():
     response = client.post("/api/v1/twin/sync")
     assert response.status_code == 200
     assert response.json()["status"] == "synced"
+
+def test_agent_execute_sectors():
+    response = client.post("/api/v1/agents/execute/sectors", json={"sectors": ["B4-SECTOR-01", "B4-SECTOR-02"]})
+    assert response.status_code == 200
+    workflows = response.json()["workflows"]
+    assert [workflow["sector"] for workflow in workflows] == ["B4-SECTOR-01", "B4-SECTOR-02"]
+    assert all(workflow["components_analyzed"] == 1 for workflow in workflows)
+    assert set(workflows[0]["stage_timings"]) == {"scout", "analyst", "auditor", "orchestrator"}
@@ -28,3 +28,709 @@ def test_paddle_ocr_simulate():
     result = model._simulate_ocr(image)
     assert "extracted_text" in result
     assert result["confidence"] > 0.8
+
+def test_failure_predictor_batch_matches_predict():
+    import pandas as pd
+    rng = np.random.default_rng(7)
+    telemetry = pd.concat([
+        pd.DataFrame({
+            'component_id': f"COMP-{i:03d}",
+            'timestamp': np.arange(30),
+            'temperature_c': 40 + rng.normal(0, 1 + i, 30) + np.arange(30) * 0.3 * i,
+            'voltage_v': 230 + rng.normal(0, 2 * i, 30),
+            'current_a': rng.integers(0, 4, 30).astype(float)
+        })
+        for i in range(6)
+    ]).sample(frac=1, random_state=0)
+    predictor = FailurePredictor()
+    batch = predictor.predict_batch(telemetry).set_index('component_id')
+    for component_id, history in telemetry.groupby('component_id'):
+        single = predictor.predict({'component_id': component_id}, history.sort_values('timestamp'))
+        assert batch.loc[component_id, 'risk_score'] == single['risk_score']
+        assert batch.loc[component_id, 'risk_category'] == single['risk_category']
+        assert batch.loc[component_id, 'risk_factors'] == single['risk_factors']
+
+def test_failure_predictor_batch_handles_empty_and_temperatureless_telemetry():
+    import pandas as pd
+    predictor = FailurePredictor()
+
+    empty = predictor.predict_batch(pd.DataFrame(columns=['component_id', 'timestamp', 'temperature_c']))
+    assert empty.empty and 'risk_score' in empty.columns
+
+    no_temperature = pd.DataFrame({
+        'component_id': ['COMP-001', 'COMP-001', 'COMP-002'],
+        'timestamp': [0, 1, 0],
+        'voltage_v': [230.0, 250.0, 229.0]
+    })
+    batch = predictor.predict_batch(no_temperature)
+    assert batch['component_id'].tolist() == ['COMP-001', 'COMP-002']
+    assert batch['risk_score'].tolist() == [0.0, 0.0]
+    assert batch['risk_category'].tolist() == ['Stable', 'Stable']
+    single = predictor.predict({'component_id': 'COMP-001'}, no_temperature.iloc[:2])
+    assert single['risk_score'] == 0.0
+
+def test_failure_predictor_stream_matches_history():
+    import pandas as pd
+    rng = np.random.default_rng(3)
+    history = pd.DataFrame({
+        'temperature_c': 40 + np.arange(120) * 0.8 + rng.normal(0, 6, 120),
+        'voltage_v': 230 + rng.normal(0, 7, 120),
+        'current_a': rng.gamma(2.0, 5.0, 120)
+    })
+    predictor = FailurePredictor()
+    for reading in history.to_dict('records'):
+        streamed = predictor.predict_stream({'component_id': 'COMP-001'}, reading)
+    expected = predictor._extract_temporal_features(history)
+    features = predictor.stream_states['COMP-001'].features()
+    for name in ('temp_mean', 'temp_std', 'temp_trend', 'voltage_stability'):
+        assert features[name] == pytest.approx(expected[name])
+    assert abs(features['current_spikes'] - expected['current_spikes']) <= 5
+    assert streamed['risk_score'] == predictor.predict({'component_id': 'COMP-001'}, history)['risk_score']
+
+def test_failure_predictor_artifact_roundtrip(tmp_path, monkeypatch):
+    import pandas as pd
+    from app.config import settings
+    rng = np.random.default_rng(11)
+    telemetry = pd.DataFrame({
+        'component_id': np.repeat([f"COMP-{i:03d}" for i in range(200)], 12),
+        'timestamp': np.tile(np.arange(12), 200),
+        'temperature_c': 40 + rng.normal(0, 6, 2400),
+        'voltage_v': 230 + rng.normal(0, 5, 2400),
+        'current_a': rng.gamma(2.0, 5.0, 2400)
+    })
+    labels = pd.Series(rng.random(200) < 0.4, index=telemetry['component_id'].unique())
+    predictor = FailurePredictor(model_path=str(tmp_path / "failure-forest"))
+    model = predictor.train(telemetry, labels=labels, n_estimators=20)
+    predictor.save_model()
+
+    # The default path is under the configured model directory
+    monkeypatch.setattr(settings, "MODEL_PATH", str(tmp_path))
+    monkeypatch.setattr(settings, "FAILURE_PREDICTOR_MODEL", "failure-forest")
+    loaded = FailurePredictor()
+    assert loaded.model_path == str(tmp_path / "failure-forest")
+    loaded.load_model()
+    assert loaded.forest.metadata()['memory_mapped']
+
+    _, features = loaded._extract_batch_features(telemetry)
+    X = loaded._feature_matrix(features)
+    np.testing.assert_array_equal(loaded.forest.predict_proba(X), model.predict_proba(X))
+
+def test_flat_forest_numpy_traversal_matches_sklearn():
+    from sklearn.ensemble import RandomForestClassifier
+    from app.ml.flat_forest import FlatForest
+    rng = np.random.default_rng(5)
+    X = rng.normal(size=(300, 5))
+    y = rng.integers(0, 3, 300)
+    model = RandomForestClassifier(n_estimators=15, random_state=0).fit(X, y)
+    forest = FlatForest.from_estimator(model, ['a', 'b', 'c', 'd', 'e'])
+    np.testing.assert_array_equal(forest.predict_proba(X, compiled=False), model.predict_proba(X))
+    np.testing.assert_array_equal(forest.predict_proba(X[0], compiled=False), model.predict_proba(X[:1]))
+
+def test_flat_forest_compiled_kernel_matches_sklearn():
+    pytest.importorskip("numba")
+    from sklearn.ensemble import RandomForestClassifier
+    from app.ml.flat_forest import FlatForest, ROW_BLOCK
+    rng = np.random.default_rng(6)
+    # Spans several row blocks, with a partial last block
+    X = rng.normal(size=(ROW_BLOCK * 2 + 37, 5))
+    y = rng.integers(0, 3, len(X))
+    model = RandomForestClassifier(n_estimators=15, random_state=0).fit(X, y)
+    forest = FlatForest.from_estimator(model, ['a', 'b', 'c', 'd', 'e'])
+    np.testing.assert_array_equal(forest.predict_proba(X, compiled=True), model.predict_proba(X))
+    np.testing.assert_array_equal(forest.predict_proba(X[0], compiled=True), model.predict_proba(X[:1]))
+
+def test_flat_forest_routes_large_batches_to_saved_estimator(tmp_path, monkeypatch):
+    from sklearn.ensemble import RandomForestClassifier
+    from app.ml import flat_forest
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(64, 5))
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, rng.integers(0, 2, 64))
+    flat_forest.FlatForest.from_estimator(model, ['a', 'b', 'c', 'd', 'e']).save(str(tmp_path))
+    loaded = flat_forest.FlatForest.load(str(tmp_path))
+
+    monkeypatch.setattr(flat_forest, "COMPILED_MAX_ROWS", 16)
+    monkeypatch.setattr(flat_forest, "NUMPY_MAX_ROWS", 16)
+    np.testing.assert_array_equal(loaded.predict_proba(X[:16]), model.predict_proba(X[:16]))
+    assert loaded._estimator is None
+
+    np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
+    assert loaded._estimator is not None
+
+def test_micro_batcher_groups_concurrent_requests():
+    from concurrent.futures import ThreadPoolExecutor
+    from app.ml.batching import MicroBatcher
+    batches = []
+
+    def double(items):
+        batches.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, max_batch_size=4, max_wait_ms=50)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(batcher, range(8)))
+    batcher.close()
+
+    assert results == [i * 2 for i in range(8)]
+    assert max(batches) > 1 and max(batches) <= 4
+    metrics = batcher.metrics()
+    assert metrics['requests'] == 8
+    assert metrics['queue_depth'] == 0
+
+def test_micro_batcher_fails_items_without_a_result():
+    import threading
+    from app.ml.batching import MicroBatcher
+    release = threading.Event()
+
+    def drop_last(items):
+        release.wait(timeout=5)
+        return [item * 2 for item in items[:-1]]
+
+    batcher = MicroBatcher(drop_last, max_batch_size=4, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(3)]
+    release.set()
+
+    assert [f.result(timeout=5) for f in futures[:2]] == [0, 2]
+    with pytest.raises(RuntimeError, match="2 results for 3 items"):
+        futures[2].result(timeout=5)
+    batcher.close()
+
+def test_micro_batcher_close_races_with_submit():
+    from concurrent.futures import ThreadPoolExecutor
+    from app.ml.batching import MicroBatcher
+
+    for _ in range(20):
+        batcher = MicroBatcher(lambda items: items, max_batch_size=4, max_wait_ms=1)
+
+        def submit(i):
+            try:
+                return batcher.submit(i)
+            except RuntimeError:
+                return None
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            pending = [pool.submit(submit, i) for i in range(50)]
+            batcher.close()
+            futures = [p.result() for p in pending]
+
+        # Every accepted item is processed; none is left queued behind a stopped worker
+        for i, future in enumerate(futures):
+            if future is not None:
+                assert future.result(timeout=5) == i
+
+def test_llm_wrappers_share_model_registry():
+    unsloth = UnslothModel()
+    llamafactory = LLaMAFactoryModel()
+    assert unsloth.registry is llamafactory.registry
+    assert unsloth.adapter_name == "astra-grid-unsloth"
+    assert llamafactory.adapter_name == "astra-grid-llamafactory"
+
+def test_response_cache_lru_ttl_and_disk_tier(tmp_path):
+    from app.ml.response_cache import ResponseCache
+    disk_path = str(tmp_path / "responses.sqlite")
+    cache = ResponseCache(max_entries=2, ttl_seconds=60, disk_path=disk_path)
+    params = {'max_new_tokens': 512, 'temperature': 0.3}
+    keys = [cache.make_key(f"prompt {i}", "astra-grid-llamafactory", params) for i in range(3)]
+
+    for i, key in enumerate(keys):
+        cache.put(key, f"response {i}")
+    assert cache.metrics()['evictions'] == 1
+    assert cache.get(keys[2]) == "response 2"
+
+    restarted = ResponseCache(max_entries=2, ttl_seconds=60, disk_path=disk_path)
+    assert restarted.get(keys[0]) == "response 0"
+    assert restarted.metrics()['disk_hits'] == 1
+
+    expired = ResponseCache(ttl_seconds=-1)
+    expired.put(keys[0], "stale")
+    assert expired.get(keys[0]) is None
+    assert not expired.is_cacheable({'do_sample': True})
+    assert ResponseCache(cache_sampled=True).is_cacheable({'do_sample': True})
+
+def test_response_cache_prunes_disk_tier(tmp_path, monkeypatch):
+    import sqlite3
+    from app.ml import response_cache
+    disk_path = str(tmp_path / "responses.sqlite")
+
+    def disk_rows():
+        with sqlite3.connect(disk_path) as db:
+            return db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    # Expired rows are deleted when read
+    stale = response_cache.ResponseCache(ttl_seconds=-1, disk_path=disk_path)
+    stale.put("a", "stale")
+    stale._entries.clear()
+    assert stale.get("a") is None
+    assert disk_rows() == 0
+
+    # Periodic sweeps drop expired rows and cap the row count
+    monkeypatch.setattr(response_cache, "PRUNE_EVERY", 4)
+    stale.put("b", "stale")
+    cache = response_cache.ResponseCache(ttl_seconds=60, disk_path=disk_path, max_disk_entries=3)
+    assert disk_rows() == 0 and cache.metrics()['disk_evictions'] == 1
+    for i in range(8):
+        cache.put(f"key {i}", f"response {i}")
+    assert disk_rows() == 3
+    assert cache.metrics()['disk_evictions'] == 6
+
+def _tiny_causal_lm():
+    import string
+    import torch
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers
+    from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+    vocab = {c: i for i, c in enumerate(["<eos>", "<pad>"] + list(string.printable))}
+    backend = Tokenizer(models.WordLevel(vocab, unk_token="<eos>"))
+    backend.pre_tokenizer = pre_tokenizers.Split("", "isolated")
+    backend.decoder = decoders.Fuse()
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=backend, eos_token="<eos>", pad_token="<pad>")
+    torch.manual_seed(0)
+    model = GPT2LMHeadModel(GPT2Config(vocab_size=len(vocab), n_embd=32, n_layer=2, n_head=2)).eval()
+    return tokenizer, model
+
+def test_prefix_cache_matches_full_prompt_generation():
+    import torch
+    from app.ml.prefix_cache import PrefixCache
+
+    tokenizer, model = _tiny_causal_lm()
+
+    prefix = UnslothModel.PROMPT_PREFIX
+    prompts = [prefix + "### Input: Component ID: A\n\n### Response:",
+               prefix + "### Input: Component ID: B4-SECTOR-01-COMP-002\n\n### Response:"]
+    cache = PrefixCache(prefix)
+    device = torch.device("cpu")
+    with torch.no_grad():
+        reused = model.generate(**cache.prepare(model, tokenizer, prompts, device), max_new_tokens=8,
+                                do_sample=False, pad_token_id=tokenizer.pad_token_id)
+        for i, prompt in enumerate(prompts):
+            full = model.generate(**tokenizer(prompt, return_tensors="pt"), max_new_tokens=8,
+                                  do_sample=False, pad_token_id=tokenizer.pad_token_id)
+            assert reused[i, -8:].tolist() == full[0, -8:].tolist()
+
+    # transformers < 4.36 returns per-layer (key, value) tuples, expanded without Cache methods
+    legacy = PrefixCache(prefix)
+    legacy.past_key_values = tuple((torch.zeros(1, 2, 5, 4), torch.ones(1, 2, 5, 4)) for _ in range(2))
+    expanded = legacy._expand(3)
+    assert [tuple(tensor.shape) for layer in expanded for tensor in layer] == [(3, 2, 5, 4)] * 4
+    assert legacy.past_key_values[0][0].shape[0] == 1
+
+def test_ml_package_import_is_lazy():
+    import subprocess
+    import sys
+
+    probe = ("import sys, app.ml, app.ml.unsloth_model, app.ml.paddle_ocr_model; "
+             "print(sorted(m for m in ('torch', 'transformers', 'peft', 'cv2', 'sklearn') if m in sys.modules))")
+    from pathlib import Path
+    result = subprocess.run([sys.executable, "-c", probe], cwd=Path(__file__).parent.parent,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+    from app.ml import UnslothModel as LazyUnslothModel
+    assert LazyUnslothModel is UnslothModel
+
+def test_compliance_rules_settle_clear_cases_without_llm():
+    from app.ml.compliance_rules import ComplianceRuleEngine
+    model = LLaMAFactoryModel(use_prefix_cache=False)
+    model._generate = lambda prompt: "No violations identified."
+
+    components = [
+        {'component_id': "C1", 'status': "Overheat"},
+        {'component_id': "C2", 'status': "Normal"},
+        {'component_id': "C3", 'status': "Normal", 'component_type': "Transformer"},
+        {'component_id': "C4", 'status': "Warning"},
+        {'component_id': "C5", 'status': "Offline"}
+    ]
+    reports = [
+        {'risk_category': "Critical", 'risk_score': 0.92},
+        {'risk_category': "Stable", 'risk_score': 0.10},
+        {'risk_category': "Critical", 'risk_score': 0.85},
+        {'risk_category': "Warning", 'risk_score': 0.55},
+        {'risk_category': "Stable", 'risk_score': 0.20}
+    ]
+    results = model.batch_validate(components, reports)
+
+    assert [r['validation_path'] for r in results] == ["rules", "rules", "rules", "llm", "llm"]
+    assert results[0]['regulatory_citations'] == ["OSHA 1910.269", "NFPA 70E"]
+    assert results[1]['compliant']
+    # Type-specific citations add to the generic ones rather than replace them
+    assert results[2]['regulatory_citations'] == ["OSHA 1910.269", "IEEE C2-2023"]
+    assert model.validation_metrics()['rules'] == 3 and model.validation_metrics()['llm'] == 2
+
+    # Scores near a band boundary are ambiguous whatever the category says
+    borderline = model.validate_compliance({'status': "Normal"}, {'risk_category': "Critical", 'risk_score': 0.71})
+    assert borderline['validation_path'] == "llm"
+
+    engine = ComplianceRuleEngine()
+    critical = {'risk_category': "Critical", 'risk_score': 0.9}
+    overheating = engine.resolve({'component_type': "Transformer", 'status': "Overheat"}, critical)
+    assert [v['regulation'] for v in overheating] == ["OSHA 1910.269", "NFPA 70E", "IEEE C2-2023"]
+    switch = engine.resolve({'component_type': "network_switch", 'status': "Offline"}, critical)
+    assert [v['regulation'] for v in switch] == ["OSHA 1910.269", "IEC 61850"]
+
+    # Scanner-shaped input: lower-case status and type
+    scanned = engine.resolve({'component_type': "transformer", 'status': "overheat"}, critical)
+    assert [v['regulation'] for v in scanned] == ["OSHA 1910.269", "NFPA 70E", "IEEE C2-2023"]
+    assert engine.resolve({'status': "offline"}, {'risk_category': "Stable", 'risk_score': 0.2}) is None
+
+def test_stream_generate_yields_same_text_as_generate():
+    import torch
+    from contextlib import contextmanager
+    from app.ml.prefix_cache import PrefixCache
+    from app.ml.streaming import stream_generate
+
+    tokenizer, model = _tiny_causal_lm()
+
+    class Registry:
+        @contextmanager
+        def adapter(self, name):
+            yield model
+
+    prompt = UnslothModel.PROMPT_PREFIX + "### Input: Component ID: A\n\n### Response:"
+    kwargs = {'max_new_tokens': 12, 'do_sample': False}
+    full = model.generate(**tokenizer(prompt, return_tensors="pt"), **kwargs, pad_token_id=tokenizer.pad_token_id)
+    expected = tokenizer.decode(full[0, -12:], skip_special_tokens=True)
+
+    for prefix_cache in (None, PrefixCache(UnslothModel.PROMPT_PREFIX)):
+        chunks = list(stream_generate(Registry(), "test", tokenizer, prompt, torch.device("cpu"), kwargs,
+                                      prefix_cache=prefix_cache))
+        assert len(chunks) == 12
+        assert "".join(chunks) == expected
+
+@pytest.mark.asyncio
+async def test_stream_generate_releases_adapter_when_consumer_stops():
+    import threading
+    import torch
+    from contextlib import contextmanager
+    from app.ml.streaming import stream_generate
+    from app.services.ernie_service import ERNIEService
+
+    tokenizer, model = _tiny_causal_lm()
+    lock = threading.Lock()
+    steps = []
+    forward = model.forward
+    model.forward = lambda *args, **kwargs: steps.append(1) or forward(*args, **kwargs)
+
+    class Registry:
+        @contextmanager
+        def adapter(self, name):
+            with lock:
+                yield model
+
+    class Wrapper:
+        def stream_generate(self, prompt, cancel=None):
+            return stream_generate(Registry(), "test", tokenizer, prompt, torch.device("cpu"),
+                                   {'max_new_tokens': 500, 'do_sample': False}, cancel=cancel)
+
+    # Closing the iterator early stops generate() and frees the adapter
+    chunks = Wrapper().stream_generate("Component ID: A")
+    next(chunks)
+    chunks.close()
+    assert lock.acquire(timeout=5)
+    lock.release()
+    assert len(steps) < 500
+
+    # So does a client going away mid-stream: the service's iterator is closed
+    steps.clear()
+    stream = await ERNIEService(model=Wrapper()).generate_response("Component ID: A", stream=True)
+    await stream.__anext__()
+    await stream.aclose()
+    assert lock.acquire(timeout=5)
+    lock.release()
+    assert len(steps) < 500
+
+def test_cpu_int8_backend_quantizes_base_and_keeps_adapters(tmp_path):
+    import torch
+    from peft import LoraConfig, get_peft_model
+    from transformers import LlamaConfig, LlamaForCausalLM
+    from app.ml.model_registry import ModelRegistry
+
+    tokenizer, _ = _tiny_causal_lm()
+    tokenizer.save_pretrained(tmp_path / "base")
+    config = LlamaConfig(vocab_size=len(tokenizer), hidden_size=64, intermediate_size=128, num_hidden_layers=2,
+                         num_attention_heads=2, eos_token_id=0, pad_token_id=1)
+    LlamaForCausalLM(config).save_pretrained(tmp_path / "base")
+    for name in ("astra-grid-unsloth", "astra-grid-llamafactory"):
+        lora = LoraConfig(r=4, target_modules=["q_proj", "v_proj"], init_lora_weights=False, task_type="CAUSAL_LM")
+        get_peft_model(LlamaForCausalLM.from_pretrained(tmp_path / "base"), lora).save_pretrained(tmp_path / name)
+
+    inputs = tokenizer("Component ID: B4", return_tensors="pt")
+    logits = {}
+    for backend in ("cpu", "cpu-int8"):
+        registry = ModelRegistry(str(tmp_path / "base"), backend=backend)
+        for name in ("astra-grid-unsloth", "astra-grid-llamafactory"):
+            registry.load_adapter(name, str(tmp_path / name))
+        for name in ("astra-grid-unsloth", "astra-grid-llamafactory"):
+            with torch.inference_mode(), registry.adapter(name) as model:
+                logits[backend, name] = model(**inputs).logits
+        assert registry.device == torch.device("cpu")
+
+    layer = registry.model.base_model.model.model.layers[0]
+    assert layer.mlp.up_proj._get_name() == "DynamicQuantizedLinear"
+    assert type(layer.self_attn.q_proj.base_layer) is torch.nn.Linear
+    assert registry.memory_footprint()['base_bytes'] < 0.6 * sum(
+        p.numel() * 4 for p in LlamaForCausalLM(config).parameters()
+    )
+    for name in ("astra-grid-unsloth", "astra-grid-llamafactory"):
+        assert torch.allclose(logits["cpu", name], logits["cpu-int8", name], atol=0.05)
+    # The second adapter still changes the output after quantization
+    assert not torch.allclose(logits["cpu-int8", "astra-grid-unsloth"], logits["cpu-int8", "astra-grid-llamafactory"])
+    with pytest.raises(ValueError):
+        ModelRegistry(backend="tpu")
+
+def test_paddle_ocr_batch_matches_per_image_results():
+    class FakePaddle:
+        """Detects one box per 100 px of width and reads each crop's mean intensity"""
+        def __init__(self):
+            self.rec_calls = []
+
+        def ocr(self, img, det=True, rec=True, cls=False):
+            if det:
+                width = img.shape[1]
+                return [[[[x, 0], [x + 90, 0], [x + 90, 40], [x, 40]] for x in range(0, width - 90, 100)]]
+            self.rec_calls.append(len(img))
+            return [[(f"L{int(crop.mean())}", 0.9) for crop in img]]
+
+    rng = np.random.default_rng(0)
+    images = [np.full((60, 100 * (i % 3 + 1), 3), 10 * i, dtype=np.uint8) for i in range(10)]
+    images.append(rng.integers(0, 255, (50, 4000), dtype=np.uint8))
+
+    model = PaddleOCRModel(batch_size=4, max_image_side=1600)
+    model.model = FakePaddle()
+    batched = model.extract_text_batch(images)
+    # One recognizer call per batch of four images
+    assert len(model.model.rec_calls) == 3
+    pool = model._pool
+    single = [model.extract_text(image) for image in images]
+    # One preprocessing pool serves every call until the model is closed
+    assert model._pool is pool is not None
+
+    assert [r['extracted_text'] for r in batched] == [r['extracted_text'] for r in single]
+    assert batched[2]['extracted_text'] == "L20 L20 L20"
+    assert batched[2]['details'][1]['bbox'][0] == [100.0, 0.0]
+    # Boxes found on the downscaled 4000 px image are mapped back to its coordinates
+    assert batched[-1]['details'][1]['bbox'][0][0] == pytest.approx(250.0)
+
+    model.model = None
+    simulated = model.extract_text_batch(iter(images), batch_size=3)
+    assert len(simulated) == len(images)
+    assert all(r['confidence'] > 0.8 for r in simulated)
+    model.close()
+    assert model._pool is None and pool._shutdown
+
+def _gauge_frame(truths, shift=0, seed=0):
+    import cv2
+
+    frame = np.full((720, 1280, 3), 90, dtype=np.uint8)
+    for cx, reading in truths.items():
+        centre = (cx + shift, 360)
+        cv2.circle(frame, centre, 160, (235, 235, 235), -1)
+        cv2.circle(frame, centre, 160, (30, 30, 30), 6)
+        theta = np.deg2rad(225 - reading)
+        tip = (int(round(centre[0] + 136 * np.cos(theta))), int(round(360 - 136 * np.sin(theta))))
+        cv2.line(frame, centre, tip, (20, 20, 20), 8, cv2.LINE_AA)
+    return np.clip(frame + np.random.default_rng(seed).normal(0, 5, frame.shape), 0, 255).astype(np.uint8)
+
+
+def test_read_analog_gauges_finds_each_needle_deterministically():
+    truths = {300: 30.0, 900: 200.0}
+    frame = _gauge_frame(truths)
+
+    model = PaddleOCRModel()
+    readings = model.read_analog_gauges(frame, gauge_type='pressure')
+    assert len(readings) == 2
+    for reading in readings:
+        truth = truths[min(truths, key=lambda cx: abs(cx - reading['center'][0]))]
+        assert reading['needle_angle'] == pytest.approx(truth, abs=2.0)
+        assert reading['value'] == pytest.approx(truth / 270 * 300, abs=2.5)
+    assert model.read_analog_gauges(frame, gauge_type='pressure') == readings
+    assert model.read_analog_gauge(np.full((480, 640), 120, dtype=np.uint8))['error'] == 'Gauge not detected'
+
+
+def test_read_gauge_stream_reuses_circles_until_the_scene_changes(monkeypatch):
+    model = PaddleOCRModel()
+    detections = []
+    detect = model._detect_gauge_circles
+    monkeypatch.setattr(model, "_detect_gauge_circles", lambda gray: detections.append(1) or detect(gray))
+
+    first = model.read_gauge_stream("cam-1", _gauge_frame({300: 30.0, 900: 200.0}))
+    assert [r['tracked'] for r in first] == [False, False]
+
+    truths = {300: 35.0, 900: 190.0}
+    moved = model.read_gauge_stream("cam-1", _gauge_frame(truths, seed=1))
+    assert len(detections) == 1
+    assert [r['tracked'] for r in moved] == [True, True]
+    for reading in moved:
+        truth = truths[min(truths, key=lambda cx: abs(cx - reading['center'][0]))]
+        assert reading['needle_angle'] == pytest.approx(truth, abs=2.0)
+
+    # Bumping the camera invalidates the cached circles
+    shifted = model.read_gauge_stream("cam-1", _gauge_frame(truths, shift=80, seed=2))
+    assert len(detections) == 2
+    assert not shifted[0]['tracked']
+    assert sorted(r['center'][0] for r in shifted) == pytest.approx([380, 980], abs=5)
+
+    model.read_gauge_stream("cam-2", _gauge_frame(truths, seed=3))
+    assert len(detections) == 3
+    model.reset_gauge_stream("cam-1")
+    assert set(model.gauge_tracks) == {"cam-2"}
+
+def test_ocr_cache_serves_near_identical_images_per_component(tmp_path):
+    import cv2
+    from app.ml.ocr_cache import OCRResultCache, dhash
+
+    def label(text, seed):
+        image = np.random.default_rng(seed).integers(90, 140, (540, 960, 3), dtype=np.uint8)
+        for line in range(3):
+            cv2.putText(image, f"{text} CB-{line}", (40, 120 + line * 150), cv2.FONT_HERSHEY_SIMPLEX, 1.8, (20, 20, 20), 4)
+        return image
+
+    class CountingPaddle:
+        def __init__(self):
+            self.rec_images = 0
+
+        def ocr(self, img, det=True, rec=True, cls=False):
+            if det:
+                return [[[[0, 0], [90, 0], [90, 40], [0, 40]]]]
+            self.rec_images += len(img)
+            return [[("B4-SECTOR-01", 0.93) for _ in img]]
+
+    disk_path = str(tmp_path / "ocr.sqlite")
+    model = PaddleOCRModel(batch_size=4, cache=OCRResultCache(max_entries=2, disk_path=disk_path))
+    model.model = CountingPaddle()
+
+    first = model.extract_text_batch([label("COMP-001", 0), label("COMP-002", 1)], component_ids=["C1", "C2"])
+    assert model.model.rec_images == 2
+    # A re-photo with fresh sensor noise is served from the cache; another label is not
+    again = model.extract_text_batch([label("COMP-001", 2), label("FEEDER PANEL 4", 3)], component_ids=["C1", "C2"])
+    assert model.model.rec_images == 3
+    assert again[0] == first[0]
+    # Images without a component id always go to the recognizer
+    model.extract_text(label("COMP-001", 4))
+    assert model.model.rec_images == 4
+
+    model.extract_text(label("COMP-003", 5), component_id="C3")
+    metrics = model.cache.metrics()
+    assert metrics['entries'] == 2 and metrics['evictions'] == 1
+    assert metrics['hits'] == 1 and metrics['misses'] == 4
+
+    # The SQLite tier survives a restart and promotes what it finds
+    restarted = OCRResultCache(max_entries=2, disk_path=disk_path)
+    image_hash = dhash(label("COMP-001", 6))
+    assert restarted.get("C1", image_hash)['extracted_text'] == first[0]['extracted_text']
+    assert restarted.metrics()['disk_hits'] == 1
+    restarted.invalidate("C1")
+    assert restarted.get("C1", image_hash) is None
+
+def test_ocr_cache_skips_simulated_fallback_results(tmp_path):
+    from app.ml.ocr_cache import OCRResultCache
+
+    class FlakyPaddle:
+        def __init__(self):
+            self.failures = 1
+
+        def ocr(self, img, det=True, rec=True, cls=False):
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("transient inference error")
+            if det:
+                return [[[[0, 0], [90, 0], [90, 40], [0, 40]]]]
+            return [[("SN-REAL-0042", 0.95) for _ in img]]
+
+    image = np.random.default_rng(0).integers(90, 140, (120, 240, 3), dtype=np.uint8)
+    model = PaddleOCRModel(cache=OCRResultCache(disk_path=str(tmp_path / "ocr.sqlite")))
+    model.model = FlakyPaddle()
+
+    fallback = model.extract_text(image, component_id="C1")
+    assert "SN-REAL-0042" not in fallback['extracted_text']
+    assert model.cache.metrics()['entries'] == 0
+
+    assert model.extract_text(image, component_id="C1")['extracted_text'] == "SN-REAL-0042"
+    assert model.extract_text(image, component_id="C1")['extracted_text'] == "SN-REAL-0042"
+    assert model.cache.metrics()['hits'] == 1
+
+def test_schematic_pages_stream_in_order_with_layout_and_ocr(tmp_path):
+    pytest.importorskip("pymupdf")
+    import cv2
+    from app.ml.schematic_layout import open_pdf
+
+    path = str(tmp_path / "schematic.pdf")
+    document = open_pdf(None)
+    page = document.new_page()
+    page.insert_text((72, 90), "Astra-Grid Infrastructure Report", fontsize=32)
+    page.insert_text((72, 130), "Autonomous Telecom Guardian", fontsize=18)
+    page.insert_text((72, 200), "Breakers and feeders monitored in the sector.", fontsize=12)
+    page.insert_text((72, 230), "• Replace CB-12 in B4-SECTOR-03", fontsize=12)
+    page.insert_text((72, 260), "Fiber patch panels are inspected weekly.", fontsize=12)
+    scan = np.full((400, 300, 3), 245, dtype=np.uint8)
+    cv2.putText(scan, "CB-07", (40, 100), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (20, 20, 20), 3)
+    scan_page = document.new_page(width=612, height=792)
+    scan_page.insert_image(scan_page.rect, stream=cv2.imencode(".png", scan)[1].tobytes())
+    for number in range(3):
+        document.new_page().insert_text((72, 90), f"Sector {number} Layout", fontsize=24)
+    document.save(path)
+
+    class FakePaddle:
+        def ocr(self, img, det=True, rec=True, cls=False):
+            if det:
+                return [[[[100, 200], [300, 200], [300, 260], [100, 260]]]]
+            return [[("CB-07", 0.91) for _ in img]]
+
+    model = PaddleOCRModel()
+    model.model = FakePaddle()
+    pages = model.iter_schematic_pages(path, workers=1, dpi=144)
+    first = next(pages)
+    assert first['page_number'] == 1
+    assert [e['type'] for e in first['layout_elements']] == ['title', 'subtitle', 'paragraph', 'list_item', 'paragraph']
+    assert first['layout_elements'][0]['text'] == "Astra-Grid Infrastructure Report"
+
+    scanned = next(pages)
+    # Pixel boxes at 144 dpi come back in PDF points
+    assert scanned['layout_elements'] == [
+        {'type': 'text', 'text': "CB-07", 'confidence': 0.91, 'bbox': [50.0, 100.0, 150.0, 130.0], 'font_size': 30.0}
+    ]
+    assert len(scanned['images']) == 1 and scanned['images'][0]['bbox'] == [9.0, 0.0, 603.0, 792.0]
+    assert [p['page_number'] for p in pages] == [3, 4, 5]
+
+    # Worker processes yield the same text-layer layout in page order
+    pooled = list(PaddleOCRModel().iter_schematic_pages(path, workers=2))
+    assert [p['page_number'] for p in pooled] == [1, 2, 3, 4, 5]
+    assert pooled[0]['layout_elements'] == first['layout_elements']
+
+    summary = model.process_schematic(path, workers=1)
+    assert summary['total_pages'] == 5
+    assert summary['element_counts'] == {'title': 1, 'subtitle': 1, 'paragraph': 2, 'list_item': 1, 'text': 1, 'heading': 3}
+    assert summary['markdown'].startswith("# Astra-Grid Infrastructure Report\n\n## Sector 0 Layout")
+
+def test_extract_text_tiled_reads_only_text_regions_in_frame_coordinates():
+    import cv2
+
+    frame = np.full((1500, 2000, 3), 150, dtype=np.uint8)
+    labels = {"CB-12 230V": (300, 400), "FEEDER-7": (1200, 1100)}
+    for text, (x, y) in labels.items():
+        cv2.rectangle(frame, (x - 20, y - 60), (x + 420, y + 30), (235, 235, 235), -1)
+        cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (20, 20, 20), 3)
+    cv2.circle(frame, (1700, 300), 20, (60, 60, 60), -1)
+
+    class FakePaddle:
+        """Detects the bounding box of dark ink in each image and reads its position back"""
+        def __init__(self):
+            self.det_pixels = 0
+
+        def ocr(self, img, det=True, rec=True, cls=False):
+            if det:
+                self.det_pixels += img.shape[0] * img.shape[1]
+                ys, xs = np.nonzero(img.min(axis=2) < 60)
+                return [[[[xs.min(), ys.min()], [xs.max(), ys.min()], [xs.max(), ys.max()], [xs.min(), ys.max()]]]]
+            return [[("INK", 0.9) for _ in img]]
+
+    model = PaddleOCRModel()
+    model.model = FakePaddle()
+    regions = model.propose_text_regions(frame)
+    assert len(regions) == 2
+    assert not any(x0 <= 1700 <= x1 and y0 <= 300 <= y1 for x0, y0, x1, y1 in regions)
+
+    result = model.extract_text_tiled(frame)
+    assert result['extracted_text'] == "INK INK"
+    assert model.model.det_pixels < 0.2 * frame.shape[0] * frame.shape[1]
+    for detail, (x, y) in zip(result['details'], labels.values()):
+        (x0, y0), _, (x1, y1), _ = detail['bbox']
+        assert x0 == pytest.approx(x, abs=4) and y1 == pytest.approx(y, abs=4)
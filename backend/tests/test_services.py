@@ -12,12 +12,62 @@ async def test_ocr_service_scan():
     assert "scan_id" in result
     assert "components" in result
 
+@pytest.mark.asyncio
+async def test_ocr_service_process_image_decodes_and_forwards_component():
+    import cv2
+    import numpy as np
+
+    class Model:
+        def extract_text(self, image, component_id=None):
+            return {"shape": image.shape, "component_id": component_id}
+
+    _, encoded = cv2.imencode(".png", np.zeros((40, 60, 3), dtype=np.uint8))
+    result = await OCRService(model=Model()).process_image(encoded.tobytes(), component_id="B4-COMP-001")
+    assert result == {"shape": (40, 60, 3), "component_id": "B4-COMP-001"}
+    with pytest.raises(ValueError):
+        await OCRService(model=Model()).process_image(b"not an image")
+
+@pytest.mark.asyncio
+async def test_ocr_service_process_image_decodes_off_the_event_loop(monkeypatch):
+    import threading
+    import cv2
+    import numpy as np
+    from app.services import ocr_service
+
+    decoded_on = []
+    decode = ocr_service.decode_image
+    monkeypatch.setattr(ocr_service, "decode_image",
+                        lambda *args: decoded_on.append(threading.current_thread()) or decode(*args))
+
+    class Model:
+        def extract_text(self, image, component_id=None):
+            return {"shape": image.shape}
+
+    _, encoded = cv2.imencode(".png", np.zeros((40, 60, 3), dtype=np.uint8))
+    await OCRService(model=Model()).process_image(encoded.tobytes())
+    assert decoded_on and decoded_on[0] is not threading.main_thread()
+
 @pytest.mark.asyncio
 async def test_ernie_service_generate():
     service = ERNIEService()
     result = await service.generate_response("Test prompt")
     assert isinstance(result, str)
 
+@pytest.mark.asyncio
+async def test_ernie_service_stream():
+    class Model:
+        def stream_generate(self, prompt, cancel=None):
+            yield from ["Breaker ", "CB-12 ", "nominal"]
+
+    service = ERNIEService(model=Model())
+    chunks = [chunk async for chunk in await service.generate_response("Test prompt", stream=True)]
+    assert chunks == ["Breaker ", "CB-12 ", "nominal"]
+    assert await service.generate_response("Test prompt") == "Breaker CB-12 nominal"
+
+    frames = [frame async for frame in AgentService(ERNIEService(model=Model())).stream_command({"prompt": "x"})]
+    assert [frame["type"] for frame in frames] == ["token", "token", "token", "complete"]
+    assert frames[-1]["response"] == "Breaker CB-12 nominal"
+
 @pytest.mark.asyncio
 async def test_agent_service_workflow():
     service = AgentService()
@@ -29,3 +79,359 @@ async def test_bigquery_service_validate():
     service = BigQueryService()
     result = await service.validate_data("COMP-001", {"text": "test"})
     assert "valid" in result
+
+@pytest.mark.asyncio
+async def test_scan_pipeline_streams_components_with_backpressure():
+    import asyncio
+    from app.services.scan_pipeline import ScanPipeline
+
+    scanned = []
+
+    class Scanner(OCRService):
+        async def scan_components(self, sector):
+            for index in range(30):
+                scanned.append(index)
+                yield {"id": f"{sector}-COMP-{index:03d}", "status": "normal", "confidence": 0.9}
+
+    class Store(BigQueryService):
+        def __init__(self):
+            super().__init__()
+            self.release = asyncio.Event()
+            self.stored = []
+
+        async def store_scan_result(self, record):
+            await self.release.wait()
+            if record["id"].endswith("007"):
+                raise RuntimeError("insert failed")
+            self.stored.append(record)
+            return {"stored": True}
+
+    store = Store()
+    pipeline = ScanPipeline(ocr_service=Scanner(), bigquery_service=store, queue_size=2,
+                            workers={"scan": 1, "ocr": 1, "prediction": 1, "compliance": 1, "persistence": 1})
+    try:
+        run = asyncio.create_task(pipeline.run_sector("B4-SECTOR-01"))
+        await asyncio.sleep(0.05)
+        # Persistence is stalled: the queues fill up and the scanner waits instead of running ahead
+        # (one in hand per worker and two queued, for each of the four component stages, plus the scanner's)
+        assert len(scanned) == 4 * (1 + 2) + 1
+        assert all(stage["queue_depth"] <= 2 for stage in pipeline.metrics().values())
+
+        store.release.set()
+        result = await asyncio.wait_for(run, timeout=5)
+    finally:
+        await pipeline.stop()
+
+    assert result["components_scanned"] == 30
+    assert len(result["components"]) == 29
+    assert result["errors"] == [{"component_id": "B4-SECTOR-01-COMP-007", "error": "persistence: insert failed"}]
+    record = result["components"][0]
+    assert record["scan_id"] == result["scan_id"]
+    assert record["analysis"]["risk_category"] == "Stable"
+    assert record["compliance"] == {"violations": [], "requires_review": False}
+
+    metrics = pipeline.metrics()
+    assert metrics["ocr"]["processed"] == 30
+    assert metrics["persistence"]["processed"] == 29 and metrics["persistence"]["failed"] == 1
+    assert metrics["scan"]["processed"] == 1
+
+@pytest.mark.asyncio
+async def test_scan_pipeline_waits_for_components_in_flight_when_the_scan_fails():
+    import asyncio
+    from app.services.scan_pipeline import ScanPipeline
+
+    class Scanner(OCRService):
+        async def scan_components(self, sector):
+            yield {"id": f"{sector}-COMP-000", "status": "normal", "confidence": 0.9}
+            raise RuntimeError("scanner arm jammed")
+
+    class Store(BigQueryService):
+        def __init__(self):
+            super().__init__()
+            self.release = asyncio.Event()
+
+        async def store_scan_result(self, record):
+            await self.release.wait()
+            return {"stored": True}
+
+    store = Store()
+    pipeline = ScanPipeline(ocr_service=Scanner(), bigquery_service=store)
+    try:
+        run = await pipeline.submit("B4-SECTOR-01")
+        await asyncio.sleep(0.05)
+        # The scan has failed but its one component is still being persisted
+        assert run.scan_finished and not run.done.is_set()
+
+        store.release.set()
+        await asyncio.wait_for(run.done.wait(), timeout=5)
+    finally:
+        await pipeline.stop()
+
+    result = run.result()
+    assert [component["id"] for component in result["components"]] == ["B4-SECTOR-01-COMP-000"]
+    assert result["errors"] == [] and result["scan_error"] == "scanner arm jammed"
+
+@pytest.mark.asyncio
+async def test_scan_pipeline_finishes_when_the_broadcast_fails():
+    import asyncio
+    from app.services.broadcast_hub import BroadcastHub
+    from app.services.scan_pipeline import ScanPipeline
+
+    class Scanner(OCRService):
+        async def scan_components(self, sector):
+            for index in range(3):
+                yield {"id": f"{sector}-COMP-{index:03d}", "status": "normal", "confidence": 0.9}
+
+    class BrokenHub(BroadcastHub):
+        def publish(self, topics, event, key=None):
+            if event.get("type") == "component":
+                raise RuntimeError("dashboard socket closed")
+            return super().publish(topics, event, key=key)
+
+    pipeline = ScanPipeline(ocr_service=Scanner(), hub=BrokenHub(),
+                            workers={"scan": 1, "ocr": 1, "prediction": 1, "compliance": 1, "persistence": 1})
+    try:
+        result = await asyncio.wait_for(pipeline.run_sector("B4-SECTOR-01"), timeout=5)
+    finally:
+        await pipeline.stop()
+
+    # The broadcast is best-effort: every component still completes and the persistence worker survives
+    assert len(result["components"]) == 3 and result["errors"] == []
+    assert pipeline.metrics()["persistence"]["processed"] == 3
+
+@pytest.mark.asyncio
+async def test_scan_jobs_reject_submits_past_capacity_without_orphan_rows(tmp_path):
+    import asyncio
+    from sqlalchemy import create_engine, inspect, text
+    from sqlalchemy.orm import sessionmaker
+    from app.models import ScanResult
+    from app.services.scan_jobs import ScanJobQueue, ScanResultStore
+    from app.services.scan_pipeline import ScanPipeline
+    from app.utils.migrations import add_missing_columns
+
+    # A scan_results table from before jobs had a status
+    engine = create_engine(f"sqlite:///{tmp_path / 'scans.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE scan_results (id INTEGER PRIMARY KEY, scan_id VARCHAR UNIQUE, "
+                                "sector VARCHAR, components_scanned INTEGER, timestamp DATETIME, scan_data JSON)"))
+        connection.execute(text("INSERT INTO scan_results (scan_id, sector, components_scanned) "
+                                "VALUES ('SCAN-OLD', 'B4-SECTOR-01', 3)"))
+    add_missing_columns(engine, ScanResult.__table__)
+    assert "ix_scan_results_status" in {index["name"] for index in inspect(engine).get_indexes("scan_results")}
+    store = ScanResultStore(sessionmaker(bind=engine))
+    assert store.get("SCAN-OLD")["status"] == "completed"
+
+    release = asyncio.Event()
+
+    class Scanner(OCRService):
+        async def scan_components(self, sector):
+            await release.wait()
+            yield {"id": f"{sector}-COMP-000", "status": "normal", "confidence": 0.9}
+
+    jobs = ScanJobQueue(pipeline=ScanPipeline(ocr_service=Scanner()), store=store, workers=1, max_pending=3)
+    try:
+        results = await asyncio.gather(*(jobs.submit("B4-SECTOR-01") for _ in range(8)), return_exceptions=True)
+    finally:
+        release.set()
+        await jobs.stop()
+
+    accepted = [result for result in results if isinstance(result, dict)]
+    assert all(isinstance(result, asyncio.QueueFull) for result in results if not isinstance(result, dict))
+    assert 3 <= len(accepted) < 8
+    # Only accepted jobs have a row; rejected ones never wrote one
+    with sessionmaker(bind=engine)() as db:
+        assert db.query(ScanResult).filter(ScanResult.scan_id != "SCAN-OLD").count() == len(accepted)
+
+@pytest.mark.asyncio
+async def test_scan_scheduler_prioritizes_high_and_shares_fairly_between_sectors():
+    import asyncio
+    from app.services.scan_scheduler import ScanScheduler
+
+    scheduler = ScanScheduler(sector_concurrency=10, sector_weights={}, max_pending=100,
+                              priority_weights={"high": 1.0, "medium": 1.0, "low": 1.0})
+    for index in range(4):
+        await scheduler.put(f"A{index}", "A")
+    for index in range(2):
+        await scheduler.put(f"B{index}", "B")
+    await scheduler.put("C0", "C", priority="high")
+
+    order = [(await scheduler.get())[0] for _ in range(7)]
+    # A busy sector A does not hold B back, and the late high-priority job jumps the queue
+    assert order == ["C0", "A0", "B0", "A1", "B1", "A2", "A3"]
+    metrics = scheduler.metrics()
+    assert metrics["wait_seconds"]["high"]["dispatched"] == 1
+    assert metrics["wait_seconds"]["medium"]["dispatched"] == 6
+
+    scheduler = ScanScheduler(sector_concurrency=1, max_pending=3)
+    for item, sector in (("A0", "A"), ("A1", "A"), ("B0", "B")):
+        await scheduler.put(item, sector)
+    with pytest.raises(asyncio.QueueFull):
+        await scheduler.put("B1", "B")
+    assert [await scheduler.get(), await scheduler.get()] == [("A0", "A"), ("B0", "B")]
+    # A second scan of A waits for the first to be released
+    waiting = asyncio.create_task(scheduler.get())
+    await asyncio.sleep(0.01)
+    assert not waiting.done() and scheduler.metrics()["sectors_scanning"] == {"A": 1, "B": 1}
+    await scheduler.release("A")
+    assert await asyncio.wait_for(waiting, timeout=1) == ("A1", "A")
+
+    # Sectors that are only queued are not reported as scanning
+    scheduler = ScanScheduler(sector_concurrency=1)
+    for item, sector in (("A0", "A"), ("B0", "B")):
+        await scheduler.put(item, sector)
+    assert await scheduler.get() == ("A0", "A")
+    assert scheduler.metrics()["sectors_scanning"] == {"A": 1}
+    await scheduler.release("A")
+    assert scheduler.metrics()["sectors_scanning"] == {}
+
+@pytest.mark.asyncio
+async def test_agent_workflow_fans_out_per_component_under_bounds(monkeypatch):
+    import asyncio
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "AGENT_CONCURRENCY", {"scout": 2, "analyst": 3, "auditor": 3, "orchestrator": 2})
+    monkeypatch.setattr(settings, "AGENT_NODE_TIMEOUTS", {"analyst": 0.5})
+
+    scanning = set()
+    both_scanning = asyncio.Event()
+    analysts_saturated = asyncio.Event()
+
+    class Scanner(OCRService):
+        async def scan_components(self, sector):
+            # Sectors are scouted together: neither scan goes on until both have started
+            scanning.add(sector)
+            if len(scanning) == 2:
+                both_scanning.set()
+            await asyncio.wait_for(both_scanning.wait(), timeout=5)
+            for index in range(6):
+                yield {"id": f"{sector}-COMP-{index}", "status": "overheat" if index == 0 else "normal"}
+
+    class Agents(AgentService):
+        active = peak = 0
+
+        async def predict_component(self, component):
+            Agents.active += 1
+            Agents.peak = max(Agents.peak, Agents.active)
+            if Agents.active == 3:
+                analysts_saturated.set()
+            try:
+                if component["id"] == "B4-SECTOR-02-COMP-5":
+                    # One analyst hangs and is cut off by its timeout
+                    await asyncio.sleep(5)
+                else:
+                    # Independent analysts overlap: each waits until three are running at once
+                    await asyncio.wait_for(analysts_saturated.wait(), timeout=5)
+            finally:
+                Agents.active -= 1
+            score = 0.9 if component["status"] == "overheat" else 0.1
+            return {"risk_score": score, "risk_category": "Critical" if score > 0.7 else "Stable"}
+
+    first, second = await Agents(scout=Scanner()).execute_workflows(["B4-SECTOR-01", "B4-SECTOR-02"])
+
+    # 12 analysts overlapping up to, and never past, the bound of 3, with both sectors scouted together
+    assert both_scanning.is_set() and analysts_saturated.is_set()
+    assert Agents.peak == 3
+    assert first["workflow_status"] == "completed"
+    assert first["components_analyzed"] == 6
+    assert first["violations"] == 2  # the overheating component breaches OSHA 1910.269 and NFPA 70E
+    assert first["stage_timings"]["analyst"]["nodes"] == 6
+
+    assert second["workflow_status"] == "completed_with_errors"
+    assert second["components_analyzed"] == 5
+    assert second["errors"]["analyst:B4-SECTOR-02-COMP-5"]["kind"] == "timeout"
+    assert second["errors"]["auditor:B4-SECTOR-02-COMP-5"]["kind"] == "skipped"
+    assert len(second["digital_twin"]["components"]) == 5
+
+@pytest.mark.asyncio
+async def test_broadcast_hub_fans_out_once_and_coalesces_per_client():
+    import asyncio
+    import json
+    from app.services.broadcast_hub import BroadcastHub
+
+    hub = BroadcastHub(buffer_size=3)
+    dashboards = [hub.subscribe(["sector:B4-SECTOR-01", "agent:analyst"]) for _ in range(100)]
+    other = hub.subscribe(["sector:B4-SECTOR-02"])
+
+    assert hub.publish(["sector:B4-SECTOR-01", "agent:analyst"], {"component_id": "C1", "risk": 0.1},
+                       key="C1") == 100
+    assert json.loads(await dashboards[0].get()) == {"component_id": "C1", "risk": 0.1}
+
+    # A client that is not reading sees the latest state per component, within its buffer
+    slow = dashboards[1]
+    for risk in (0.2, 0.5, 0.9):
+        hub.publish(["agent:analyst"], {"component_id": "C2", "risk": risk}, key="C2")
+    for index in range(4):
+        hub.publish(["sector:B4-SECTOR-01"], {"event": index})
+    messages = [json.loads(await slow.get()) for _ in range(slow.pending())]
+    assert messages == [{"event": 1}, {"event": 2}, {"event": 3}]
+    # C1 (never read), C2 and event 0 were pushed out
+    assert slow.dropped == 3 and slow.coalesced == 2
+
+    assert other.pending() == 0
+    hub.unsubscribe(other)
+    idle = hub.subscribe(["agent:auditor"])
+    waiting = asyncio.create_task(idle.get())
+    await asyncio.sleep(0)
+    assert not waiting.done()
+    hub.publish(["agent:auditor"], {"component_id": "C3"})
+    assert json.loads(await asyncio.wait_for(waiting, timeout=1)) == {"component_id": "C3"}
+    assert hub.metrics()["topics"] == {"sector:B4-SECTOR-01": 100, "agent:analyst": 100, "agent:auditor": 1}
+
+@pytest.mark.asyncio
+async def test_bigquery_service_validate_many_against_local_reference_store(tmp_path):
+    from app.services.reference_store import ReferenceStore, SQLiteReferenceStore
+    from app.utils.bloom import BloomFilter
+
+    class Store(SQLiteReferenceStore):
+        queries = []
+
+        def fetch(self, serials):
+            Store.queries.append(list(serials))
+            return super().fetch(serials)
+
+    store = Store(str(tmp_path / "reference.db"))
+    store.upsert({"serial": f"SN-{index:05d}", "component_id": f"B4-SECTOR-01-COMP-{index:03d}",
+                  "status": "normal", "component_type": "breaker"} for index in range(500))
+    service = BigQueryService(store=store)
+
+    report = await service.validate_many([
+        {"component_id": "B4-SECTOR-01-COMP-001", "serial": "sn-00001", "status": "Normal"},
+        {"component_id": "B4-SECTOR-01-COMP-002", "serial": "SN-00002", "status": "overheat"},
+        {"component_id": "B4-SECTOR-01-COMP-003", "serial": "SN-99999", "status": "normal"},
+        {"component_id": "B4-SECTOR-01-COMP-004", "status": "normal"}
+    ])
+    first, mismatch, hallucinated, unreadable = report["results"]
+    assert first["valid"] and first["confidence"] == 1.0
+    assert mismatch["mismatches"] == [{"field": "status", "ocr": "overheat", "reference": "normal"}]
+    assert hallucinated["hallucination_detected"] and not hallucinated["valid"]
+    assert not unreadable["valid"] and not unreadable["hallucination_detected"]
+    assert (report["valid"], report["invalid"], report["hallucinations"]) == (1, 3, 1)
+    # One query for the batch, and the unknown serial never reached it
+    assert Store.queries == [["SN-00001", "SN-00002"]]
+
+    assert (await service.validate_data("B4-SECTOR-01-COMP-007", {"serial": "SN-00007"}))["valid"]
+    # The explicit component id wins over one carried in the OCR data
+    overridden = await service.validate_data("B4-SECTOR-01-COMP-007",
+                                             {"serial": "SN-00007", "component_id": "B4-SECTOR-01-COMP-008"})
+    assert overridden["component_id"] == "B4-SECTOR-01-COMP-007" and overridden["valid"]
+
+    # Serials upserted after the filter was built are known, past its capacity too
+    store.upsert([{"serial": "SN-50000", "component_id": "B4-SECTOR-02-COMP-001", "status": "normal"}])
+    assert (await service.validate_many([{"serial": "SN-50000"}]))["valid"] == 1
+    capacity = service.known_serials.capacity
+    store.upsert({"serial": f"SN-6{index:04d}", "status": "normal"} for index in range(capacity))
+    assert service.known_serials.capacity > capacity
+    assert (await service.validate_many([{"serial": f"SN-6{capacity - 1:04d}"}]))["valid"] == 1
+
+    # Serials match whatever case the reference and the OCR reading are in
+    store.upsert([{"serial": " sn-0042", "component_id": "B4-SECTOR-03-COMP-042", "status": "normal"}])
+    lower = (await service.validate_many([{"serial": "sn-0042", "component_id": "B4-SECTOR-03-COMP-042"}]))
+    assert lower["valid"] == 1 and lower["hallucinations"] == 0
+
+    with pytest.raises(TypeError):
+        ReferenceStore()
+
+    known = BloomFilter(1000, 0.01)
+    known.update(f"SN-{index}" for index in range(1000))
+    assert all(f"SN-{index}" in known for index in range(1000))
+    assert sum(f"XX-{index}" in known for index in range(10000)) < 300
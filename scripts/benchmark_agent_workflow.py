@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import time
+import logging
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+sys.path.append(str(Path(__file__).parent))
+from benchmark_scan_pipeline import LATENCY_MS, StandinAgents, StandinScanner
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StandinAuditAgents(StandinAgents):
+    """Analyst and Auditor both awaiting a model (the compliance LLM for borderline cases)"""
+
+    async def audit_component(self, component, analyst_report):
+        await asyncio.sleep(LATENCY_MS['audit'] / 1000)
+        return await super().audit_component(component, analyst_report)
+
+
+async def sequential(agents, sectors):
+    """Chain without an executor: sector after sector, component after component"""
+    analyzed = violations = 0
+    for sector in sectors:
+        components = await agents._scout(sector)
+        for component in components:
+            report = await agents.predict_component(component)
+            audit = await agents.audit_component(component, report)
+            analyzed += 1
+            violations += len(audit["violations"])
+    return analyzed, violations
+
+
+async def main_async(args):
+    LATENCY_MS.update(scan=args.scan_ms / args.components, audit=args.audit_ms)
+    sectors = [f"B4-SECTOR-{index:02d}" for index in range(args.sectors)]
+    agents = StandinAuditAgents(scout=StandinScanner(args.components))
+
+    start = time.perf_counter()
+    analyzed, violations = await sequential(agents, sectors)
+    logger.info(f"sequential: {time.perf_counter() - start:.2f} s, {analyzed} components, {violations} violations")
+
+    start = time.perf_counter()
+    workflows = await agents.execute_workflows(sectors)
+    elapsed = time.perf_counter() - start
+    logger.info(f"  DAG     : {elapsed:.2f} s, {sum(w['components_analyzed'] for w in workflows)} components, "
+                f"{sum(w['violations'] for w in workflows)} violations")
+    for agent, timing in workflows[0]['stage_timings'].items():
+        logger.info(f"  {workflows[0]['sector']} {agent:>12}: {timing['nodes']} nodes, "
+                    f"wall {timing['wall_seconds'] * 1e3:.0f} ms, busy {timing['busy_seconds'] * 1e3:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent workflow: sequential chain vs per-component DAG executor")
+    parser.add_argument("--sectors", type=int, default=4, help="Independent sectors")
+    parser.add_argument("--components", type=int, default=18, help="Components per sector")
+    parser.add_argument("--scan-ms", type=float, default=200, help="Scout pass over one sector")
+    parser.add_argument("--audit-ms", type=float, default=20, help="Auditor latency per component")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
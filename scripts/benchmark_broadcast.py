@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import json
+import time
+import logging
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+from app.services.broadcast_hub import BroadcastHub
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOPIC = "sector:B4-SECTOR-01"
+
+
+class PerConnectionQueues:
+    """Previous shape: every connection owns an unbounded queue and encodes each event itself"""
+
+    def __init__(self):
+        self.queues = []
+
+    def subscribe(self):
+        queue = asyncio.Queue()
+        self.queues.append(queue)
+        return queue
+
+    def publish(self, event, key=None):
+        for queue in self.queues:
+            queue.put_nowait(event)
+
+    @staticmethod
+    async def receive(queue):
+        return json.dumps(await queue.get())
+
+    def buffered(self):
+        return sum(queue.qsize() for queue in self.queues)
+
+
+class Hub:
+    def __init__(self, buffer_size):
+        self.hub = BroadcastHub(buffer_size=buffer_size)
+        self.subscriptions = []
+
+    def subscribe(self):
+        subscription = self.hub.subscribe([TOPIC])
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def publish(self, event, key=None):
+        self.hub.publish([TOPIC], event, key=key)
+
+    @staticmethod
+    async def receive(subscription):
+        return await subscription.get()
+
+    def buffered(self):
+        return sum(subscription.pending() for subscription in self.subscriptions)
+
+
+async def run(fanout, args):
+    latencies, received = [], [0] * args.clients
+    slow = set(range(0, args.clients, max(1, args.clients // max(args.slow, 1)))) if args.slow else set()
+
+    async def client(index, inbox):
+        while True:
+            message = json.loads(await fanout.receive(inbox))
+            if index not in slow:
+                latencies.append(time.perf_counter() - message["sent"])
+            received[index] += 1
+            # A socket write; slow dashboards take a while per frame
+            await asyncio.sleep(args.slow_ms / 1000 if index in slow else 0)
+
+    tasks = [asyncio.create_task(client(index, fanout.subscribe())) for index in range(args.clients)]
+    await asyncio.sleep(0.05)
+
+    peak_buffered = 0
+    start = time.perf_counter()
+    for burst in range(args.bursts):
+        for update in range(args.updates):
+            component = f"B4-SECTOR-01-COMP-{(burst * args.updates + update) % args.components:03d}"
+            fanout.publish({"component_id": component, "risk_score": update / args.updates, "sent": time.perf_counter()},
+                           key=component)
+        peak_buffered = max(peak_buffered, fanout.buffered())
+        await asyncio.sleep(args.interval_ms / 1000)
+    while fanout.buffered() and time.perf_counter() - start < 30:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    for task in tasks:
+        task.cancel()
+
+    fast = [count for index, count in enumerate(received) if index not in slow]
+    return {
+        'p50_ms': np.percentile(latencies, 50) * 1e3,
+        'p99_ms': np.percentile(latencies, 99) * 1e3,
+        'drain_s': elapsed,
+        'peak_buffered': peak_buffered,
+        'per_fast_client': np.mean(fast),
+        'per_slow_client': np.mean([received[index] for index in slow]) if slow else 0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Broadcast latency to simulated dashboard clients")
+    parser.add_argument("--clients", type=int, default=1000, help="Simulated WebSocket clients")
+    parser.add_argument("--slow", type=int, default=50, help="How many of them are slow consumers")
+    parser.add_argument("--slow-ms", type=float, default=20, help="Per-frame send time of a slow client")
+    parser.add_argument("--components", type=int, default=20, help="Distinct components updated")
+    parser.add_argument("--updates", type=int, default=40, help="Updates per burst")
+    parser.add_argument("--bursts", type=int, default=10, help="Bursts published")
+    parser.add_argument("--interval-ms", type=float, default=50, help="Pause between bursts")
+    parser.add_argument("--buffer-size", type=int, default=256, help="Hub per-client buffer")
+    args = parser.parse_args()
+
+    logger.info(f"{args.clients} clients ({args.slow} slow), {args.bursts} bursts of {args.updates} updates "
+                f"over {args.components} components")
+    for label, fanout in (("per-connection queues", PerConnectionQueues()), ("broadcast hub", Hub(args.buffer_size))):
+        stats = asyncio.run(run(fanout, args))
+        logger.info(f"{label:>21}: latency p50 {stats['p50_ms']:.0f} ms, p99 {stats['p99_ms']:.0f} ms | "
+                    f"drained in {stats['drain_s']:.2f} s | peak buffered {stats['peak_buffered']} messages | "
+                    f"frames per fast client {stats['per_fast_client']:.0f}, per slow client {stats['per_slow_client']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import time
+import logging
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+sys.path.append(str(Path(__file__).parent))
+from app.ml.failure_predictor import FailurePredictor
+from app.ml.llamafactory_model import LLaMAFactoryModel
+from benchmark_failure_predictor import generate_telemetry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STATUSES = {'Critical': "Overheat", 'Warning': "Warning", 'Stable': "Normal"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Share of compliance checks settled by the rule engine")
+    parser.add_argument("--components", type=int, default=10000, help="Number of components")
+    parser.add_argument("--readings", type=int, default=48, help="Readings per component")
+    parser.add_argument("--llm-ms", type=float, default=2000.0,
+                        help="Assumed latency of one 512-token compliance generation")
+    args = parser.parse_args()
+
+    predictions = FailurePredictor().predict_batch(generate_telemetry(args.components, args.readings))
+    rng = np.random.default_rng(0)
+    components, reports = [], []
+    for row in predictions.itertuples():
+        # Mostly consistent statuses, with some that contradict the score
+        status = STATUSES[row.risk_category] if rng.random() < 0.9 else rng.choice(["Offline", "Overheat"])
+        components.append({'component_id': row.component_id, 'status': status})
+        reports.append({'risk_category': row.risk_category, 'risk_score': row.risk_score})
+
+    model = LLaMAFactoryModel(use_prefix_cache=False)
+    model._generate = lambda prompt: ""
+
+    start = time.perf_counter()
+    for comp, report in zip(components, reports):
+        model.rule_engine.resolve(comp, report)
+    resolve_time = time.perf_counter() - start
+
+    model.batch_validate(components, reports)
+    metrics = model.validation_metrics()
+
+    logger.info(f"Components: {args.components}, categories: {predictions['risk_category'].value_counts().to_dict()}")
+    logger.info(f"Rule lookup: {resolve_time / args.components * 1e6:.2f} us/component")
+    logger.info(f"Settled by rules: {metrics['rules']} ({metrics['rules_fraction']:.1%}), sent to LLM: {metrics['llm']}")
+    logger.info(
+        f"Estimated generation time at {args.llm_ms:.0f} ms/call: "
+        f"{args.components * args.llm_ms / 1e3:.0f}s all-LLM vs {metrics['llm'] * args.llm_ms / 1e3:.0f}s tiered"
+    )
+
+
+if __name__ == "__main__":
+    main()
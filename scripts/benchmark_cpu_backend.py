@@ -0,0 +1,96 @@
+import argparse
+import multiprocessing as mp
+import resource
+import tempfile
+import time
+import logging
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+sys.path.append(str(Path(__file__).parent))
+from standin_checkpoint import build_standin_checkpoint
+from benchmark_model_loading import read_memory_kb
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COMPONENT = {
+    'component_id': "B4-SECTOR-01-COMP-007",
+    'status': "Warning",
+    'temperature': 68.5,
+    'voltage': 228.3,
+    'last_maintenance': "2024-01-01"
+}
+# Warning band, so the rule engine hands validate_compliance to the LLM
+ANALYST_REPORT = {'risk_category': "Warning", 'risk_score': 0.55}
+
+
+def run_backend(backend: str, paths: dict, new_tokens: int, requests: int, num_threads: int, results):
+    """Throughput and peak RSS of both wrappers on one inference backend"""
+    from app.ml.model_registry import ModelRegistry
+    from app.ml.response_cache import ResponseCache
+    from app.ml.unsloth_model import UnslothModel
+    from app.ml.llamafactory_model import LLaMAFactoryModel
+
+    registry = ModelRegistry(paths["base"], backend=backend, num_threads=num_threads)
+    cache = ResponseCache(max_entries=0)
+    generation_kwargs = {'max_new_tokens': new_tokens, 'min_new_tokens': new_tokens, 'do_sample': False}
+
+    unsloth = UnslothModel(model_path=paths["astra-grid-unsloth"], registry=registry, cache=cache)
+    llamafactory = LLaMAFactoryModel(model_path=paths["astra-grid-llamafactory"], registry=registry, cache=cache)
+    stats = {}
+    for wrapper in (unsloth, llamafactory):
+        wrapper.GENERATION_KWARGS = generation_kwargs
+        wrapper.load_model()
+
+    for name, call in (("predict_failure", lambda: unsloth.predict_failure(COMPONENT)),
+                       ("validate_compliance", lambda: llamafactory.validate_compliance(COMPONENT, ANALYST_REPORT))):
+        call()
+        start = time.perf_counter()
+        for _ in range(requests):
+            call()
+        stats[name] = new_tokens * requests / (time.perf_counter() - start)
+
+    footprint = registry.memory_footprint()
+    stats["parameter_mb"] = (footprint['base_bytes'] + footprint['adapter_bytes']) / 2 ** 20
+    stats["rss_mb"] = read_memory_kb()["Rss"] / 1024
+    stats["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put(stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tokens/s and peak RSS of the CPU inference backends")
+    parser.add_argument("--layers", type=int, default=8, help="Stand-in base model layers")
+    parser.add_argument("--embd", type=int, default=768, help="Stand-in base model width")
+    parser.add_argument("--new-tokens", type=int, default=32, help="Tokens generated per request")
+    parser.add_argument("--requests", type=int, default=5, help="Timed requests per call")
+    parser.add_argument("--threads", type=int, default=0, help="CPU threads (0 = all available cores)")
+    parser.add_argument("--backends", nargs="+", default=["cpu", "cpu-int8"], help="Backends to compare")
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Llama-style stand-in: nn.Linear layers like ERNIE, which dynamic quantization acts on
+        paths = build_standin_checkpoint(tmp, n_layer=args.layers, n_embd=args.embd, architecture="llama")
+
+        for backend in args.backends:
+            results = ctx.Queue()
+            process = ctx.Process(
+                target=run_backend,
+                args=(backend, paths, args.new_tokens, args.requests, args.threads, results)
+            )
+            process.start()
+            stats = results.get()
+            process.join()
+
+            logger.info(
+                f"{backend:>9}: predict_failure {stats['predict_failure']:.1f} tok/s, "
+                f"validate_compliance {stats['validate_compliance']:.1f} tok/s, "
+                f"parameters {stats['parameter_mb']:.0f} MiB, RSS {stats['rss_mb']:.0f} MiB "
+                f"(peak {stats['peak_rss_mb']:.0f} MiB)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import time
+import logging
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+from app.ml.failure_predictor import FailurePredictor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def generate_telemetry(n_components: int, readings: int, seed: int = 42) -> pd.DataFrame:
+    """Generate synthetic long-format telemetry for a fleet of components"""
+    rng = np.random.default_rng(seed)
+    n_rows = n_components * readings
+    step = np.tile(np.arange(readings), n_components)
+
+    return pd.DataFrame({
+        'component_id': np.repeat([f"COMP-{i:05d}" for i in range(n_components)], readings),
+        'timestamp': pd.Timestamp("2025-01-01") + pd.to_timedelta(step, unit="min"),
+        'temperature_c': 45 + rng.normal(0, 4, n_rows) + step * np.repeat(rng.uniform(0, 1, n_components), readings),
+        'voltage_v': 230 + rng.normal(0, 3, n_rows),
+        'current_a': rng.gamma(2.0, 5.0, n_rows)
+    })
+
+
+def benchmark_loop(predictor: FailurePredictor, telemetry: pd.DataFrame) -> float:
+    """Time the per-component predict() loop"""
+    start = time.perf_counter()
+    for component_id, history in telemetry.groupby('component_id', sort=False):
+        predictor.predict({'component_id': component_id}, history)
+    return time.perf_counter() - start
+
+
+def benchmark_batch(predictor: FailurePredictor, telemetry: pd.DataFrame) -> float:
+    """Time a single predict_batch() call"""
+    start = time.perf_counter()
+    predictor.predict_batch(telemetry)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FailurePredictor batch vs per-component scoring")
+    parser.add_argument("--components", type=int, default=10000, help="Number of components")
+    parser.add_argument("--readings", type=int, default=48, help="Readings per component")
+    args = parser.parse_args()
+
+    telemetry = generate_telemetry(args.components, args.readings)
+    predictor = FailurePredictor()
+
+    loop_time = benchmark_loop(predictor, telemetry)
+    batch_time = benchmark_batch(predictor, telemetry)
+
+    logger.info(f"Components: {args.components} x {args.readings} readings ({len(telemetry)} rows)")
+    logger.info(f"Per-component loop: {loop_time:.3f}s ({loop_time / args.components * 1e6:.1f} us/component)")
+    logger.info(f"predict_batch:      {batch_time:.3f}s ({batch_time / args.components * 1e6:.1f} us/component)")
+    logger.info(f"Speedup: {loop_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import time
+import logging
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+sys.path.append(str(Path(__file__).parent))
+from app.ml.failure_predictor import FailurePredictor
+from app.ml.flat_forest import _load_compiled_traverse
+from benchmark_failure_predictor import generate_telemetry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def time_call(fn, repeats: int) -> float:
+    """Median wall time of fn() in seconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FlatForest against sklearn predict_proba")
+    parser.add_argument("--components", type=int, default=10000, help="Training components")
+    parser.add_argument("--estimators", type=int, default=100, help="Trees in the forest")
+    parser.add_argument("--batch", type=int, default=10000, help="Rows in the batched benchmark")
+    parser.add_argument("--repeats", type=int, default=50, help="Timing repeats")
+    args = parser.parse_args()
+
+    telemetry = generate_telemetry(args.components, 24)
+    predictor = FailurePredictor()
+    component_ids = telemetry['component_id'].unique()
+    labels = pd.Series(np.random.default_rng(1).random(len(component_ids)) < 0.3, index=component_ids)
+    model = predictor.train(telemetry, labels=labels, n_estimators=args.estimators)
+    model.set_params(n_jobs=1)
+
+    _, features = predictor._extract_batch_features(telemetry)
+    X = predictor._feature_matrix(features)
+    X_batch = X[np.random.default_rng(2).integers(0, len(X), args.batch)]
+    X_single = X[:1]
+
+    forest = predictor.forest
+    engines = {"numpy": False}
+    if _load_compiled_traverse() is not None:
+        engines["compiled"] = True
+    # Default routing: flat-array kernels for small batches, sklearn for large ones
+    engines["auto"] = None
+
+    expected = model.predict_proba(X_batch)
+    for compiled in engines.values():
+        np.testing.assert_array_equal(forest.predict_proba(X_batch, compiled=compiled), expected)
+    logger.info(f"Forest: {forest.metadata()} (outputs identical to sklearn)")
+
+    for label, rows in (("single row", X_single), (f"batch of {args.batch}", X_batch)):
+        repeats = args.repeats if len(rows) == 1 else max(args.repeats // 10, 3)
+        sklearn_time = time_call(lambda: model.predict_proba(rows), repeats)
+        report = f"{label:>16}: sklearn {sklearn_time * 1e3:8.3f} ms"
+        for engine, compiled in engines.items():
+            engine_time = time_call(lambda: forest.predict_proba(rows, compiled=compiled), repeats)
+            report += f" | {engine} {engine_time * 1e3:8.3f} ms ({sklearn_time / engine_time:.1f}x)"
+        logger.info(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import multiprocessing as mp
+import pickle
+import tempfile
+import time
+import logging
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+sys.path.append(str(Path(__file__).parent))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def read_memory_kb() -> dict:
+    """Resident and proportional set sizes of this process (Linux /proc)"""
+    memory = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss", "Pss_Anon", "Pss_File"):
+                memory[key] = int(rest.split()[0])
+    return memory
+
+
+def worker(mode: str, artifact_dir: str, pickle_path: str, barrier, results):
+    """Load the forest the way a uvicorn worker would and report its footprint"""
+    from app.ml.failure_predictor import FailurePredictor, FEATURE_NAMES
+
+    X = np.random.default_rng(0).normal(size=(256, len(FEATURE_NAMES)))
+    before = read_memory_kb()
+
+    start = time.perf_counter()
+    if mode == "pickle":
+        with open(pickle_path, "rb") as f:
+            model = pickle.load(f)
+        model.predict_proba(X)
+    else:
+        predictor = FailurePredictor(model_path=artifact_dir)
+        if mode == "mmap":
+            predictor.load_model()
+        else:
+            from app.ml.flat_forest import FlatForest
+            predictor.forest = FlatForest.load(artifact_dir, mmap=False)
+        predictor.forest.predict_proba(X)
+    load_time = time.perf_counter() - start
+
+    # Measure while every worker holds the model so shared pages are split between them
+    barrier.wait()
+    after = read_memory_kb()
+    barrier.wait()
+
+    results.put({
+        "load_ms": load_time * 1000,
+        "rss_delta_kb": after["Rss"] - before["Rss"],
+        "pss_delta_kb": after["Pss"] - before["Pss"]
+    })
+
+
+def run_mode(mode: str, workers: int, artifact_dir: str, pickle_path: str) -> list:
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(mode, artifact_dir, pickle_path, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return stats
+
+
+def main():
+    from app.config import settings
+    from app.ml.failure_predictor import FailurePredictor
+    from benchmark_failure_predictor import generate_telemetry
+
+    parser = argparse.ArgumentParser(description="Benchmark per-worker load time and memory of the failure forest")
+    parser.add_argument("--workers", type=int, default=settings.WORKERS, help="Number of worker processes")
+    parser.add_argument("--components", type=int, default=20000, help="Training components")
+    parser.add_argument("--estimators", type=int, default=200, help="Trees in the forest")
+    args = parser.parse_args()
+
+    telemetry = generate_telemetry(args.components, 24)
+    predictor = FailurePredictor()
+
+    # Noisy labels grow full-depth trees, close to the size of a forest trained on real failures
+    component_ids = telemetry['component_id'].unique()
+    labels = pd.Series(np.random.default_rng(1).random(len(component_ids)) < 0.3, index=component_ids)
+    model = predictor.train(telemetry, labels=labels, n_estimators=args.estimators, n_jobs=-1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_dir = str(Path(tmp) / settings.FAILURE_PREDICTOR_MODEL)
+        pickle_path = str(Path(tmp) / "forest.pkl")
+        predictor.save_model(artifact_dir)
+        with open(pickle_path, "wb") as f:
+            pickle.dump(model, f)
+
+        logger.info(f"Forest: {predictor.forest.metadata()}")
+        for mode in ("pickle", "copy", "mmap"):
+            stats = run_mode(mode, args.workers, artifact_dir, pickle_path)
+            for i, s in enumerate(stats):
+                logger.info(
+                    f"[{mode:>6}] worker {i}: load {s['load_ms']:.1f} ms, "
+                    f"RSS +{s['rss_delta_kb'] / 1024:.1f} MiB, PSS +{s['pss_delta_kb'] / 1024:.1f} MiB"
+                )
+
+
+if __name__ == "__main__":
+    main()
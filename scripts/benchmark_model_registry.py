@@ -0,0 +1,85 @@
+import argparse
+import multiprocessing as mp
+import tempfile
+import time
+import logging
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+sys.path.append(str(Path(__file__).parent))
+from standin_checkpoint import build_standin_checkpoint
+from benchmark_model_loading import read_memory_kb
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def load_both(shared: bool, paths: dict, results):
+    """Load both ERNIE wrappers, with one shared registry or one registry each"""
+    import torch
+    from app.ml.model_registry import ModelRegistry
+    from app.ml.unsloth_model import UnslothModel
+    from app.ml.llamafactory_model import LLaMAFactoryModel
+
+    before = read_memory_kb()
+    start = time.perf_counter()
+
+    def registry():
+        return ModelRegistry(paths["base"], backend="cpu", torch_dtype=torch.float32)
+
+    unsloth_registry = registry()
+    llamafactory_registry = unsloth_registry if shared else registry()
+
+    unsloth = UnslothModel(model_path=paths["astra-grid-unsloth"], registry=unsloth_registry)
+    llamafactory = LLaMAFactoryModel(model_path=paths["astra-grid-llamafactory"], registry=llamafactory_registry)
+    unsloth.load_model()
+    llamafactory.load_model()
+
+    load_time = time.perf_counter() - start
+
+    # One forward pass per adapter so lazily mapped weights count as resident
+    for wrapper in (unsloth, llamafactory):
+        inputs = wrapper.tokenizer("### Instruction: warm up", return_tensors="pt")
+        with torch.no_grad(), wrapper.registry.adapter(wrapper.adapter_name) as model:
+            model(**inputs)
+
+    after = read_memory_kb()
+
+    parameter_bytes = sum(
+        r.memory_footprint()['base_bytes'] + r.memory_footprint()['adapter_bytes']
+        for r in {id(r): r for r in (unsloth_registry, llamafactory_registry)}.values()
+    )
+    results.put({
+        "load_s": load_time,
+        "rss_delta_mb": (after["Rss"] - before["Rss"]) / 1024,
+        "parameter_mb": parameter_bytes / 2 ** 20
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory of both ERNIE adapters with and without the shared registry")
+    parser.add_argument("--layers", type=int, default=12, help="Stand-in base model layers")
+    parser.add_argument("--embd", type=int, default=768, help="Stand-in base model width")
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = build_standin_checkpoint(tmp, n_layer=args.layers, n_embd=args.embd)
+
+        for shared in (False, True):
+            results = ctx.Queue()
+            process = ctx.Process(target=load_both, args=(shared, paths, results))
+            process.start()
+            stats = results.get()
+            process.join()
+
+            label = "shared registry" if shared else "separate bases"
+            logger.info(
+                f"{label:>16}: load {stats['load_s']:.2f}s, RSS +{stats['rss_delta_mb']:.0f} MiB, "
+                f"parameters {stats['parameter_mb']:.0f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
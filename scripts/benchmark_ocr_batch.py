@@ -0,0 +1,103 @@
+import argparse
+import time
+import logging
+from pathlib import Path
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+from app.ml.paddle_ocr_model import PaddleOCRModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def generate_label_images(count: int, width: int = 1920, height: int = 1080, seed: int = 42) -> list:
+    """Camera-sized frames of component labels with a few lines of text each"""
+    rng = np.random.default_rng(seed)
+    images = []
+    for i in range(count):
+        image = rng.integers(90, 140, (height, width, 3), dtype=np.uint8)
+        for line in range(4):
+            cv2.putText(
+                image, f"B4-SECTOR-01-COMP-{i:03d} CB-{line} {rng.integers(100, 999)}V",
+                (80, 200 + line * 200), cv2.FONT_HERSHEY_SIMPLEX, 2.5, (20, 20, 20), 5
+            )
+        images.append(image)
+    return images
+
+
+class StandinPaddleOCR:
+    """PaddleOCR-shaped detector/recognizer for machines without Paddle weights
+
+    Detection finds dark text blobs with OpenCV; recognition runs a small
+    convolutional network over crops resized to 48x320, batched the way
+    PaddleOCR's recognizer batches them, so per-call overhead amortizes.
+    """
+
+    def __init__(self):
+        import torch
+
+        torch.manual_seed(0)
+        self.torch = torch
+        self.net = torch.nn.Sequential(
+            torch.nn.Conv2d(3, 32, 3, padding=1), torch.nn.ReLU(), torch.nn.MaxPool2d(2),
+            torch.nn.Conv2d(32, 64, 3, padding=1), torch.nn.ReLU(), torch.nn.MaxPool2d(2),
+            torch.nn.Conv2d(64, 128, 3, padding=1), torch.nn.ReLU(), torch.nn.AdaptiveAvgPool2d((1, 40)),
+            torch.nn.Flatten(), torch.nn.Linear(128 * 40, 96)
+        ).eval()
+
+    def ocr(self, img, det=True, rec=True, cls=False):
+        if det:
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            _, mask = cv2.threshold(gray, 60, 255, cv2.THRESH_BINARY_INV)
+            mask = cv2.dilate(mask, np.ones((9, 45), np.uint8))
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            boxes = []
+            for contour in contours:
+                x, y, w, h = cv2.boundingRect(contour)
+                if w > 40 and h > 10:
+                    boxes.append([[x, y], [x + w, y], [x + w, y + h], [x, y + h]])
+            return [boxes]
+
+        batch = np.stack([cv2.resize(crop, (320, 48)) for crop in img]).astype(np.float32) / 255.0
+        with self.torch.inference_mode():
+            logits = self.net(self.torch.from_numpy(batch).permute(0, 3, 1, 2))
+        return [[(f"TEXT-{int(row.argmax())}", float(row.softmax(0).max())) for row in logits]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Images/s of PaddleOCRModel.extract_text vs extract_text_batch")
+    parser.add_argument("--images", type=int, default=64, help="Label images per run")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16, 32], help="Batch sizes to time")
+    parser.add_argument("--workers", type=int, default=4, help="Preprocessing threads")
+    args = parser.parse_args()
+
+    images = generate_label_images(args.images)
+    model = PaddleOCRModel(preprocess_workers=args.workers)
+    model.load_model()
+    if model.model is None:
+        logger.info("PaddleOCR weights unavailable, timing with the stand-in detector/recognizer")
+        model.model = StandinPaddleOCR()
+
+    start = time.perf_counter()
+    for image in images:
+        model.extract_text(image)
+    loop_time = time.perf_counter() - start
+    logger.info(f"extract_text loop: {args.images / loop_time:.1f} images/s")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        results = model.extract_text_batch(images, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        lines = sum(len(r['details']) for r in results)
+        logger.info(
+            f"extract_text_batch(batch_size={batch_size:>2}): {args.images / elapsed:.1f} images/s "
+            f"({lines} text lines, {elapsed / args.images * 1e3:.1f} ms/image)"
+        )
+
+
+if __name__ == "__main__":
+    main()
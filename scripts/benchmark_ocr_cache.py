@@ -0,0 +1,79 @@
+import argparse
+import tempfile
+import time
+import logging
+from pathlib import Path
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+sys.path.append(str(Path(__file__).parent))
+from app.ml.ocr_cache import OCRResultCache
+from app.ml.paddle_ocr_model import PaddleOCRModel
+from benchmark_ocr_batch import StandinPaddleOCR
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def photograph_label(index: int, revision: int, rng) -> np.ndarray:
+    """One camera photo of a component label: fresh sensor noise, a few px of jitter, exposure drift"""
+    image = rng.integers(90, 140, (1080, 1920, 3), dtype=np.uint8)
+    dx, dy = rng.integers(-3, 4, 2)
+    for line in range(4):
+        cv2.putText(
+            image, f"B4-SECTOR-01-COMP-{index:03d} REV-{revision} CB-{line}" if line % 2 == 0 or revision == 0
+            else f"RELABELLED {revision} LINE {line}",
+            (80 + dx, 200 + line * 200 + dy), cv2.FONT_HERSHEY_SIMPLEX, 2.5, (20, 20, 20), 5
+        )
+    return np.clip(image * rng.uniform(0.95, 1.05), 0, 255).astype(np.uint8)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Images/s of repeated sector scans with and without the OCR cache")
+    parser.add_argument("--components", type=int, default=32, help="Labels per sector")
+    parser.add_argument("--scans", type=int, default=4, help="Repeated scans of the sector")
+    parser.add_argument("--relabel", type=float, default=0.1, help="Fraction of labels replaced between scans")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    revisions = np.zeros(args.components, dtype=int)
+    scans = []
+    for scan in range(args.scans):
+        if scan:
+            revisions[rng.random(args.components) < args.relabel] += 1
+        scans.append([photograph_label(i, revisions[i], rng) for i in range(args.components)])
+    component_ids = [f"B4-SECTOR-01-COMP-{i:03d}" for i in range(args.components)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, cache in (("uncached", None), ("cached", OCRResultCache(disk_path=f"{tmp}/ocr.sqlite"))):
+            model = PaddleOCRModel(cache=cache)
+            model.model = StandinPaddleOCR()
+            recognizer = model.model.ocr
+            recognized = []
+            model.model.ocr = lambda img, det=True, rec=True, cls=False: (
+                recognized.append(1) if det else None) or recognizer(img, det=det, rec=rec, cls=cls)
+
+            start = time.perf_counter()
+            for images in scans:
+                model.extract_text_batch(images, component_ids=component_ids if cache else None)
+            elapsed = time.perf_counter() - start
+
+            images = args.components * args.scans
+            summary = f"{label:>8}: {images / elapsed:.1f} images/s, {len(recognized)}/{images} images recognized"
+            if cache is not None:
+                metrics = cache.metrics()
+                summary += f", hit rate {metrics['hit_rate']:.0%}"
+
+                restarted = OCRResultCache(disk_path=f"{tmp}/ocr.sqlite")
+                start = time.perf_counter()
+                PaddleOCRModel(cache=restarted).extract_text_batch(scans[-1], component_ids=component_ids)
+                summary += (f" | after restart: {args.components / (time.perf_counter() - start):.1f} images/s, "
+                            f"{restarted.metrics()['disk_hits']}/{args.components} served from disk")
+            logger.info(summary)
+
+
+if __name__ == "__main__":
+    main()
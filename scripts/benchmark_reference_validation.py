@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import tempfile
+import time
+import logging
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+from app.services.bigquery_service import BigQueryService
+from app.services.reference_store import REFERENCE_FIELDS, SQLiteReferenceStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RemoteStandinStore(SQLiteReferenceStore):
+    """The local store plus a fixed round-trip time per query, as a networked reference database would add"""
+
+    def __init__(self, path: str, rtt_ms: float):
+        super().__init__(path)
+        self.rtt_ms = rtt_ms
+
+    def round_trip(self):
+        if self.rtt_ms:
+            time.sleep(self.rtt_ms / 1000)
+
+    def fetch(self, serials):
+        self.round_trip()
+        return super().fetch(serials)
+
+
+def build_store(path: str, references: int, rtt_ms: float = 0.0) -> SQLiteReferenceStore:
+    store = RemoteStandinStore(path, rtt_ms)
+    store.upsert({"serial": f"SN-{index:07d}", "component_id": f"B4-SECTOR-{index // 1000:02d}-COMP-{index % 1000:03d}",
+                  "status": "normal", "component_type": "breaker", "sector": f"B4-SECTOR-{index // 1000:02d}"}
+                 for index in range(references))
+    return store
+
+
+def scan_readings(components: int, references: int, hallucinated: float, seed: int = 42):
+    """A scan's OCR readings: mostly real serials, some invented, a few status mismatches"""
+    rng = np.random.default_rng(seed)
+    readings = []
+    for index in rng.choice(references, components, replace=False):
+        reading = {"component_id": f"B4-SECTOR-{index // 1000:02d}-COMP-{index % 1000:03d}",
+                   "serial": f"SN-{index:07d}", "status": "overheat" if rng.random() < 0.02 else "normal"}
+        if rng.random() < hallucinated:
+            reading["serial"] = f"SN-{references + int(rng.integers(0, 10 ** 6)):07d}"
+        readings.append(reading)
+    return readings
+
+
+def validate_one_by_one(store: SQLiteReferenceStore, readings):
+    """Previous shape: one reference query per component, no pre-filter"""
+    results = 0
+    for reading in readings:
+        store.round_trip()
+        with store._lock:
+            row = store._db.execute(f"SELECT {', '.join(REFERENCE_FIELDS)} FROM {store.table} WHERE serial = ?",
+                                    (reading["serial"],)).fetchone()
+        results += row is not None and row[2] == reading["status"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-scan OCR validation latency against a local reference store")
+    parser.add_argument("--components", type=int, default=5000, help="Components per scan")
+    parser.add_argument("--references", type=int, default=200_000, help="Reference records")
+    parser.add_argument("--hallucinated", type=float, default=0.05, help="Share of readings with invented serials")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed scans")
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="Simulated round trip per reference query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = build_store(f"{tmp}/reference.db", args.references, args.rtt_ms)
+        readings = scan_readings(args.components, args.references, args.hallucinated)
+        service = BigQueryService(store=store)
+
+        start = time.perf_counter()
+        service.load_known_serials()
+        logger.info(f"Bloom filter of {args.references} serials built in {(time.perf_counter() - start) * 1e3:.0f} ms "
+                    f"({len(service.known_serials.bits) / 2 ** 10:.0f} KiB)")
+
+        timings = []
+        for _ in range(args.repeats if args.rtt_ms < 1 else 1):
+            start = time.perf_counter()
+            validate_one_by_one(store, readings)
+            timings.append(time.perf_counter() - start)
+        logger.info(f"one query per component: {np.median(timings) * 1e3:.0f} ms per {args.components}-component scan "
+                    f"(round trip {args.rtt_ms} ms)")
+
+        timings = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            report = asyncio.run(service.validate_many(readings))
+            timings.append(time.perf_counter() - start)
+        logger.info(f"validate_many:           {np.median(timings) * 1e3:.0f} ms per scan | valid {report['valid']}, "
+                    f"invalid {report['invalid']}, hallucinated serials {report['hallucinations']}")
+
+
+if __name__ == "__main__":
+    main()
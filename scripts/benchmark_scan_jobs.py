@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import tempfile
+import time
+import logging
+from pathlib import Path
+import sys
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+sys.path.append(str(Path(__file__).parent))
+from app.models import Base
+from app.services.scan_jobs import ScanJobQueue, ScanResultStore
+from app.services.scan_pipeline import ScanPipeline
+from benchmark_scan_pipeline import StandinAgents, StandinBigQuery, StandinScanner
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def measure(args, components: int, db_path: str):
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    pipeline = ScanPipeline(ocr_service=StandinScanner(components), agent_service=StandinAgents(),
+                            bigquery_service=StandinBigQuery())
+    jobs = ScanJobQueue(pipeline=pipeline, store=ScanResultStore(sessionmaker(bind=engine)))
+    try:
+        # Previous handler: the request is answered when the scan is done
+        start = time.perf_counter()
+        await pipeline.run_sector("B4-SECTOR-00")
+        blocking = time.perf_counter() - start
+
+        latencies = []
+        ids = []
+        for index in range(args.requests):
+            start = time.perf_counter()
+            job = await jobs.submit(f"B4-SECTOR-{index:02d}")
+            latencies.append(time.perf_counter() - start)
+            ids.append(job['scan_id'])
+        start = time.perf_counter()
+        for scan_id in ids:
+            while (await jobs.get(scan_id))['status'] != "completed":
+                await asyncio.sleep(0.05)
+        drained = time.perf_counter() - start
+    finally:
+        await jobs.stop()
+    return blocking, np.percentile(latencies, 50), np.percentile(latencies, 99), drained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="POST /scan latency: awaited scan vs queued scan job")
+    parser.add_argument("--components", type=int, nargs="+", default=[1, 10, 50], help="Components per sector")
+    parser.add_argument("--requests", type=int, default=20, help="Scan requests per run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for components in args.components:
+            blocking, p50, p99, drained = asyncio.run(measure(args, components, f"{tmp}/scans_{components}.db"))
+            logger.info(f"{components:>3} components/sector: awaited scan {blocking * 1e3:.0f} ms | "
+                        f"job submit p50 {p50 * 1e3:.1f} ms, p99 {p99 * 1e3:.1f} ms "
+                        f"({args.requests} jobs finished {drained:.1f} s later)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import time
+import logging
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+from app.services.agent_service import AgentService
+from app.services.bigquery_service import BigQueryService
+from app.services.ocr_service import OCRService
+from app.services.scan_pipeline import ScanPipeline
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-component latencies (ms) of the stand-in devices and backends
+LATENCY_MS = {'scan': 20, 'ocr': 30, 'prediction': 15, 'persistence': 25}
+
+
+class StandinScanner(OCRService):
+    """RDK X5 stand-in: components arrive one at a time, OCR is an awaited remote call"""
+
+    def __init__(self, components: int):
+        super().__init__()
+        self.components = components
+
+    async def scan_components(self, sector: str):
+        for index in range(self.components):
+            await asyncio.sleep(LATENCY_MS['scan'] / 1000)
+            yield {"id": f"{sector}-COMP-{index:03d}", "status": "normal", "confidence": 0.95}
+
+    async def read_component(self, component):
+        await asyncio.sleep(LATENCY_MS['ocr'] / 1000)
+        return await super().read_component(component)
+
+
+class StandinAgents(AgentService):
+    async def predict_component(self, component):
+        await asyncio.sleep(LATENCY_MS['prediction'] / 1000)
+        return await super().predict_component(component)
+
+
+class StandinBigQuery(BigQueryService):
+    async def store_scan_result(self, record):
+        await asyncio.sleep(LATENCY_MS['persistence'] / 1000)
+        return await super().store_scan_result(record)
+
+
+async def sequential(sectors, scanner, agents, store):
+    """Previous shape: each request scans its whole sector, then processes the components in turn"""
+    async def one(sector):
+        scan = await scanner.scan_sector(sector)
+        for component in scan['components']:
+            component['ocr'] = await scanner.read_component(component)
+            component['analysis'] = await agents.predict_component(component)
+            component['compliance'] = await agents.audit_component(component, component['analysis'])
+            await store.store_scan_result(component)
+    await asyncio.gather(*(one(sector) for sector in sectors))
+
+
+async def pipelined(sectors, scanner, agents, store, queue_size):
+    pipeline = ScanPipeline(ocr_service=scanner, agent_service=agents, bigquery_service=store, queue_size=queue_size)
+    try:
+        await asyncio.gather(*(pipeline.run_sector(sector) for sector in sectors))
+        return pipeline.metrics()
+    finally:
+        await pipeline.stop()
+
+
+async def main_async(args):
+    sectors = [f"B4-SECTOR-{index:02d}" for index in range(args.sectors)]
+    services = (StandinScanner(args.components), StandinAgents(), StandinBigQuery())
+    total = args.sectors * args.components
+
+    start = time.perf_counter()
+    await sequential(sectors, *services)
+    elapsed = time.perf_counter() - start
+    logger.info(f"sequential: {elapsed:.2f} s, {total / elapsed:.0f} components/s")
+
+    start = time.perf_counter()
+    metrics = await pipelined(sectors, *services, args.queue_size)
+    elapsed = time.perf_counter() - start
+    logger.info(f" pipelined: {elapsed:.2f} s, {total / elapsed:.0f} components/s")
+    for stage, stats in metrics.items():
+        logger.info(f"  {stage:>11}: {stats['workers']} workers, {stats['processed']} processed, "
+                    f"{stats['throughput_per_s']:.0f}/s, utilization {stats['utilization']:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential per-sector scan processing vs the staged scan pipeline")
+    parser.add_argument("--sectors", type=int, default=4, help="Concurrent sector scans")
+    parser.add_argument("--components", type=int, default=25, help="Components per sector")
+    parser.add_argument("--queue-size", type=int, default=32, help="Bounded queue size per stage")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import time
+import logging
+from collections import defaultdict
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+from app.services.scan_scheduler import ScanScheduler
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FIFOScheduler:
+    """Previous behaviour: one queue in arrival order, priority ignored, sectors may overlap"""
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+
+    async def put(self, item, sector, priority="medium"):
+        await self.queue.put((item, sector))
+
+    async def get(self):
+        return await self.queue.get()
+
+    async def release(self, sector):
+        pass
+
+
+def workload(args):
+    """A busy sector floods the queue, then quieter sectors and a few urgent high-priority scans arrive"""
+    jobs = [("B4-BUSY", "medium") for _ in range(args.flood)]
+    for index in range(args.sectors):
+        jobs += [(f"B4-SECTOR-{index:02d}", "low" if index % 2 else "medium") for _ in range(2)]
+    return jobs, [(f"B4-URGENT-{index}", "high") for index in range(args.urgent)]
+
+
+async def run(scheduler, args):
+    jobs, urgent = workload(args)
+    submitted, finished, overlaps = {}, {}, 0
+    scanning = defaultdict(int)
+
+    async def worker():
+        nonlocal overlaps
+        while True:
+            (job_id, priority), sector = await scheduler.get()
+            scanning[sector] += 1
+            overlaps += scanning[sector] > 1
+            await asyncio.sleep(args.scan_ms / 1000)
+            scanning[sector] -= 1
+            finished[job_id] = (time.monotonic() - submitted[job_id], priority, sector)
+            await scheduler.release(sector)
+
+    workers = [asyncio.create_task(worker()) for _ in range(args.workers)]
+    for index, (sector, priority) in enumerate(jobs):
+        submitted[index] = time.monotonic()
+        await scheduler.put((index, priority), sector, priority)
+    await asyncio.sleep(args.scan_ms / 1000 * 3)
+    for offset, (sector, priority) in enumerate(urgent):
+        job_id = len(jobs) + offset
+        submitted[job_id] = time.monotonic()
+        await scheduler.put((job_id, priority), sector, priority)
+
+    while len(finished) < len(jobs) + len(urgent):
+        await asyncio.sleep(0.01)
+    for task in workers:
+        task.cancel()
+
+    latency = defaultdict(list)
+    for seconds, priority, sector in finished.values():
+        latency[priority].append(seconds)
+        latency["busy sector" if sector == "B4-BUSY" else "other sectors" if priority != "high" else "urgent"].append(seconds)
+    return {key: sum(values) / len(values) for key, values in latency.items()}, overlaps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan completion latency: FIFO queue vs ScanScheduler")
+    parser.add_argument("--flood", type=int, default=40, help="Scans queued by the busy sector")
+    parser.add_argument("--sectors", type=int, default=6, help="Other sectors, two scans each")
+    parser.add_argument("--urgent", type=int, default=3, help="High-priority scans arriving late")
+    parser.add_argument("--workers", type=int, default=4, help="Scan job workers")
+    parser.add_argument("--scan-ms", type=float, default=20, help="Duration of one scan")
+    args = parser.parse_args()
+
+    for label, factory in (("FIFO", FIFOScheduler),
+                           ("ScanScheduler", lambda: ScanScheduler(sector_concurrency=1, max_pending=10_000))):
+        means, overlaps = asyncio.run(run(factory(), args))
+        logger.info(f"{label:>13}: mean time to completion " + ", ".join(
+            f"{key} {means[key] * 1e3:.0f} ms" for key in ("high", "medium", "low", "busy sector", "other sectors")
+        ) + f" | concurrent scans of one sector: {overlaps}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+import logging
+from pathlib import Path
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+sys.path.append(str(Path(__file__).parent))
+from app.ml.schematic_layout import open_pdf
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def build_schematic_pdf(path: str, pages: int, scanned_every: int = 4, seed: int = 42):
+    """A report-style PDF: text-layer pages with headings, lists and a ruled table, plus scanned pages"""
+    rng = np.random.default_rng(seed)
+    document = open_pdf(None)
+    for number in range(pages):
+        page = document.new_page(width=612, height=792)
+        if scanned_every and number % scanned_every == scanned_every - 1:
+            scan = np.full((1100, 850, 3), 245, dtype=np.uint8)
+            for line in range(12):
+                cv2.putText(scan, f"B4-SECTOR-{number:03d} CB-{line:02d} {rng.integers(100, 999)}V",
+                            (60, 90 + line * 80), cv2.FONT_HERSHEY_SIMPLEX, 1.1, (20, 20, 20), 2)
+            page.insert_image(page.rect, stream=cv2.imencode(".png", scan)[1].tobytes())
+            continue
+
+        if number == 0:
+            page.insert_text((72, 90), "Astra-Grid Infrastructure Report", fontsize=32)
+            page.insert_text((72, 130), "Autonomous Telecom & Data Center Guardian", fontsize=18)
+        else:
+            page.insert_text((72, 90), f"Sector B4-SECTOR-{number:03d} Layout", fontsize=24)
+        page.insert_textbox((72, 160, 540, 260), "This page describes the breaker layout, feeder routing and "
+                            "fiber patch panels monitored in the sector. " * 3, fontsize=12)
+        for item in range(3):
+            page.insert_text((72, 300 + item * 24), f"• Breaker CB-{item:02d} feeds rack R{rng.integers(1, 40)}",
+                             fontsize=12)
+        for row in range(5):
+            for col in range(4):
+                rect = (72 + col * 110, 420 + row * 24, 182 + col * 110, 444 + row * 24)
+                page.draw_rect(rect, color=(0, 0, 0), width=0.8)
+                page.insert_text((rect[0] + 6, rect[1] + 16), f"R{row}C{col}", fontsize=10)
+    document.save(path)
+    document.close()
+
+
+def peak_rss_mb(pid: int) -> float:
+    """High-water RSS of a process (VmHWM), which unlike ru_maxrss does not carry over from the parent"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    return 0.0
+
+
+def child_pids() -> list:
+    with open(f"/proc/self/task/{os.getpid()}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def run_layout(path: str, workers: int, results):
+    """Stream every page of one document and report timing and peak memory"""
+    from app.ml.paddle_ocr_model import PaddleOCRModel
+
+    model = PaddleOCRModel()
+    start = time.perf_counter()
+    first = None
+    pages = elements = 0
+    worker_peak = 0.0
+    for page in model.iter_schematic_pages(path, workers=workers):
+        first = first or time.perf_counter() - start
+        pages += 1
+        elements += len(page['layout_elements'])
+        worker_peak = max([worker_peak] + [peak_rss_mb(pid) for pid in child_pids()])
+    results.put({
+        'pages_per_s': pages / (time.perf_counter() - start),
+        'first_ms': first * 1e3,
+        'elements': elements,
+        'peak_rss_mb': peak_rss_mb(os.getpid()),
+        'worker_peak_rss_mb': worker_peak
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput, first-page latency and memory of streamed schematic layout")
+    parser.add_argument("--pages", type=int, nargs="+", default=[40, 320], help="Document lengths")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2], help="Worker process counts")
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = f"{tmp}/schematic_{pages}.pdf"
+            build_schematic_pdf(path, pages)
+            for workers in args.workers:
+                results = ctx.Queue()
+                process = ctx.Process(target=run_layout, args=(path, workers, results))
+                process.start()
+                stats = results.get()
+                process.join()
+
+                logger.info(
+                    f"{pages:>4} pages, {workers} worker(s): {stats['pages_per_s']:.1f} pages/s, first page after "
+                    f"{stats['first_ms']:.0f} ms, {stats['elements']} elements | peak RSS {stats['peak_rss_mb']:.0f} MiB"
+                    + (f", per worker {stats['worker_peak_rss_mb']:.0f} MiB" if workers > 1 else "")
+                )
+
+
+if __name__ == "__main__":
+    main()
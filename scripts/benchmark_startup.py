@@ -0,0 +1,80 @@
+import argparse
+import json
+import subprocess
+import logging
+from pathlib import Path
+import sys
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HEAVY_MODULES = ["torch", "transformers", "peft", "cv2", "sklearn", "paddleocr"]
+
+
+def import_profile(module: str) -> dict:
+    """Cold-import a module under `python -X importtime` in a fresh interpreter"""
+    probe = (
+        f"import sys, json; import {module}; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        timings.append((name, int(self_us), int(cumulative_us)))
+
+    top_level = next(cumulative for name, _, cumulative in timings if name == module)
+    return {
+        "module": module,
+        "cumulative_ms": top_level / 1000,
+        "heavy_modules_loaded": json.loads(result.stdout.strip().splitlines()[-1]),
+        "slowest_imports": [
+            {"module": name, "self_ms": self_us / 1000}
+            for name, self_us, _ in sorted(timings, key=lambda t: t[1], reverse=True)[:10]
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time of the API and ML packages")
+    parser.add_argument("--modules", nargs="+", default=["app.main", "app.ml", "app.ml.failure_predictor"],
+                        help="Modules to profile, each in a fresh interpreter")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per module (median is reported)")
+    parser.add_argument("--max-ms", type=float, help="Fail if app.main cold start exceeds this budget")
+    parser.add_argument("--json", help="Write the full report to this file for tracking across builds")
+    args = parser.parse_args()
+
+    report = []
+    for module in args.modules:
+        runs = sorted((import_profile(module) for _ in range(args.runs)), key=lambda r: r["cumulative_ms"])
+        profile = runs[len(runs) // 2]
+        report.append(profile)
+
+        logger.info(
+            f"{module:>28}: {profile['cumulative_ms']:7.1f} ms, heavy modules loaded: "
+            f"{', '.join(profile['heavy_modules_loaded']) or 'none'}"
+        )
+        for entry in profile["slowest_imports"][:5]:
+            logger.info(f"{'':>30}{entry['module']:<45} {entry['self_ms']:7.1f} ms self")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    main_profile = next((p for p in report if p["module"] == "app.main"), None)
+    if args.max_ms is not None and main_profile and main_profile["cumulative_ms"] > args.max_ms:
+        logger.error(f"app.main cold start {main_profile['cumulative_ms']:.1f} ms exceeds budget of {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import tempfile
+import time
+import logging
+from pathlib import Path
+import sys
+
+import numpy as np
+import torch
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+sys.path.append(str(Path(__file__).parent))
+from app.ml.model_registry import ModelRegistry
+from app.ml.response_cache import ResponseCache
+from app.ml.unsloth_model import UnslothModel
+from standin_checkpoint import build_standin_checkpoint
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COMPONENT = {
+    'component_id': "B4-SECTOR-01-COMP-007",
+    'status': "Overheat",
+    'temperature': 78.2,
+    'voltage': 231.9,
+    'last_maintenance': "2024-01-01"
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time until the first visible text: blocking vs streamed generation")
+    parser.add_argument("--layers", type=int, default=12, help="Stand-in base model layers")
+    parser.add_argument("--embd", type=int, default=768, help="Stand-in base model width")
+    parser.add_argument("--new-tokens", type=int, default=128, help="Tokens generated per request")
+    parser.add_argument("--requests", type=int, default=5, help="Requests per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = build_standin_checkpoint(tmp, n_layer=args.layers, n_embd=args.embd)
+        registry = ModelRegistry(paths["base"], backend="cpu", torch_dtype=torch.float32)
+        model = UnslothModel(model_path=paths["astra-grid-unsloth"], registry=registry,
+                             cache=ResponseCache(max_entries=0))
+        model.GENERATION_KWARGS = {'max_new_tokens': args.new_tokens, 'min_new_tokens': args.new_tokens,
+                                   'do_sample': False}
+        model.load_model()
+        model.predict_failure(COMPONENT)
+
+        blocking, first_chunk, streamed = [], [], []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            model.predict_failure(COMPONENT)
+            blocking.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for i, _chunk in enumerate(model.stream_failure(COMPONENT)):
+                if i == 0:
+                    first_chunk.append(time.perf_counter() - start)
+            streamed.append(time.perf_counter() - start)
+
+        logger.info(f"{args.new_tokens} new tokens, median of {args.requests} requests")
+        logger.info(f"Blocking predict_failure: first text after {np.median(blocking) * 1e3:.0f} ms")
+        logger.info(
+            f"Streamed stream_failure: first text after {np.median(first_chunk) * 1e3:.0f} ms, "
+            f"complete after {np.median(streamed) * 1e3:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
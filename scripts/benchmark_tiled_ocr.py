@@ -0,0 +1,109 @@
+import argparse
+import time
+import logging
+from pathlib import Path
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+sys.path.append(str(Path(__file__).parent))
+from app.ml.paddle_ocr_model import PaddleOCRModel
+from benchmark_ocr_batch import StandinPaddleOCR
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StandinDetectorOCR(StandinPaddleOCR):
+    """StandinPaddleOCR whose detection also runs a strided convolutional backbone
+
+    PaddleOCR's DB detector costs time in proportion to the pixels it is
+    given; the plain stand-in thresholds for free, which would hide exactly
+    what tiling saves.
+    """
+
+    def __init__(self):
+        super().__init__()
+        nn = self.torch.nn
+        self.backbone = nn.Sequential(
+            nn.Conv2d(3, 16, 3, stride=2, padding=1), nn.ReLU(),
+            nn.Conv2d(16, 32, 3, stride=2, padding=1), nn.ReLU(),
+            nn.Conv2d(32, 1, 1)
+        ).eval()
+
+    def ocr(self, img, det=True, rec=True, cls=False):
+        if det:
+            with self.torch.inference_mode():
+                self.backbone(self.torch.from_numpy(np.ascontiguousarray(img)).permute(2, 0, 1)[None].float())
+        return super().ocr(img, det=det, rec=rec, cls=cls)
+
+
+def panel_photo(width: int = 4000, height: int = 3000, labels: int = 6, seed: int = 42):
+    """Brushed-metal panel with screws and a few small label plates, plus each text line's box"""
+    rng = np.random.default_rng(seed)
+    rows = rng.normal(150, 12, (height, 1)).astype(np.float32)
+    metal = cv2.blur(rows + rng.normal(0, 6, (height, width)).astype(np.float32), (61, 1))
+    frame = np.repeat(np.clip(metal, 0, 255).astype(np.uint8)[:, :, None], 3, axis=2)
+
+    boxes = []
+    slots = rng.permutation(12)[:labels]
+    for slot in slots:
+        x = 150 + (slot % 3) * 1300 + int(rng.integers(0, 200))
+        y = 150 + (slot // 3) * 700 + int(rng.integers(0, 300))
+        cv2.rectangle(frame, (x, y), (x + 900, y + 180), (235, 235, 235), -1)
+        for line in range(2):
+            text = f"CB-{slot:02d}{line} {rng.integers(100, 999)}V"
+            (w, h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1.6, 3)
+            origin = (x + 30, y + 70 + line * 80)
+            cv2.putText(frame, text, origin, cv2.FONT_HERSHEY_SIMPLEX, 1.6, (20, 20, 20), 3)
+            boxes.append((origin[0], origin[1] - h, origin[0] + w, origin[1]))
+    for _ in range(30):
+        cv2.circle(frame, (int(rng.integers(0, width)), int(rng.integers(0, height))), 18, (70, 70, 70), -1)
+    return np.clip(frame + rng.normal(0, 3, frame.shape), 0, 255).astype(np.uint8), boxes
+
+
+def lines_found(result: dict, truth_boxes: list) -> int:
+    """Ground-truth text lines whose centre falls inside some detected box"""
+    found = 0
+    for x0, y0, x1, y1 in truth_boxes:
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        for detail in result['details']:
+            box = np.asarray(detail['bbox'])
+            if box[:, 0].min() <= cx <= box[:, 0].max() and box[:, 1].min() <= cy <= box[:, 1].max():
+                found += 1
+                break
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-frame vs tiled OCR on synthetic high-resolution panel photos")
+    parser.add_argument("--frames", type=int, default=5, help="Panel photos")
+    parser.add_argument("--sizes", nargs="+", default=["4000x3000", "8000x6000"], help="Frame sizes (WxH)")
+    args = parser.parse_args()
+
+    model = PaddleOCRModel()
+    model.model = StandinDetectorOCR()
+    for size in args.sizes:
+        width, height = map(int, size.split("x"))
+        photos = [panel_photo(width, height, seed=seed) for seed in range(args.frames)]
+        truth = sum(len(boxes) for _, boxes in photos)
+
+        for label, extract in (("full frame", model.extract_text), ("tiled", model.extract_text_tiled)):
+            extract(photos[0][0])
+            start = time.perf_counter()
+            results = [extract(frame) for frame, _ in photos]
+            elapsed = (time.perf_counter() - start) / args.frames
+            found = sum(lines_found(result, boxes) for result, (_, boxes) in zip(results, photos))
+            logger.info(f"{size} {label:>10}: {elapsed * 1e3:.0f} ms/frame, {found}/{truth} label lines located")
+
+        start = time.perf_counter()
+        tiles = [model.propose_text_regions(frame) for frame, _ in photos]
+        proposal = (time.perf_counter() - start) / args.frames
+        area = np.mean([((t[:, 2] - t[:, 0]) * (t[:, 3] - t[:, 1])).sum() / (width * height) for t in tiles])
+        logger.info(f"{size} proposal pass: {proposal * 1e3:.0f} ms/frame, tiles cover {area:.1%} of the frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import time
+import tracemalloc
+import logging
+from pathlib import Path
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+from app.config import settings
+from app.services.ocr_service import decode_image
+from app.utils.uploads import spool_body
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024  # what uvicorn hands the app per receive()
+
+
+def camera_jpeg(width: int = 4000, height: int = 3000, seed: int = 42) -> bytes:
+    """A 12 MP camera-like JPEG: textured panel, label text and sensor noise"""
+    rng = np.random.default_rng(seed)
+    small = rng.integers(60, 200, (height // 40, width // 40, 3), dtype=np.uint8)
+    frame = cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+    for line in range(12):
+        cv2.putText(frame, f"B4-SECTOR-01-COMP-{line:03d} CB-{line}", (200, 300 + line * 220),
+                    cv2.FONT_HERSHEY_SIMPLEX, 5, (20, 20, 20), 12)
+    frame = np.clip(frame + rng.normal(0, 4, frame.shape), 0, 255).astype(np.uint8)
+    return cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+
+async def stream(payload: bytes):
+    for start in range(0, len(payload), CHUNK_SIZE):
+        yield payload[start:start + CHUNK_SIZE]
+
+
+async def buffered(payload: bytes):
+    """Previous path: Request.body() joins the chunks into bytes, then a full-size decode"""
+    chunks = [chunk async for chunk in stream(payload)]
+    body = b"".join(chunks)
+    return cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+async def spooled_full(payload: bytes):
+    """Spooled buffer, full-size decode: isolates the receive side"""
+    view = await spool_body(stream(payload), len(payload), settings.UPLOAD_MAX_BYTES)
+    return decode_image(view)[0]
+
+
+async def spooled(payload: bytes):
+    """New path: one preallocated buffer, decoded in place at the reduction OCR can use"""
+    view = await spool_body(stream(payload), len(payload), settings.UPLOAD_MAX_BYTES)
+    return decode_image(view, settings.OCR_MAX_IMAGE_SIDE)[0]
+
+
+def measure(path, payload: bytes, repeats: int):
+    """Median latency and traced peak allocation of one upload path"""
+    asyncio.run(path(payload))
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        asyncio.run(path(payload))
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    image = asyncio.run(path(payload))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return np.median(latencies), peak, image.shape
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and peak memory of receiving and decoding a 12 MP upload")
+    parser.add_argument("--repeats", type=int, default=10, help="Timed uploads per path")
+    args = parser.parse_args()
+
+    payload = camera_jpeg()
+    logger.info(f"12 MP JPEG upload: {len(payload) / 2 ** 20:.1f} MiB in {CHUNK_SIZE // 1024} KiB chunks")
+    for label, path in (("body() + full decode", buffered), ("spooled + full decode", spooled_full),
+                        ("spooled + reduced decode", spooled)):
+        latency, peak, shape = measure(path, payload, args.repeats)
+        logger.info(f"{label:>24}: {latency * 1e3:.0f} ms, peak {peak / 2 ** 20:.1f} MiB, decoded {shape[1]}x{shape[0]}")
+
+
+if __name__ == "__main__":
+    main()
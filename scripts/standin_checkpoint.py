@@ -0,0 +1,61 @@
+import string
+import logging
+from pathlib import Path
+
+from tokenizers import Tokenizer, decoders, models, pre_tokenizers
+from transformers import GPT2Config, GPT2LMHeadModel, LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
+from peft import LoraConfig, get_peft_model
+
+logger = logging.getLogger(__name__)
+
+ADAPTERS = ["astra-grid-unsloth", "astra-grid-llamafactory"]
+
+
+def build_standin_checkpoint(path: str, n_layer: int = 6, n_embd: int = 512, seed: int = 0,
+                             architecture: str = "gpt2") -> dict:
+    """Write a small random causal LM plus both Astra-Grid LoRA adapters
+
+    Stands in for ERNIE-4.5-21B on machines without the real weights: a
+    character-level tokenizer, a GPT-2 style base model and two LoRA
+    adapters saved under the production adapter names. With
+    architecture="llama" the base model is a Llama-style decoder built
+    from nn.Linear layers, like ERNIE, which quantization benchmarks need.
+    Returns the base model path and one path per adapter.
+    """
+    import torch
+
+    torch.manual_seed(seed)
+    root = Path(path)
+    base_dir = root / "base"
+
+    vocab = {token: i for i, token in enumerate(["<eos>", "<pad>"] + list(string.printable) + ["°"])}
+    backend = Tokenizer(models.WordLevel(vocab, unk_token="<eos>"))
+    backend.pre_tokenizer = pre_tokenizers.Split("", "isolated")
+    backend.decoder = decoders.Fuse()
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=backend, eos_token="<eos>", pad_token="<pad>")
+    tokenizer.save_pretrained(base_dir)
+
+    if architecture == "llama":
+        model_class, target_modules = LlamaForCausalLM, ["q_proj", "v_proj"]
+        config = LlamaConfig(
+            vocab_size=len(vocab), max_position_embeddings=2048, hidden_size=n_embd,
+            intermediate_size=n_embd * 8 // 3, num_hidden_layers=n_layer,
+            num_attention_heads=max(n_embd // 64, 1), bos_token_id=0, eos_token_id=0, pad_token_id=1
+        )
+    else:
+        model_class, target_modules = GPT2LMHeadModel, ["c_attn"]
+        config = GPT2Config(
+            vocab_size=len(vocab), n_positions=2048, n_embd=n_embd, n_layer=n_layer,
+            n_head=max(n_embd // 64, 1), bos_token_id=0, eos_token_id=0
+        )
+    model_class(config).save_pretrained(base_dir)
+
+    paths = {"base": str(base_dir)}
+    for name in ADAPTERS:
+        lora = LoraConfig(r=16, lora_alpha=32, target_modules=target_modules, task_type="CAUSAL_LM")
+        adapter = get_peft_model(model_class.from_pretrained(base_dir), lora)
+        adapter.save_pretrained(root / name)
+        paths[name] = str(root / name)
+
+    logger.info(f"Stand-in checkpoint written to {root}")
+    return paths